@@ -0,0 +1,80 @@
+"""``include=`` for ticket reads: related data embedded in every ticket returned.
+
+An include costs a fixed number of statements however many tickets there are: the
+comments of all of them in one ``IN`` query, as ``selectinload`` would load them,
+or their counts in one grouped query. With both, ``comment_count`` is taken from
+the loaded comments.
+"""
+
+import uuid
+from collections import defaultdict
+from collections.abc import Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.serialization import response_columns, row_dicts
+from app.db.models.archive import ArchivedComment
+from app.db.models.comment import Comment
+from app.schemas.comment import CommentResponse
+
+INCLUDES = ("comments", "comment_count")
+INCLUDE_DESCRIPTION = (
+    "Comma-separated related data to embed in each ticket: comments (oldest first), comment_count."
+)
+
+
+def select_includes(include: str | None) -> tuple[str, ...]:
+    """A comma-separated ``include`` parameter as ``INCLUDES`` names, in that order."""
+    if include is None:
+        return ()
+    requested = {name.strip() for name in include.split(",")} - {""}
+    unknown = requested.difference(INCLUDES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown includes: {', '.join(sorted(unknown))}",
+        )
+    return tuple(name for name in INCLUDES if name in requested)
+
+
+async def embed_includes(
+    db: AsyncSession, documents: list[dict], includes: Sequence[str], archived: bool = False
+) -> None:
+    """Add ``includes`` to ticket ``documents`` (``row_dicts`` with ``id``) in place.
+
+    ``archived`` also reads ``archived_comments``, for documents that may include
+    archived tickets; a ticket's comments are all in one of the two tables.
+    """
+    if not includes or not documents:
+        return
+    ids = [document["id"] for document in documents]
+    entities = (Comment, ArchivedComment) if archived else (Comment,)
+    comments: dict[uuid.UUID, list[dict]] = defaultdict(list)
+    counts: dict[uuid.UUID, int] = {}
+    for entity in entities:
+        if "comments" in includes:
+            rows = (
+                await db.execute(
+                    select(*response_columns(CommentResponse, entity))
+                    .where(entity.ticket_id.in_(ids))
+                    .order_by(entity.ticket_id, entity.created_at)
+                )
+            ).all()
+            for comment in row_dicts(CommentResponse, rows):
+                comments[comment["ticket_id"]].append(comment)
+        else:
+            query = (
+                select(entity.ticket_id, func.count())
+                .where(entity.ticket_id.in_(ids))
+                .group_by(entity.ticket_id)
+            )
+            counts.update((await db.execute(query)).all())
+
+    for document in documents:
+        if "comments" in includes:
+            document["comments"] = comments.get(document["id"], [])
+            counts[document["id"]] = len(document["comments"])
+        if "comment_count" in includes:
+            document["comment_count"] = counts.get(document["id"], 0)
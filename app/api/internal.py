@@ -0,0 +1,20 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.api.v1.metrics import metrics_cache
+from app.api.v1.tickets import ticket_cache
+from app.core.instrumentation import REGISTRY
+
+router = APIRouter()
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    return {"tickets": asdict(ticket_cache.stats()), "metrics": asdict(metrics_cache.stats())}
+
+
+@router.get("/metrics", response_class=Response)
+async def get_prometheus_metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
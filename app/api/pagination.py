@@ -0,0 +1,125 @@
+"""Opaque keyset cursors for list endpoints.
+
+A cursor is the sort key of the last row of a page, JSON-encoded and base64url'd.
+Clients must treat it as an opaque token and pass it back unchanged. A list sorted
+by anything but ``(created_at, id)`` names its sort in its cursors, so that one
+is refused by a list in another order.
+"""
+
+import base64
+import heapq
+import json
+import uuid
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import date, datetime
+from itertools import islice
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import Row
+
+from app.db.changes import as_utc
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+SYNC_TOKEN_HEADER = "X-Sync-Token"
+
+
+def encode_cursor(*position: Any, sort: str | None = None) -> str:
+    """A cursor after ``position``: a row's sort key, ending in ``(created_at, id)``."""
+    values = [sort, *position] if sort else list(position)
+    payload = json.dumps(values, separators=(",", ":"), default=_cursor_value)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _cursor_value(value: date | uuid.UUID) -> str:
+    return value.isoformat() if isinstance(value, date) else str(value)
+
+
+def decode_cursor(cursor: str, sort: str | None = None, keys: int = 0) -> tuple:
+    """The position of an ``encode_cursor`` cursor of the same ``sort``: ``keys``
+    leading sort keys (ints or dates), then ``(created_at, id)``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if sort:
+            if values[0] != sort:
+                raise ValueError(cursor)
+            values = values[1:]
+        *leading, created_at, row_id = values
+        if len(leading) != keys:
+            raise ValueError(cursor)
+        leading = [date.fromisoformat(key) if isinstance(key, str) else int(key) for key in leading]
+        return (*leading, datetime.fromisoformat(created_at), uuid.UUID(row_id))
+    except (ValueError, TypeError, LookupError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from None
+
+
+def encode_sync_token(at: datetime, row_id: uuid.UUID) -> str:
+    """A position in the ``(updated_at, id)`` order of ``app.db.sync``; cursor-shaped."""
+    return encode_cursor(at, row_id)
+
+
+def decode_sync_token(token: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        return decode_cursor(token)
+    except HTTPException:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync token"
+        ) from None
+
+
+def wants_ndjson(accept: str | None) -> bool:
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+
+def page_key(row: Row) -> tuple[datetime, uuid.UUID]:
+    """A row's ``(created_at, id)`` position, comparable across tables and drivers."""
+    return as_utc(row.created_at), row.id
+
+
+def sorted_page_key(row: Row) -> tuple:
+    """The position of a row selected with its ``sort_key``: ``(sort_key, created_at, id)``."""
+    return row.sort_key, *page_key(row)
+
+
+def merge_pages(
+    pages: Iterable[Sequence[Row]], limit: int, key=page_key, reverse: bool = False
+) -> list[Row]:
+    """The first ``limit`` rows of several pages, each already in ``key`` order (or
+    the reverse)."""
+    return list(islice(heapq.merge(*pages, key=key, reverse=reverse), limit))
+
+
+async def merge_streams(
+    streams: Sequence[AsyncIterator[Row]], key=page_key, reverse: bool = False
+) -> AsyncIterator[Row]:
+    """Rows of several streams, each already in ``key`` order (or the reverse), in
+    that order."""
+    heads = {}
+    for index, stream in enumerate(streams):
+        row = await anext(stream, None)
+        if row is not None:
+            heads[index] = row
+    # A list merges a couple of streams, one per table: comparing every head is cheap.
+    pick = max if reverse else min
+    while heads:
+        index = pick(heads, key=lambda index: key(heads[index]))
+        yield heads[index]
+        following = await anext(streams[index], None)
+        if following is None:
+            del heads[index]
+        else:
+            heads[index] = following
+
+
+async def chain_streams(streams: Sequence[AsyncIterator[Row]]) -> AsyncIterator[Row]:
+    """Rows of several streams, one stream after the other."""
+    for stream in streams:
+        async for row in stream:
+            yield row
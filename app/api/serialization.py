@@ -0,0 +1,97 @@
+"""Fast path for list endpoints: Core rows straight to JSON.
+
+``response_columns`` selects exactly a response model's fields, so no ORM objects
+are built or identity-mapped, and ``dump_rows`` encodes the row tuples with orjson
+instead of validating each one through the pydantic model. The output is
+byte-for-byte what FastAPI produces from ``response_model``
+(``tests/test_serialization.py`` holds that contract), so it only suits models whose
+fields are plain columns that need no validator or conversion.
+
+Every helper takes an optional ``fields``, a subset of the model's fields from
+``select_fields`` (``?fields=``), so only those columns are read and encoded.
+"""
+
+from collections.abc import Sequence
+
+import orjson
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy import Row
+
+from app.core.instrumentation import add_rows
+
+# pydantic writes UTC offsets as "Z"; everything else already matches orjson.
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+Fields = Sequence[str] | None
+
+
+def select_fields(model: type[BaseModel], fields: str | None) -> tuple[str, ...]:
+    """A comma-separated ``fields`` parameter as ``model`` field names, in field
+    order; all of them when it is ``None``. ``id`` is always included."""
+    names = tuple(model.model_fields)
+    if fields is None:
+        return names
+    requested = {name.strip() for name in fields.split(",")} - {""}
+    unknown = requested.difference(names)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    return tuple(name for name in names if name == "id" or name in requested)
+
+
+def response_columns(
+    model: type[BaseModel], entity, fields: Fields = None, keys: Sequence[str] = ()
+) -> list:
+    """The mapped columns of ``entity`` named like ``model``'s fields (or ``fields``),
+    in field order, followed by those of ``keys`` not already selected: sort keys
+    the caller reads from the rows but which are not encoded."""
+    names = tuple(model.model_fields) if fields is None else tuple(fields)
+    names += tuple(key for key in keys if key not in names)
+    return [getattr(entity, name) for name in names]
+
+
+def row_dicts(model: type[BaseModel], rows: Sequence[Row], fields: Fields = None) -> list[dict]:
+    """Rows as ``model``-shaped dicts, for embedding in a larger document."""
+    fields = tuple(model.model_fields) if fields is None else tuple(fields)
+    add_rows(len(rows))
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def dump_rows(model: type[BaseModel], rows: Sequence[Row], fields: Fields = None) -> bytes:
+    return orjson.dumps(row_dicts(model, rows, fields), option=JSON_OPTIONS)
+
+
+def dump_row(model: type[BaseModel], row: Row, fields: Fields = None) -> bytes:
+    add_rows(1)
+    return orjson.dumps(dict(zip(fields or model.model_fields, row)), option=JSON_OPTIONS)
+
+
+def dump_row_line(model: type[BaseModel], row: Row, fields: Fields = None) -> bytes:
+    """One NDJSON line."""
+    add_rows(1)
+    return orjson.dumps(
+        dict(zip(fields or model.model_fields, row)),
+        option=JSON_OPTIONS | orjson.OPT_APPEND_NEWLINE,
+    )
+
+
+def project(document: bytes, fields: Sequence[str]) -> bytes:
+    """Just ``fields`` of an encoded JSON object, e.g. a cached full response."""
+    values = orjson.loads(document)
+    return orjson.dumps({name: values[name] for name in fields})
+
+
+def rows_response(
+    model: type[BaseModel], rows: Sequence[Row], headers=None, fields: Fields = None
+) -> Response:
+    return Response(dump_rows(model, rows, fields), media_type="application/json", headers=headers)
+
+
+def json_response(content: dict | list, headers=None) -> Response:
+    return Response(
+        orjson.dumps(content, option=JSON_OPTIONS), media_type="application/json", headers=headers
+    )
@@ -0,0 +1,210 @@
+"""Formats for ``GET /api/v1/export`` and ``POST /api/v1/import``.
+
+An export reads tickets joined to their comments from one server-side cursor,
+ordered so that each ticket's comments follow it, and folds consecutive rows into
+one ``TicketExport`` document at a time: memory holds one ticket however many are
+exported. An import is split into rows as the upload arrives (NDJSON lines, or CSV
+records, which may span lines) and each row is validated on its own, so a bad row
+is reported and skipped rather than failing the others.
+"""
+
+import csv
+import enum
+import io
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+import orjson
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import Select, Table, select
+
+from app.api.serialization import JSON_OPTIONS
+from app.db.models.comment import Comment
+from app.db.models.ticket import Ticket
+from app.schemas.comment import CommentResponse
+from app.schemas.ticket import TicketResponse
+from app.schemas.transfer import TicketImport
+
+CSV_MEDIA_TYPE = "text/csv"
+TICKET_FIELDS = tuple(TicketResponse.model_fields)
+COMMENT_FIELDS = tuple(CommentResponse.model_fields)
+CSV_HEADER = (*TICKET_FIELDS, "comments")
+
+
+class ExportFormat(enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+def export_query(tickets: Table = Ticket.__table__, comments: Table = Comment.__table__) -> Select:
+    """Every ticket with its comments, one row per comment and one for a ticket
+    without any, in ``(created_at, id)`` order: a walk of the two tables' indexes.
+    ``archived_tickets`` and ``archived_comments`` are read by the same query."""
+    return (
+        select(
+            *(tickets.c[name] for name in TICKET_FIELDS),
+            *(comments.c[name].label(f"comment_{name}") for name in COMMENT_FIELDS),
+        )
+        .select_from(tickets.outerjoin(comments, comments.c.ticket_id == tickets.c.id))
+        .order_by(tickets.c.created_at, tickets.c.id, comments.c.created_at, comments.c.id)
+    )
+
+
+async def export_documents(rows: AsyncIterator, limit: int | None = None) -> AsyncIterator[dict]:
+    """Fold the ``export_query`` rows of each ticket into one ``TicketExport`` dict,
+    stopping after ``limit`` tickets. The query has no ``LIMIT`` of its own, which
+    would have to be applied to the tickets before the join and sorted again after."""
+    width = len(TICKET_FIELDS)
+    document = None
+    exported = 0
+    async for row in rows:
+        if document is None or row[0] != document["id"]:
+            if document is not None:
+                yield document
+                exported += 1
+                if exported == limit:
+                    return
+            document = dict(zip(TICKET_FIELDS, row[:width]))
+            document["comments"] = []
+        if row[width] is not None:
+            document["comments"].append(dict(zip(COMMENT_FIELDS, row[width:])))
+    if document is not None:
+        yield document
+
+
+def dump_ndjson(documents: list[dict], header: bool = False) -> bytes:
+    return b"".join(
+        orjson.dumps(document, option=JSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        for document in documents
+    )
+
+
+def dump_csv(documents: list[dict], header: bool = False) -> bytes:
+    """Values as the JSON has them, empty cells for nulls and ``comments`` as a JSON
+    array; ``header`` writes the column names first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_HEADER)
+    for document in documents:
+        values = orjson.loads(orjson.dumps(document, option=JSON_OPTIONS))
+        comments = orjson.dumps(values.pop("comments")).decode()
+        writer.writerow([*("" if value is None else value for value in values.values()), comments])
+    return buffer.getvalue().encode()
+
+
+@dataclass
+class ImportRow:
+    """A row of the upload (1-based, not counting a CSV header): valid or not."""
+
+    row: int
+    item: TicketImport | None = None
+    errors: list[dict[str, Any]] | None = None
+
+
+def parse_error(error_type: str, message: str, loc: tuple = ()) -> dict[str, Any]:
+    """Shaped like pydantic's validation errors."""
+    return {"type": error_type, "loc": loc, "msg": message}
+
+
+def validate_row(row: int, values: Any) -> ImportRow:
+    try:
+        return ImportRow(row, item=TicketImport.model_validate(values))
+    except ValidationError as exc:
+        return ImportRow(
+            row, errors=exc.errors(include_url=False, include_context=False, include_input=False)
+        )
+
+
+async def upload_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Lines of an upload as it arrives, each ending in ``\\n`` but possibly the last."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            yield line + b"\n"
+    if pending:
+        yield pending
+
+
+async def ndjson_rows(lines: AsyncIterator[bytes]) -> AsyncIterator[ImportRow]:
+    """One ``TicketImport`` object per line; blank lines are skipped but counted."""
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            values = orjson.loads(line)
+        except orjson.JSONDecodeError as exc:
+            yield ImportRow(number, errors=[parse_error("json_invalid", str(exc))])
+            continue
+        yield validate_row(number, values)
+
+
+async def csv_rows(lines: AsyncIterator[bytes]) -> AsyncIterator[ImportRow]:
+    """A header naming the columns (``TicketImport`` fields, others are ignored),
+    then one ticket per record. Empty cells are left out, so defaults apply;
+    ``comments`` holds a JSON array."""
+    header = None
+    number = 0
+    record: list[bytes] = []
+    quotes = 0
+    async for line in lines:
+        # A quoted value may contain newlines: the record ends on a line that
+        # leaves the quotes balanced. An escaped quote ("") counts twice.
+        record.append(line)
+        quotes += line.count(b'"')
+        if quotes % 2:
+            continue
+        data = b"".join(record)
+        record, quotes = [], 0
+        if not data.strip():
+            continue
+        if header is None:
+            header = read_csv_header(data)
+            continue
+        number += 1
+        yield csv_row(number, header, data)
+    if record:
+        yield ImportRow(number + 1, errors=[parse_error("csv_invalid", "Unterminated quote")])
+
+
+def read_csv_header(data: bytes) -> list[str]:
+    try:
+        return next(csv.reader([data.decode("utf-8-sig")]))
+    except (UnicodeDecodeError, csv.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid CSV header"
+        ) from None
+
+
+def csv_row(number: int, header: list[str], data: bytes) -> ImportRow:
+    try:
+        values = next(csv.reader([data.decode()]))
+    except (UnicodeDecodeError, csv.Error) as exc:
+        return ImportRow(number, errors=[parse_error("csv_invalid", str(exc))])
+    if len(values) != len(header):
+        message = f"Expected {len(header)} values, got {len(values)}"
+        return ImportRow(number, errors=[parse_error("csv_invalid", message)])
+    fields: dict[str, Any] = {name: value for name, value in zip(header, values) if value != ""}
+    if "comments" in fields:
+        try:
+            fields["comments"] = orjson.loads(fields["comments"])
+        except orjson.JSONDecodeError as exc:
+            return ImportRow(number, errors=[parse_error("json_invalid", str(exc), ("comments",))])
+    return validate_row(number, fields)
+
+
+async def batches(rows: AsyncIterator[ImportRow], size: int) -> AsyncIterator[list[ImportRow]]:
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
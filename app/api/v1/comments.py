@@ -1,52 +1,93 @@
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.serialization import response_columns, rows_response
+from app.api.v1.tickets import ARCHIVED_RESPONSE, ticket_missing
+from app.core.batching import Batcher, BatchQueueFullError
+from app.core.config import settings
+from app.db import bulk
+from app.db.models.archive import ArchivedComment
 from app.db.models.comment import Comment
-from app.db.models.ticket import Ticket
-from app.db.session import get_db
+from app.db.models.event import notify_events_commit
+from app.db.session import get_db, get_read_db, primary_sessions
 from app.schemas.comment import CommentCreate, CommentResponse
 
 router = APIRouter()
 
+comment_batcher = Batcher(
+    bulk.SessionWriter(primary_sessions, bulk.create_comments),
+    window=settings.comment_batch_window_ms / 1000,
+    max_items=settings.comment_batch_max_items,
+    queue_size=settings.comment_batch_queue_size,
+)
+
 
 @router.post(
     "/tickets/{ticket_id}/comments",
     status_code=status.HTTP_201_CREATED,
     response_model=CommentResponse,
+    responses={
+        **ARCHIVED_RESPONSE,
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Comment batch queue is full"},
+    },
 )
-def create_comment(
-    ticket_id: uuid.UUID, comment_data: CommentCreate, db: Session = Depends(get_db)
+async def create_comment(
+    ticket_id: uuid.UUID, comment_data: CommentCreate, db: AsyncSession = Depends(get_db)
 ):
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not ticket:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
-
-    comment = Comment(ticket_id=ticket_id, **comment_data.model_dump())
-    db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    """One ``INSERT … SELECT … RETURNING``: the ticket's existence is checked by the
+    insert. With ``COMMENT_BATCH_ENABLED`` the comment is queued instead and written
+    with those of concurrent requests, in one transaction (``bulk.create_comments``).
+    """
+    values = comment_data.model_dump()
+    if settings.comment_batch_enabled:
+        try:
+            comment = await comment_batcher.submit((ticket_id, values))
+        except BatchQueueFullError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many comments queued",
+                headers={"Retry-After": "1"},
+            ) from None
+    else:
+        comment = await db.run_sync(bulk.create_comment, ticket_id, values)
+        await db.commit()
+    if comment is None:
+        raise await ticket_missing(db, ticket_id)
     return comment
 
 
 @router.get("/tickets/{ticket_id}/comments", response_model=list[CommentResponse])
-def list_comments(ticket_id: uuid.UUID, db: Session = Depends(get_db)):
-    comments = db.query(Comment).filter(Comment.ticket_id == ticket_id).all()
-    return comments
+async def list_comments(ticket_id: uuid.UUID, db: AsyncSession = Depends(get_read_db)):
+    """A ticket's comments, oldest first. A ticket's comments are all in one table:
+    ``archived_comments`` is read only when ``comments`` has none."""
+    for entity in (Comment, ArchivedComment):
+        rows = (
+            await db.execute(
+                select(*response_columns(CommentResponse, entity))
+                .where(entity.ticket_id == ticket_id)
+                .order_by(entity.created_at)
+            )
+        ).all()
+        if rows:
+            break
+    return rows_response(CommentResponse, rows)
 
 
-@router.delete(
-    "/tickets/{ticket_id}/comments/{comment_id}", status_code=status.HTTP_204_NO_CONTENT
-)
-def delete_comment(ticket_id: uuid.UUID, comment_id: uuid.UUID, db: Session = Depends(get_db)):
-    comment = (
-        db.query(Comment)
-        .filter(Comment.id == comment_id, Comment.ticket_id == ticket_id)
-        .first()
-    )
-    if not comment:
+@router.delete("/tickets/{ticket_id}/comments/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_comment(
+    ticket_id: uuid.UUID, comment_id: uuid.UUID, db: AsyncSession = Depends(get_db)
+):
+    deleted = (
+        await db.execute(
+            delete(Comment)
+            .where(Comment.id == comment_id, Comment.ticket_id == ticket_id)
+            .returning(Comment.id)
+        )
+    ).first()
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
-
-    db.delete(comment)
-    db.commit()
+    await db.run_sync(notify_events_commit)
+    await db.commit()
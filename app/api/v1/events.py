@@ -0,0 +1,140 @@
+from contextlib import aclosing
+
+import anyio
+import anyio.abc
+from fastapi import APIRouter, Header, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from prometheus_client import Counter, Gauge
+
+from app.core.config import settings
+from app.core.events import EventFilter, EventHub, InProcessEventBackend, SubscriberOverflowError
+from app.core.instrumentation import REGISTRY
+from app.db.models.event import on_events_commit
+from app.db.models.ticket import Status
+from app.db.outbox import OutboxStore
+from app.db.session import events_sessions
+
+router = APIRouter()
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+EVENTS_PAGE_SIZE = 1000
+# Sent first: how long an EventSource waits before reconnecting, in milliseconds.
+SSE_RETRY = b"retry: 3000\n\n"
+SSE_KEEPALIVE = b": keepalive\n\n"
+SSE_OVERFLOW = b"event: overflow\ndata: {}\n\n"
+# "Try again later"; the client resumes with ?last_event_id.
+WS_CLOSE_OVERFLOW = 1013
+
+hub = EventHub(
+    InProcessEventBackend(),
+    OutboxStore(events_sessions),
+    queue_size=settings.events_queue_size,
+    poll_interval=settings.events_poll_interval_seconds,
+)
+
+SUBSCRIBERS = Gauge(
+    "events_subscribers", "Open change feed streams in this worker", registry=REGISTRY
+)
+SUBSCRIBERS.set_function(lambda: hub.subscribers)
+OVERFLOWS = Counter(
+    "events_overflows",
+    "Change feed streams closed because the client fell too far behind",
+    ["transport"],
+    registry=REGISTRY,
+)
+
+
+@on_events_commit
+def wake_event_hub():
+    hub.notify()
+
+
+def sse_frame(event) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event.id, event.type.encode(), event.message)
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {EVENT_STREAM_MEDIA_TYPE: {}}}},
+)
+async def stream_events(
+    assignee: str | None = Query(None),
+    status_filter: Status | None = Query(None, alias="status"),
+    follow: bool = Query(True),
+    last_event_id: int | None = Query(None, ge=0),
+    limit: int = Query(EVENTS_PAGE_SIZE, ge=1, le=EVENTS_PAGE_SIZE),
+    last_event_id_header: int | None = Header(None, alias="Last-Event-ID", ge=0),
+):
+    """Ticket and comment changes as Server-Sent Events, oldest first.
+
+    Each event's ``id`` is its position in the outbox. Reconnecting with
+    ``Last-Event-ID`` (as ``EventSource`` does) or ``?last_event_id=`` replays
+    everything after it before going live; without either the stream starts now.
+    With ``follow=false`` at most ``limit`` stored events are sent and the response
+    ends, for clients that poll.
+    """
+    event_filter = EventFilter(assignee, status_filter.value if status_filter else None)
+    after = last_event_id_header if last_event_id_header is not None else last_event_id
+
+    async def replay():
+        async with aclosing(hub.replay(event_filter, after or 0, limit=limit)) as batches:
+            async for batch in batches:
+                yield b"".join(sse_frame(event) for event in batch)
+
+    async def follow_events():
+        yield SSE_RETRY
+        stream = hub.stream(event_filter, after, settings.events_keepalive_seconds)
+        async with aclosing(stream) as batches:
+            try:
+                async for batch in batches:
+                    if not batch:
+                        yield SSE_KEEPALIVE
+                        continue
+                    yield b"".join(sse_frame(event) for event in batch)
+            except SubscriberOverflowError:
+                OVERFLOWS.labels("sse").inc()
+                yield SSE_OVERFLOW
+
+    return StreamingResponse(
+        follow_events() if follow else replay(),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        # Proxies must pass events through as they come.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/events/ws")
+async def events_websocket(
+    websocket: WebSocket,
+    assignee: str | None = Query(None),
+    status_filter: Status | None = Query(None, alias="status"),
+    last_event_id: int | None = Query(None, ge=0),
+):
+    """The same feed over a WebSocket, one JSON text message per event."""
+    event_filter = EventFilter(assignee, status_filter.value if status_filter else None)
+    await websocket.accept()
+
+    async def forward(tasks: anyio.abc.TaskGroup):
+        stream = hub.stream(event_filter, last_event_id, settings.events_keepalive_seconds)
+        try:
+            async with aclosing(stream) as batches:
+                async for batch in batches:
+                    for event in batch:
+                        await websocket.send_text(event.message.decode())
+        except SubscriberOverflowError:
+            OVERFLOWS.labels("websocket").inc()
+            await websocket.close(WS_CLOSE_OVERFLOW, "Too far behind; resume with last_event_id")
+        except WebSocketDisconnect:
+            pass
+        tasks.cancel_scope.cancel()
+
+    async def until_disconnected(tasks: anyio.abc.TaskGroup):
+        # The client never sends anything, but its close must end the stream.
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+        tasks.cancel_scope.cancel()
+
+    async with anyio.create_task_group() as tasks:
+        tasks.start_soon(forward, tasks)
+        tasks.start_soon(until_disconnected, tasks)
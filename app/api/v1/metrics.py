@@ -1,34 +1,240 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from collections.abc import Mapping
+from datetime import UTC, date, datetime, timedelta
 
-from app.db.models.ticket import Status, Ticket
-from app.db.session import get_db
-from app.schemas.metric import MetricsResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import (
+    CacheEntry,
+    LRUCacheBackend,
+    ReadThroughCache,
+    SingleFlight,
+    etag_matches,
+    strong_etag,
+)
+from app.core.config import settings
+from app.core.sketch import quantiles
+from app.db.aggregates import (
+    FlowBucket,
+    StatusTotals,
+    aggregate_group_totals,
+    bucket_start,
+    empty_status_totals,
+    metric_counter_totals,
+    read_flow_timeseries,
+)
+from app.db.changes import TicketChange, on_ticket_commit
+from app.db.models.metric import UNASSIGNED
+from app.db.models.ticket import Priority, Status
+from app.db.session import get_metrics_db, metrics_sessions, open_session
+from app.schemas.metric import (
+    FlowPoint,
+    FlowSeries,
+    GroupedMetricsResponse,
+    MetricsGroup,
+    MetricsResponse,
+    TimeseriesBucket,
+    TimeseriesGroup,
+    TimeseriesResponse,
+)
 
 router = APIRouter()
 
+DEFAULT_TIMESERIES_DAYS = 30
+MAX_TIMESERIES_POINTS = 366
+BUCKET_DAYS = {"day": 1, "week": 7}
+TIME_TO_CLOSE_QUANTILES = (0.5, 0.9, 0.99)
+# The ticket fields grouped, filtered or counted by ``GET /metrics``.
+METRIC_FIELDS = ("assignee", "priority", "status", "created_at", "closed_at")
+
+metrics_cache = ReadThroughCache(
+    LRUCacheBackend(settings.metrics_cache_max_entries, settings.metrics_cache_ttl_seconds)
+)
+metrics_flight = SingleFlight()
+
+
+@on_ticket_commit
+def invalidate_metrics_cache(changes: list[TicketChange]):
+    # Any group can change, so every entry goes; edits of other fields keep them.
+    if any(
+        change.old is None
+        or change.new is None
+        or any(getattr(change.old, name) != getattr(change.new, name) for name in METRIC_FIELDS)
+        for change in changes
+    ):
+        metrics_cache.clear()
 
-@router.get("/metrics", response_model=MetricsResponse)
-def get_metrics(db: Session = Depends(get_db)):
-    todo_count = db.query(Ticket).filter(Ticket.status == Status.TODO).count()
-    in_progress_count = db.query(Ticket).filter(Ticket.status == Status.IN_PROGRESS).count()
-    done_count = db.query(Ticket).filter(Ticket.status == Status.DONE).count()
-    total_count = db.query(Ticket).count()
 
-    closed_tickets = db.query(Ticket).filter(Ticket.closed_at.isnot(None)).all()
+def metrics_response(totals: Mapping[Status, StatusTotals]) -> MetricsResponse:
+    closed_count = sum(total.closed_count for total in totals.values())
+    close_seconds_total = sum(total.close_seconds_total for total in totals.values())
 
     avg_time_to_close_hours = None
-    if closed_tickets:
-        total_hours = sum(
-            (ticket.closed_at - ticket.created_at).total_seconds() / 3600
-            for ticket in closed_tickets
-        )
-        avg_time_to_close_hours = total_hours / len(closed_tickets)
+    if closed_count:
+        avg_time_to_close_hours = close_seconds_total / closed_count / 3600
 
     return MetricsResponse(
-        todo_count=todo_count,
-        in_progress_count=in_progress_count,
-        done_count=done_count,
-        total_count=total_count,
+        todo_count=totals[Status.TODO].ticket_count,
+        in_progress_count=totals[Status.IN_PROGRESS].ticket_count,
+        done_count=totals[Status.DONE].ticket_count,
+        total_count=sum(total.ticket_count for total in totals.values()),
         avg_time_to_close_hours=avg_time_to_close_hours,
     )
+
+
+def group_labels(group_by: list[str], group: tuple) -> dict[str, str | None]:
+    labels = {}
+    for name, value in zip(group_by, group, strict=True):
+        if name == "assignee":
+            labels[name] = None if value == UNASSIGNED else value
+        else:
+            labels[name] = value.value
+    return labels
+
+
+def group_order(group: tuple) -> list[str]:
+    return [str(value) for value in group]
+
+
+@router.get(
+    "/metrics",
+    response_model=MetricsResponse | GroupedMetricsResponse,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Not modified"}},
+)
+async def get_metrics(
+    group_by: list[TimeseriesGroup] = Query([]),
+    assignee: str | None = Query(None),
+    priority: Priority | None = Query(None),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_metrics_db),
+):
+    """Totals from ``metric_counters``, or per group and filter from the tickets.
+
+    Without ``group_by`` or filters this sums the counter shards of each status. Otherwise
+    one grouped aggregate over the tickets computes every group at once; its
+    response is cached per ``(group_by, assignee, priority)`` for
+    ``METRICS_CACHE_TTL_SECONDS`` or until a ticket write changes a counted field,
+    and concurrent misses for one key share a single computation, which reads
+    through the metrics pool (``GroupedMetrics``).
+    """
+    if not (group_by or assignee or priority):
+        counters = {
+            row.status: StatusTotals(row.ticket_count, row.closed_count, row.close_seconds_total)
+            for row in await db.execute(metric_counter_totals())
+        }
+        return metrics_response(empty_status_totals() | counters)
+
+    group_by = list(dict.fromkeys(group_by))
+    key = (tuple(group_by), assignee or None, priority)
+    entry = metrics_cache.get(key)
+    if entry is None:
+        entry = await metrics_flight.run(key, lambda: grouped_metrics(key))
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(entry.payload, media_type="application/json", headers=headers)
+
+
+class GroupedMetrics:
+    """Computes the grouped ``GET /metrics`` documents through ``sessions`` of its
+    own: a computation shared through ``metrics_flight`` must not run on the session
+    of the request that started it, which is closed if that client goes away."""
+
+    def __init__(self, sessions: async_sessionmaker | sessionmaker):
+        self.sessions = sessions
+
+    async def __call__(self, key: tuple) -> CacheEntry:
+        group_by, assignee, priority = key
+        generation = metrics_cache.generation
+        async with open_session(self.sessions) as db:
+            totals = await db.run_sync(
+                lambda session: aggregate_group_totals(
+                    session.connection(), group_by, assignee=assignee, priority=priority
+                )
+            )
+        if group_by:
+            document = GroupedMetricsResponse(
+                group_by=list(group_by),
+                groups=[
+                    MetricsGroup(
+                        group=group_labels(group_by, group),
+                        **metrics_response(group_totals).model_dump(),
+                    )
+                    for group, group_totals in sorted(
+                        totals.items(), key=lambda item: group_order(item[0])
+                    )
+                ],
+            )
+        else:
+            document = metrics_response(totals.get((), empty_status_totals()))
+        payload = document.model_dump_json().encode()
+        entry = CacheEntry(payload, strong_etag(payload))
+        metrics_cache.fill(key, entry, generation)
+        return entry
+
+
+grouped_metrics = GroupedMetrics(metrics_sessions)
+
+
+@router.get("/metrics/timeseries", response_model=TimeseriesResponse)
+async def get_metrics_timeseries(
+    start: date | None = Query(None, alias="from"),
+    end: date | None = Query(None, alias="to"),
+    bucket: TimeseriesBucket = "day",
+    group_by: list[TimeseriesGroup] = Query([]),
+    db: AsyncSession = Depends(get_metrics_db),
+):
+    end = end or datetime.now(UTC).date()
+    start = start or end - timedelta(days=DEFAULT_TIMESERIES_DAYS - 1)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="'from' must not be after 'to'"
+        )
+
+    # Whole buckets only: widen the range to the first and last bucket boundaries.
+    step = timedelta(days=BUCKET_DAYS[bucket])
+    start = bucket_start(start, bucket)
+    end = bucket_start(end, bucket) + step - timedelta(days=1)
+    starts = [start + step * i for i in range((end - start) // step + 1)]
+    if len(starts) > MAX_TIMESERIES_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_TIMESERIES_POINTS} buckets per request",
+        )
+
+    group_by = list(dict.fromkeys(group_by))
+    series = await db.run_sync(
+        lambda session: read_flow_timeseries(session.connection(), start, end, bucket, group_by)
+    )
+    if not group_by:
+        series.setdefault((), {})
+
+    def flow_point(day: date, flow: FlowBucket) -> FlowPoint:
+        p50, p90, p99 = (
+            None if seconds is None else seconds / 3600
+            for seconds in quantiles(flow.close_histogram, TIME_TO_CLOSE_QUANTILES)
+        )
+        return FlowPoint(
+            start=day,
+            created_count=flow.created_count,
+            closed_count=flow.closed_count,
+            time_to_close_p50_hours=p50,
+            time_to_close_p90_hours=p90,
+            time_to_close_p99_hours=p99,
+        )
+
+    return TimeseriesResponse(
+        bucket=bucket,
+        start=start,
+        end=end,
+        group_by=group_by,
+        series=[
+            FlowSeries(
+                group=group_labels(group_by, group),
+                points=[flow_point(day, points.get(day, FlowBucket())) for day in starts],
+            )
+            for group, points in sorted(series.items(), key=lambda item: group_order(item[0]))
+        ],
+    )
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.search import search_tickets
+from app.db.session import get_read_db
+from app.schemas.search import SearchHighlights, SearchResult
+
+router = APIRouter()
+
+DEFAULT_SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+MAX_SEARCH_OFFSET = 1000
+
+
+@router.get("/search", response_model=list[SearchResult])
+async def search(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_SEARCH_PAGE_SIZE, ge=1, le=MAX_SEARCH_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    db: AsyncSession = Depends(get_read_db),
+):
+    hits = await db.run_sync(search_tickets, q, limit, offset)
+    return [
+        SearchResult(
+            ticket=hit.ticket,
+            rank=hit.rank,
+            highlights=SearchHighlights(
+                title=hit.title, description=hit.description, comments=hit.comments
+            ),
+        )
+        for hit in hits
+    ]
@@ -1,72 +1,688 @@
+import operator
 import uuid
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+from itertools import chain
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models.ticket import Priority, Status, Ticket
-from app.db.session import get_db
-from app.schemas.ticket import TicketCreate, TicketResponse, TicketUpdate
+from app.api.includes import INCLUDE_DESCRIPTION, embed_includes, select_includes
+from app.api.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NDJSON_MEDIA_TYPE,
+    NEXT_CURSOR_HEADER,
+    SYNC_TOKEN_HEADER,
+    chain_streams,
+    decode_cursor,
+    decode_sync_token,
+    encode_cursor,
+    encode_sync_token,
+    merge_pages,
+    merge_streams,
+    page_key,
+    sorted_page_key,
+    wants_ndjson,
+)
+from app.api.serialization import (
+    dump_row,
+    dump_row_line,
+    json_response,
+    project,
+    response_columns,
+    row_dicts,
+    rows_response,
+    select_fields,
+)
+from app.core.cache import (
+    CacheEntry,
+    LRUCacheBackend,
+    ReadThroughCache,
+    etag_matches,
+    if_match_versions,
+    version_etag,
+)
+from app.core.config import settings
+from app.db import bulk
+from app.db.changes import as_utc, on_ticket_commit
+from app.db.models.archive import (
+    ARCHIVED_DUE_DATE_KEY,
+    ARCHIVED_PRIORITY_RANK,
+    ARCHIVED_STATUS_RANK,
+    ArchivedTicket,
+)
+from app.db.models.ticket import (
+    DUE_DATE_KEY,
+    OPEN,
+    PRIORITY_RANK,
+    STATUS_RANK,
+    Priority,
+    Status,
+    Ticket,
+    unindexed,
+    utc_now,
+)
+from app.db.session import get_db, get_read_db, reads_from_replica
+from app.db.sync import read_ticket_changes
+from app.schemas.ticket import (
+    TicketBatchGet,
+    TicketBatchGetResponse,
+    TicketBulkCreate,
+    TicketBulkDelete,
+    TicketBulkResponse,
+    TicketBulkResult,
+    TicketBulkUpdate,
+    TicketChangesResponse,
+    TicketCreate,
+    TicketFieldsResponse,
+    TicketIncludesResponse,
+    TicketResponse,
+    TicketSort,
+    TicketUpdate,
+)
 
 router = APIRouter()
 
+STREAM_BATCH_SIZE = 500
+NIL_UUID = uuid.UUID(int=0)
+# Read for the cursor and sync token whether or not they are among ``fields``.
+PAGE_KEYS = ("created_at", "id")
+SYNC_KEYS = ("updated_at", "id")
+FIELDS_DESCRIPTION = (
+    "Comma-separated TicketResponse fields to return (id is always included); "
+    "the others are neither read nor sent."
+)
+INCLUDE_ARCHIVED_DESCRIPTION = "Also list archived tickets (closed and moved out of the hot table)."
+SORT_KEYS = {"due_date": DUE_DATE_KEY, "priority": PRIORITY_RANK, "status": STATUS_RANK}
+ARCHIVED_SORT_KEYS = {
+    "due_date": ARCHIVED_DUE_DATE_KEY,
+    "priority": ARCHIVED_PRIORITY_RANK,
+    "status": ARCHIVED_STATUS_RANK,
+}
+SORT_DESCRIPTION = (
+    "created_at (default), due_date (tickets without one last), priority (LOW first) or "
+    "status (TODO first); prefix with - for descending. Ties are ordered by created_at, id."
+)
+OVERDUE_DESCRIPTION = "Only tickets that are not DONE and were due before today (UTC)."
+DUE_WITHIN_DESCRIPTION = (
+    "Only tickets that are not DONE and are due today or within this many days; "
+    "with overdue=true, overdue ones too."
+)
+MAX_DUE_WITHIN_DAYS = 3660
+
+ticket_cache = ReadThroughCache(
+    LRUCacheBackend(settings.ticket_cache_max_entries, settings.ticket_cache_ttl_seconds)
+)
+
+
+@on_ticket_commit
+def invalidate_ticket_cache(changes):
+    ticket_cache.invalidate(*{(change.new or change.old).id for change in changes})
+
 
 @router.post("/tickets", status_code=status.HTTP_201_CREATED, response_model=TicketResponse)
-def create_ticket(ticket_data: TicketCreate, db: Session = Depends(get_db)):
-    ticket = Ticket(**ticket_data.model_dump())
-    db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
+async def create_ticket(
+    ticket_data: TicketCreate, response: Response, db: AsyncSession = Depends(get_db)
+):
+    # One INSERT … RETURNING, as for a bulk create of one.
+    [ticket] = await db.run_sync(bulk.create_tickets, [ticket_data.model_dump()])
+    await db.commit()
+    response.headers["ETag"] = version_etag(ticket.version)
     return ticket
 
 
-@router.get("/tickets", response_model=list[TicketResponse])
-def list_tickets(
+@router.post(
+    "/tickets:bulk", status_code=status.HTTP_201_CREATED, response_model=TicketBulkResponse
+)
+async def bulk_create_tickets(payload: TicketBulkCreate, db: AsyncSession = Depends(get_db)):
+    rows = [item.model_dump() for item in payload.items]
+    tickets = await db.run_sync(bulk.create_tickets, rows)
+    await db.commit()
+    return TicketBulkResponse(
+        results=[
+            TicketBulkResult(
+                index=index,
+                id=ticket.id,
+                status=status.HTTP_201_CREATED,
+                ticket=TicketResponse.model_validate(ticket),
+            )
+            for index, ticket in enumerate(tickets)
+        ]
+    )
+
+
+@router.patch("/tickets:bulk", response_model=TicketBulkResponse)
+async def bulk_update_tickets(payload: TicketBulkUpdate, db: AsyncSession = Depends(get_db)):
+    items = [item.model_dump(exclude_unset=True) for item in payload.items]
+    rows = await db.run_sync(bulk.update_tickets, items)
+    await db.commit()
+    return TicketBulkResponse(
+        results=[
+            TicketBulkResult(index=index, id=item["id"], status=status.HTTP_404_NOT_FOUND)
+            if row is None
+            else TicketBulkResult(
+                index=index,
+                id=item["id"],
+                status=status.HTTP_200_OK,
+                ticket=TicketResponse.model_validate(row),
+            )
+            for index, (item, row) in enumerate(zip(items, rows))
+        ]
+    )
+
+
+@router.delete("/tickets:bulk", response_model=TicketBulkResponse)
+async def bulk_delete_tickets(payload: TicketBulkDelete, db: AsyncSession = Depends(get_db)):
+    deleted = await db.run_sync(bulk.delete_tickets, payload.ids)
+    await db.commit()
+    return TicketBulkResponse(
+        results=[
+            TicketBulkResult(
+                index=index,
+                id=ticket_id,
+                status=status.HTTP_204_NO_CONTENT
+                if ticket_id in deleted
+                else status.HTTP_404_NOT_FOUND,
+            )
+            for index, ticket_id in enumerate(payload.ids)
+        ]
+    )
+
+
+@router.post("/tickets:batchGet", response_model=TicketBatchGetResponse)
+async def batch_get_tickets(
+    payload: TicketBatchGet,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    include: str | None = Query(None, description=INCLUDE_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Many tickets by id from one ``IN`` query, in request order, a repeated id
+    once. Ids not in ``tickets`` are looked up in ``archived_tickets`` with a second
+    one; those in neither are listed under ``missing``. ``fields`` and ``include``
+    apply as on the listing. Only reads, so it is served by the replica."""
+    names = select_fields(TicketResponse, fields)
+    includes = select_includes(include)
+    ids = list(dict.fromkeys(payload.ids))
+    found = {}
+    archived = False
+    for entity in (Ticket, ArchivedTicket):
+        pending = [ticket_id for ticket_id in ids if ticket_id not in found]
+        if not pending:
+            break
+        query = select(*response_columns(TicketResponse, entity, names))
+        rows = (await db.execute(query.where(entity.id.in_(pending)))).all()
+        found.update((row.id, row) for row in rows)
+        archived = bool(rows) and entity is ArchivedTicket
+
+    documents = row_dicts(TicketResponse, [found[i] for i in ids if i in found], names)
+    await embed_includes(db, documents, includes, archived)
+    return json_response(
+        {
+            "tickets": documents,
+            "missing": [ticket_id for ticket_id in ids if ticket_id not in found],
+        }
+    )
+
+
+@router.get(
+    "/tickets",
+    response_model=list[TicketResponse]
+    | list[TicketFieldsResponse]
+    | list[TicketIncludesResponse]
+    | TicketChangesResponse,
+)
+async def list_tickets(
     assignee: str | None = Query(None),
     status_filter: Status | None = Query(None, alias="status"),
     priority: Priority | None = Query(None),
-    db: Session = Depends(get_db),
+    overdue: bool = Query(False, description=OVERDUE_DESCRIPTION),
+    due_within: int | None = Query(
+        None, ge=0, le=MAX_DUE_WITHIN_DAYS, description=DUE_WITHIN_DESCRIPTION
+    ),
+    sort: TicketSort | None = Query(None, description=SORT_DESCRIPTION),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    updated_since: str | None = Query(None),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    include_archived: bool = Query(False, description=INCLUDE_ARCHIVED_DESCRIPTION),
+    include: str | None = Query(None, description=INCLUDE_DESCRIPTION),
+    accept: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    query = db.query(Ticket)
+    """List tickets ordered by ``(created_at, id)``, one keyset page at a time.
+
+    The cursor for the next page is returned in the ``X-Next-Cursor`` header. With
+    ``Accept: application/x-ndjson`` every matching ticket after the cursor is
+    streamed from a server-side cursor instead, one JSON object per line. Rows are
+    selected as ``TicketResponse`` columns and encoded without ORM objects.
+
+    ``sort`` orders by ``due_date``, ``priority`` or ``status`` instead (see
+    ``sorted_ticket_queries``), or newest first. ``overdue`` and ``due_within`` list
+    the open tickets due before today or within that many days, by due date. Every
+    order a list can be read in has an index, also after ``assignee``; other filters
+    are checked on its rows (``list_sort``, ``filter_tickets``).
+
+    A first page of all tickets (no filter or ``include_archived``, in any sort) also
+    carries an ``X-Sync-Token``; passing it back as ``updated_since`` returns only what
+    changed since (see ``ticket_changes``).
+
+    ``fields`` (e.g. ``id,title,status,priority,assignee`` for a board) narrows the
+    SELECT and every ticket returned, in all three forms, to those fields.
+
+    ``include_archived=true`` reads ``archived_tickets`` with the same keyset queries
+    and merges the two ordered results, in any sort, unless ``status`` excludes DONE.
+
+    ``include`` embeds each ticket's comments or comment count in a page, at a
+    fixed number of extra statements (see ``app.api.includes``).
+    """
+    names = select_fields(TicketResponse, fields)
+    includes = select_includes(include)
+    due = due_range(overdue, due_within)
+    filtered = assignee or status_filter or priority or due
+    if updated_since is not None:
+        if filtered or sort or cursor or include_archived or includes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="updated_since takes no filters, sort, cursor, include_archived or include",
+            )
+        return await ticket_changes(db, updated_since, limit or MAX_PAGE_SIZE, names)
+
+    sort = list_sort(sort, status_filter, priority, due)
+    descending = sort.startswith("-")
+    keyed = sort.lstrip("-") in SORT_KEYS
+    cursor_sort = None if sort == "created_at" else sort
+    after = decode_cursor(cursor, cursor_sort, keys=int(keyed)) if cursor else None
+    entities = [Ticket]
+    # Only DONE tickets are ever archived.
+    if include_archived and status_filter in (None, Status.DONE) and due is None:
+        entities.append(ArchivedTicket)
+    # Per table, queries to read one after the other; the tables' rows are merged.
+    if keyed:
+        queries = [
+            sorted_ticket_queries(
+                entity, names, assignee, status_filter, priority, due, sort, after
+            )
+            for entity in entities
+        ]
+    else:
+        queries = [
+            [
+                ticket_list_query(
+                    entity, names, assignee, status_filter, priority, after, due, descending
+                )
+            ]
+            for entity in entities
+        ]
+    key = sorted_page_key if keyed else page_key
+    headers = {}
+    # ``updated_since`` replays every ticket: only a list of them all starts a sync.
+    if not (cursor or filtered or include_archived):
+        headers[SYNC_TOKEN_HEADER] = encode_sync_token(*await sync_horizon(db))
+
+    if wants_ndjson(accept):
+        if includes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="include is not streamed; GET /api/v1/export has tickets with comments",
+            )
+        if limit:
+            queries = [[query.limit(limit) for query in table] for table in queries]
+        streams = [
+            [
+                await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+                for query in table
+            ]
+            for table in queries
+        ]
+        return StreamingResponse(
+            _stream_ndjson(streams, names, limit, key, descending),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=headers,
+        )
+
+    page_size = limit or DEFAULT_PAGE_SIZE
+    pages = [await read_rows(db, table, page_size + 1) for table in queries]
+    rows = pages[0] if len(pages) == 1 else merge_pages(pages, page_size + 1, key, descending)
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        position = (last.sort_key,) if keyed else ()
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            *position, last.created_at, last.id, sort=cursor_sort
+        )
+    if includes:
+        documents = row_dicts(TicketResponse, rows, names)
+        await embed_includes(db, documents, includes, archived=len(entities) > 1)
+        return json_response(documents, headers)
+    return rows_response(TicketResponse, rows, headers, names)
+
+
+def due_range(overdue: bool, due_within: int | None) -> tuple[date | None, date] | None:
+    """The due dates ``overdue`` and ``due_within`` select, ``(first or None, last)``,
+    or ``None`` for a list that does not filter on them. Today is UTC's."""
+    today = datetime.utcnow().date()
+    if due_within is None:
+        return (None, today - timedelta(days=1)) if overdue else None
+    return None if overdue else today, today + timedelta(days=due_within)
+
+
+def list_sort(
+    sort: TicketSort | None,
+    status_filter: Status | None,
+    priority: Priority | None,
+    due: tuple[date | None, date] | None,
+) -> TicketSort:
+    """The order a list is read in: ``sort``, by default by due date for a due date
+    view and by ``created_at`` otherwise.
+
+    A sort on a field that a filter fixes is by ``(created_at, id)``. Every other order
+    has an index, by itself and after ``assignee``, and the other filters are checked
+    on the index's rows (``filter_tickets``).
+    """
+    sort = sort or ("due_date" if due else "created_at")
+    field = sort.lstrip("-")
+    if (field == "status" and status_filter) or (field == "priority" and priority):
+        return "-created_at" if sort.startswith("-") else "created_at"
+    return sort
+
+
+def filter_tickets(
+    query: Select,
+    entity: type[Ticket] | type[ArchivedTicket],
+    assignee: str | None,
+    status_filter: Status | None,
+    priority: Priority | None,
+    due: tuple[date | None, date] | None = None,
+    sort: TicketSort = "created_at",
+) -> Select:
+    """``query`` over the tickets the filters select, for the index ``sort`` reads.
+
+    ``assignee`` leads an index of every sort, and ``status`` and ``priority`` the
+    ``created_at`` ones (0003). Sorted by a ``SORT_KEYS`` key, they are checked on the
+    rows of its index instead of read from their own and sorted. A due date view
+    sorted by due date reads the partial index on open tickets' due dates; in any
+    other order, its range is checked on the rows too.
+    """
+    field = sort.lstrip("-")
+
+    def checked(term):
+        return term if field == "created_at" else unindexed(term)
 
     if assignee:
-        query = query.filter(Ticket.assignee == assignee)
+        query = query.where(entity.assignee == assignee)
     if status_filter:
-        query = query.filter(Ticket.status == status_filter)
+        query = query.where(checked(entity.status) == status_filter)
     if priority:
-        query = query.filter(Ticket.priority == priority)
+        query = query.where(checked(entity.priority) == priority)
+    if due:
+        # Open tickets only, as the partial index on their due dates has it.
+        first, last = due
+        if field == "due_date":
+            is_open, key = OPEN, DUE_DATE_KEY
+        else:
+            is_open, key = unindexed(Ticket.status) != Status.DONE, unindexed(DUE_DATE_KEY)
+        query = query.where(is_open, key <= last)
+        if first:
+            query = query.where(key >= first)
+    return query
 
-    tickets = query.all()
-    return tickets
 
+def ticket_list_query(
+    entity: type[Ticket] | type[ArchivedTicket],
+    fields: Sequence[str],
+    assignee: str | None,
+    status_filter: Status | None,
+    priority: Priority | None,
+    after: tuple[datetime, uuid.UUID] | None,
+    due: tuple[date | None, date] | None = None,
+    descending: bool = False,
+) -> Select:
+    """The keyset listing over ``tickets`` or ``archived_tickets``, which share columns."""
+    query = select(*response_columns(TicketResponse, entity, fields, keys=PAGE_KEYS))
+    query = filter_tickets(query, entity, assignee, status_filter, priority, due)
+    if after:
+        beyond = operator.lt if descending else operator.gt
+        query = query.where(beyond(tuple_(entity.created_at, entity.id), after))
+    return query.order_by(*in_order([entity.created_at, entity.id], descending))
 
-@router.get("/tickets/{ticket_id}", response_model=TicketResponse)
-def get_ticket(ticket_id: uuid.UUID, db: Session = Depends(get_db)):
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not ticket:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
-    return ticket
 
+def sorted_ticket_queries(
+    entity: type[Ticket] | type[ArchivedTicket],
+    fields: Sequence[str],
+    assignee: str | None,
+    status_filter: Status | None,
+    priority: Priority | None,
+    due: tuple[date | None, date] | None,
+    sort: TicketSort,
+    after: tuple[int | date, datetime, uuid.UUID] | None,
+) -> list[Select]:
+    """The listing in ``(key, created_at, id)`` order of a ``SORT_KEYS`` sort over
+    ``tickets`` or ``archived_tickets``, as queries to read one after the other.
 
-@router.patch("/tickets/{ticket_id}", response_model=TicketResponse)
-def update_ticket(ticket_id: uuid.UUID, ticket_data: TicketUpdate, db: Session = Depends(get_db)):
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not ticket:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
+    After a cursor, these are the rest of the cursor's key and then the keys past
+    it, each a range of the key's index. SQLite seeks an index on an expression to
+    the key, but not to a row value ``(key, created_at, id)``: in one query it would
+    read the cursor's key, all tickets of one priority say, from its first row.
+    """
+    descending = sort.startswith("-")
+    key = (SORT_KEYS if entity is Ticket else ARCHIVED_SORT_KEYS)[sort.lstrip("-")]
+    columns = response_columns(TicketResponse, entity, fields, keys=PAGE_KEYS)
+    query = select(*columns, key.label("sort_key"))
+    query = filter_tickets(query, entity, assignee, status_filter, priority, due, sort)
+    # A constant key, the status rank of archived tickets, orders nothing.
+    ranked = [] if key is ARCHIVED_STATUS_RANK else [key]
+    order = in_order([*ranked, entity.created_at, entity.id], descending)
+    if after is None:
+        return [query.order_by(*order)]
+    after_key, *position = after
+    beyond = operator.lt if descending else operator.gt
+    return [
+        query.where(
+            key == after_key, beyond(tuple_(entity.created_at, entity.id), tuple(position))
+        ).order_by(*order[-2:]),
+        query.where(beyond(key, after_key)).order_by(*order),
+    ]
 
-    update_data = ticket_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(ticket, field, value)
 
-    db.commit()
-    db.refresh(ticket)
-    return ticket
+async def read_rows(db: AsyncSession, queries: Sequence[Select], limit: int) -> list[Row]:
+    """Up to ``limit`` rows of ``queries``, one query after the other until there are
+    enough."""
+    rows = []
+    for query in queries:
+        rows += (await db.execute(query.limit(limit - len(rows)))).all()
+        if len(rows) == limit:
+            break
+    return rows
+
+
+def in_order(columns: list, descending: bool) -> list:
+    return [column.desc() for column in columns] if descending else columns
 
 
-@router.delete("/tickets/{ticket_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_ticket(ticket_id: uuid.UUID, db: Session = Depends(get_db)):
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not ticket:
+async def sync_horizon(db: AsyncSession) -> tuple[datetime, uuid.UUID]:
+    """The newest position a sync may resume from: now by the database's clock, which
+    stamps ``updated_at`` and tombstones (``utc_now``), less the time a write may take
+    to commit after stamping them. Changes after it are sent again."""
+    now = await db.scalar(select(utc_now()))
+    return now - timedelta(seconds=settings.sync_overlap_seconds), NIL_UUID
+
+
+async def ticket_changes(
+    db: AsyncSession, updated_since: str, page_size: int, fields: Sequence[str]
+) -> Response:
+    """Tickets written and ids deleted after the ``updated_since`` token, oldest first.
+
+    ``sync_token`` resumes after the last change returned while ``has_more`` is set,
+    and otherwise from ``sync_horizon``. Tokens older than the tombstones kept are
+    refused with 410: the client has to list everything again.
+    """
+    since = decode_sync_token(updated_since)
+    horizon = await sync_horizon(db)
+    expired_before = horizon[0] - timedelta(days=settings.tombstone_retention_days)
+    if as_utc(since[0]) < as_utc(expired_before):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired; list all tickets again",
+        )
+
+    columns = response_columns(TicketResponse, Ticket, fields, keys=SYNC_KEYS)
+    changes = await db.run_sync(
+        lambda session: read_ticket_changes(session.connection(), columns, since, page_size)
+    )
+    if changes.has_more:
+        resume = changes.last
+    else:
+        resume = max(since, horizon, key=lambda key: (as_utc(key[0]), key[1]))
+    return json_response(
+        {
+            "tickets": row_dicts(TicketResponse, changes.tickets, fields),
+            "deleted": changes.deleted,
+            "sync_token": encode_sync_token(*resume),
+            "has_more": changes.has_more,
+        }
+    )
+
+
+async def _stream_ndjson(
+    streams, fields: Sequence[str], limit: int | None, key=page_key, reverse: bool = False
+):
+    """Rows of ``streams``, a list of streams to read one after the other per table,
+    as NDJSON: the tables' rows merged in ``key`` order, or its reverse."""
+    if len(streams) == 1 and len(streams[0]) == 1:
+        async for row in streams[0][0]:
+            yield dump_row_line(TicketResponse, row, fields)
+        return
+    sent = 0
+    try:
+        merged = merge_streams([chain_streams(table) for table in streams], key, reverse)
+        async for row in merged:
+            yield dump_row_line(TicketResponse, row, fields)
+            sent += 1
+            if sent == limit:
+                break
+    finally:
+        # The merge stops reading a stream once the others have supplied ``limit``.
+        for stream in chain.from_iterable(streams):
+            await stream.close()
+
+
+@router.get(
+    "/tickets/{ticket_id}",
+    response_model=TicketResponse | TicketFieldsResponse,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Not modified"}},
+)
+async def get_ticket(
+    ticket_id: uuid.UUID,
+    request: Request,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Serve a ticket from the read-through cache, with its version as a strong ETag.
+
+    A cached ticket whose ETag matches ``If-None-Match`` is answered with 304
+    without touching the database. ``fields`` narrows the document, not the ETag
+    (see ``ticket_fields``). A ticket missing from ``tickets`` is looked up in
+    ``archived_tickets``. Only reads from the primary fill the cache.
+    """
+    names = select_fields(TicketResponse, fields)
+    entry = ticket_cache.get(ticket_id)
+    if len(names) < len(TicketResponse.model_fields):
+        entry = await ticket_fields(db, ticket_id, names, entry)
+    elif entry is None:
+        generation = ticket_cache.generation
+        ticket = await db.get(Ticket, ticket_id) or await db.get(ArchivedTicket, ticket_id)
+        if not ticket:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
+        payload = TicketResponse.model_validate(ticket).model_dump_json().encode()
+        entry = CacheEntry(payload, version_etag(ticket.version))
+        # A lagging replica could put back a version a write just invalidated.
+        if not reads_from_replica(request):
+            ticket_cache.fill(ticket_id, entry, generation)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(entry.payload, media_type="application/json", headers=headers)
+
+
+async def ticket_fields(
+    db: AsyncSession, ticket_id: uuid.UUID, fields: Sequence[str], cached: CacheEntry | None
+) -> CacheEntry:
+    """Just ``fields`` of a ticket: cut from the cached document when there is one,
+    otherwise read as only those columns (and ``version``, for the ETag). Partial
+    documents are not cached."""
+    if cached is not None:
+        return CacheEntry(project(cached.payload, fields), cached.etag)
+    row = None
+    for entity in (Ticket, ArchivedTicket):
+        query = select(*response_columns(TicketResponse, entity, fields, keys=("version",)))
+        row = (await db.execute(query.where(entity.id == ticket_id))).first()
+        if row is not None:
+            break
+    if row is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
+    return CacheEntry(dump_row(TicketResponse, row, fields), version_etag(row.version))
+
+
+ARCHIVED_RESPONSE = {status.HTTP_409_CONFLICT: {"description": "Ticket is archived"}}
+
+
+@router.patch(
+    "/tickets/{ticket_id}",
+    response_model=TicketResponse,
+    responses={
+        **ARCHIVED_RESPONSE,
+        status.HTTP_412_PRECONDITION_FAILED: {"description": "If-Match names another version"},
+    },
+)
+async def update_ticket(
+    ticket_id: uuid.UUID,
+    ticket_data: TicketUpdate,
+    if_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Apply a partial update with a single ``UPDATE … RETURNING`` (``bulk.patch_ticket``).
+
+    With ``If-Match`` (an ``ETag`` from a read) the update only applies to that
+    version; otherwise the answer is 412, with the current ``ETag``, and nothing
+    is written. The response carries the new ``ETag``.
+    """
+    versions = if_match_versions(if_match) if if_match else None
+    values = ticket_data.model_dump(exclude_unset=True)
+    old, new = await db.run_sync(bulk.patch_ticket, ticket_id, values, versions)
+    if old is None:
+        raise await ticket_missing(db, ticket_id)
+    if new is None:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Ticket has changed",
+            headers={"ETag": version_etag(old["version"])},
+        )
+    await db.commit()
+    return Response(
+        TicketResponse.model_validate(new).model_dump_json(),
+        media_type="application/json",
+        headers={"ETag": version_etag(new.version)},
+    )
+
+
+@router.delete(
+    "/tickets/{ticket_id}", status_code=status.HTTP_204_NO_CONTENT, responses=ARCHIVED_RESPONSE
+)
+async def delete_ticket(ticket_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    # A single DELETE … RETURNING; comments are removed by the ON DELETE CASCADE key.
+    deleted = await db.run_sync(bulk.delete_tickets, [ticket_id])
+    if not deleted:
+        raise await ticket_missing(db, ticket_id)
+    await db.commit()
+
 
-    db.delete(ticket)
-    db.commit()
+async def ticket_missing(db: AsyncSession, ticket_id: uuid.UUID) -> HTTPException:
+    """Why a write found no ticket: 409 if it is archived (read-only), else 404."""
+    if await db.get(ArchivedTicket, ticket_id) is not None:
+        return HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Ticket is archived")
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
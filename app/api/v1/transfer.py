@@ -0,0 +1,185 @@
+from contextlib import aclosing
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from prometheus_client import Counter
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import Receive, Scope, Send
+
+from app.api.pagination import NDJSON_MEDIA_TYPE
+from app.api.transfer import (
+    CSV_MEDIA_TYPE,
+    ExportFormat,
+    batches,
+    csv_rows,
+    dump_csv,
+    dump_ndjson,
+    export_documents,
+    export_query,
+    ndjson_rows,
+    upload_lines,
+)
+from app.core.config import settings
+from app.core.instrumentation import REGISTRY, add_rows
+from app.db import bulk
+from app.db.models.archive import ArchivedComment, ArchivedTicket
+from app.db.session import disable_statement_timeout, get_db, get_read_db
+
+router = APIRouter()
+
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_FORMATS = {
+    ExportFormat.NDJSON: (NDJSON_MEDIA_TYPE, dump_ndjson),
+    ExportFormat.CSV: (CSV_MEDIA_TYPE, dump_csv),
+}
+IMPORT_FORMATS = {NDJSON_MEDIA_TYPE: ndjson_rows, CSV_MEDIA_TYPE: csv_rows}
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """A ``StreamingResponse`` sent while the request body is still being read.
+
+    ``StreamingResponse`` waits for a disconnect on ``receive`` as it streams (before
+    ASGI spec 2.4), which would take the upload's own messages. Here the body
+    iterator reads the upload and sees a disconnect there (``ClientDisconnect``).
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+
+IMPORTED_ROWS = Counter(
+    "import_rows",
+    "Rows read by POST /api/v1/import, by outcome (imported or rejected)",
+    ["outcome"],
+    registry=REGISTRY,
+)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, CSV_MEDIA_TYPE: {}}}},
+)
+async def export_tickets(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    limit: int | None = Query(None, ge=1),
+    include_archived: bool = Query(False),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Every ticket (or the first ``limit``) in ``(created_at, id)`` order, each with
+    its comments, as ``TicketExport`` NDJSON lines or CSV rows.
+
+    Streamed from a single server-side cursor over tickets joined to comments, so
+    memory stays flat however large the export. ``include_archived=true`` follows
+    with the archived tickets, in their own ``(created_at, id)`` order, from a
+    second cursor over the archive tables.
+    """
+    media_type, dump = EXPORT_FORMATS[export_format]
+    # The stream lives as long as the client keeps reading, not one statement's worth.
+    await db.run_sync(lambda session: disable_statement_timeout(session.connection()))
+    queries = [export_query()]
+    if include_archived:
+        queries.append(export_query(ArchivedTicket.__table__, ArchivedComment.__table__))
+
+    async def body():
+        header = True
+        batch = []
+        remaining = limit
+        for query in queries:
+            rows = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async with aclosing(export_documents(rows, remaining)) as documents:
+                async for document in documents:
+                    batch.append(document)
+                    if remaining is not None:
+                        remaining -= 1
+                    if len(batch) == EXPORT_BATCH_SIZE:
+                        add_rows(len(batch))
+                        yield dump(batch, header)
+                        header, batch = False, []
+            # A limited export stops reading before the cursor is exhausted.
+            await rows.close()
+            if remaining == 0:
+                break
+        if batch or header:
+            add_rows(len(batch))
+            yield dump(batch, header)
+
+    filename = f"tickets.{export_format.value}"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post(
+    "/import",
+    response_class=UploadStreamingResponse,
+    responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}}},
+        status.HTTP_415_UNSUPPORTED_MEDIA_TYPE: {"description": "Not NDJSON or CSV"},
+    },
+)
+async def import_tickets(
+    request: Request,
+    content_type: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Create tickets and their comments from an NDJSON or CSV upload (``Content-Type``
+    ``application/x-ndjson`` or ``text/csv``), in the export's format.
+
+    The body is read as it arrives. Rows are validated one by one against
+    ``TicketCreate``/``CommentCreate`` and loaded ``IMPORT_BATCH_SIZE`` at a time with
+    COPY (Postgres) or an executemany ``INSERT``, each batch in its own transaction.
+    The response has one ``ImportResult`` line per row: 201 with the new id, or 422
+    with the errors of a row that was skipped. Each batch's lines are sent once it
+    commits, and an ``ImportSummary`` line with the totals ends an import that read
+    the whole upload; a response without one was cut short by a failed batch.
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    parse = IMPORT_FORMATS.get(media_type)
+    if parse is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Send {NDJSON_MEDIA_TYPE} or {CSV_MEDIA_TYPE}",
+        )
+
+    pending = batches(parse(upload_lines(request.stream())), settings.import_batch_size)
+    # A bad CSV header is found with the first batch, while a status can still be sent.
+    batch = await anext(pending, None)
+
+    async def body():
+        nonlocal batch
+        imported = rejected = 0
+        async with aclosing(pending):
+            while batch is not None:
+                valid = [row for row in batch if row.item is not None]
+                ids = iter(
+                    await db.run_sync(bulk.import_tickets, [row.item.model_dump() for row in valid])
+                )
+                await db.commit()
+                results = []
+                for row in batch:
+                    if row.item is None:
+                        result = {"row": row.row, "status": 422, "errors": row.errors}
+                    else:
+                        result = {
+                            "row": row.row,
+                            "status": 201,
+                            "id": next(ids),
+                            "comments": len(row.item.comments),
+                        }
+                    results.append(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
+                # Sent as soon as the batch commits, so a later failure cannot lose it.
+                yield b"".join(results)
+                IMPORTED_ROWS.labels("imported").inc(len(valid))
+                IMPORTED_ROWS.labels("rejected").inc(len(batch) - len(valid))
+                imported += len(valid)
+                rejected += len(batch) - len(valid)
+                batch = await anext(pending, None)
+        summary = {"imported": imported, "rejected": rejected}
+        yield orjson.dumps(summary, option=orjson.OPT_APPEND_NEWLINE)
+
+    return UploadStreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,155 @@
+"""Operational commands.
+
+Usage::
+
+    python -m app.cli db upgrade [revision]
+    python -m app.cli db downgrade <revision>
+    python -m app.cli metrics check
+    python -m app.cli metrics rebuild
+    python -m app.cli metrics backfill
+    python -m app.cli events prune [--days N]
+    python -m app.cli tombstones prune [--days N]
+    python -m app.cli tickets archive [--days N] [--batch-size N]
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.db import aggregates, archive, migrate, outbox, sync
+from app.db.models import Comment, Ticket  # noqa: F401
+from app.db.session import disable_statement_timeout, engine
+
+
+def db_upgrade(args: argparse.Namespace) -> int:
+    migrate.upgrade(revision=args.revision)
+    return 0
+
+
+def db_downgrade(args: argparse.Namespace) -> int:
+    migrate.downgrade(args.revision)
+    return 0
+
+
+def metrics_check(args: argparse.Namespace) -> int:
+    with engine.begin() as connection:
+        disable_statement_timeout(connection)
+        drift = aggregates.check_metric_counters(connection)
+
+    if not drift:
+        print("metric counters are consistent")
+        return 0
+    for status, (stored, actual) in drift.items():
+        print(f"{status.value}: stored={stored} actual={actual}")
+    return 1
+
+
+def metrics_rebuild(args: argparse.Namespace) -> int:
+    with engine.begin() as connection:
+        disable_statement_timeout(connection)
+        aggregates.rebuild_metric_counters(connection)
+    print("metric counters rebuilt")
+    return 0
+
+
+def metrics_backfill(args: argparse.Namespace) -> int:
+    with engine.begin() as connection:
+        disable_statement_timeout(connection)
+        aggregates.rebuild_metric_rollups(connection)
+    print("metric rollups rebuilt")
+    return 0
+
+
+def events_prune(args: argparse.Namespace) -> int:
+    before = datetime.utcnow() - timedelta(days=args.days)
+    with engine.begin() as connection:
+        disable_statement_timeout(connection)
+        pruned = outbox.prune_events(connection, before)
+    print(f"pruned {pruned} events recorded before {before:%Y-%m-%d %H:%M} UTC")
+    return 0
+
+
+def tombstones_prune(args: argparse.Namespace) -> int:
+    before = datetime.utcnow() - timedelta(days=args.days)
+    with engine.begin() as connection:
+        disable_statement_timeout(connection)
+        pruned = sync.prune_tombstones(connection, before)
+    print(f"pruned {pruned} tombstones recorded before {before:%Y-%m-%d %H:%M} UTC")
+    return 0
+
+
+def tickets_archive(args: argparse.Namespace) -> int:
+    before = datetime.utcnow() - timedelta(days=args.days)
+    archived = 0
+    # One short transaction per batch: locks are held for a batch, not the whole run.
+    while True:
+        with engine.begin() as connection:
+            moved = archive.archive_batch(connection, before, args.batch_size)
+        if not moved:
+            break
+        archived += len(moved)
+    print(f"archived {archived} tickets closed before {before:%Y-%m-%d %H:%M} UTC")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    db = commands.add_parser("db", help="Schema migrations")
+    db_commands = db.add_subparsers(dest="action", required=True)
+    upgrade = db_commands.add_parser("upgrade", help="Apply migrations")
+    upgrade.add_argument("revision", nargs="?", default="head")
+    upgrade.set_defaults(func=db_upgrade)
+    downgrade = db_commands.add_parser("downgrade", help="Revert migrations")
+    downgrade.add_argument("revision")
+    downgrade.set_defaults(func=db_downgrade)
+
+    metrics = commands.add_parser("metrics", help="Ticket metric counters")
+    metrics_commands = metrics.add_subparsers(dest="action", required=True)
+    metrics_commands.add_parser(
+        "check", help="Compare counters with the tickets table"
+    ).set_defaults(func=metrics_check)
+    metrics_commands.add_parser(
+        "rebuild", help="Recompute counters from the tickets table"
+    ).set_defaults(func=metrics_rebuild)
+    metrics_commands.add_parser(
+        "backfill", help="Recompute the daily rollups and time-to-close histograms"
+    ).set_defaults(func=metrics_backfill)
+
+    events = commands.add_parser("events", help="Change feed outbox")
+    events_commands = events.add_subparsers(dest="action", required=True)
+    prune = events_commands.add_parser(
+        "prune", help="Delete events older than the retention period"
+    )
+    prune.add_argument("--days", type=int, default=settings.events_retention_days)
+    prune.set_defaults(func=events_prune)
+
+    tombstones = commands.add_parser("tombstones", help="Deleted-ticket records for sync")
+    tombstones_commands = tombstones.add_subparsers(dest="action", required=True)
+    prune = tombstones_commands.add_parser(
+        "prune", help="Delete tombstones older than the retention period"
+    )
+    prune.add_argument("--days", type=int, default=settings.tombstone_retention_days)
+    prune.set_defaults(func=tombstones_prune)
+
+    tickets = commands.add_parser("tickets", help="Ticket storage")
+    tickets_commands = tickets.add_subparsers(dest="action", required=True)
+    archive_parser = tickets_commands.add_parser(
+        "archive", help="Move tickets closed longer than the archive age out of the hot tables"
+    )
+    archive_parser.add_argument("--days", type=int, default=settings.archive_after_days)
+    archive_parser.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    archive_parser.set_defaults(func=tickets_archive)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
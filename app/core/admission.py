@@ -0,0 +1,270 @@
+"""Admission control: a concurrency limit per route class, with load shedding.
+
+Every ``/api/`` request is sorted into a class (``read``, ``write``, ``metrics``)
+and has to take one of that class's slots before it reaches the routers; the slot
+is held until the response has been sent, or for a streamed response (no
+``Content-Length``: NDJSON lists, exports) until it starts, so slow readers of a
+stream cannot hold the class's slots. Without a free slot a request waits in a
+queue of at most ``ADMISSION_QUEUE_SIZE`` for ``ADMISSION_QUEUE_TIMEOUT_SECONDS``;
+past either bound it is answered ``503`` with ``Retry-After`` at once, rather than
+adding to the latency of every request already waiting on a slow database.
+
+A class's limit adapts to latency as TCP's congestion window does to loss (AIMD).
+Each route keeps a short- and a long-term moving average of its time to first
+byte; when the short one exceeds the long one by ``ADMISSION_LATENCY_TOLERANCE``,
+the class is past what the database serves well and its limit shrinks by a tenth,
+at most once per round of requests. While the limit is what holds requests back
+and latency is normal, it grows again by one per limit's worth of completions, up
+to the configured maximum.
+
+``GET /``, ``/internal/*`` and the change feed (long-lived streams on a pool of
+their own) are not limited. Limits, slots in use, queue depths and shed requests
+are exported as Prometheus metrics (``docs/observability.md``).
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.consistency import READ_ONLY_SUFFIXES, SAFE_METHODS
+from app.core.instrumentation import REGISTRY, UNMATCHED_ROUTE, route_template
+
+LIMITED_PREFIX = "/api/"
+UNLIMITED_PREFIXES = ("/api/v1/events",)
+METRICS_PREFIX = "/api/v1/metrics"
+# Moving average weights per sample: the short-term one follows the last tens of
+# requests of a route, the long-term one its last thousand or so.
+SHORT_WEIGHT = 0.1
+LONG_WEIGHT = 0.002
+BACKOFF = 0.9
+
+ADMISSION_SHED = Counter(
+    "http_admission_shed",
+    "Requests answered 503 by admission control",
+    ["route_class", "reason"],
+    registry=REGISTRY,
+)
+ADMISSION_WAIT = Histogram(
+    "http_admission_wait_seconds",
+    "Time admitted requests waited in the queue for a slot",
+    ["route_class"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+    registry=REGISTRY,
+)
+
+
+def route_class(scope: Scope) -> str | None:
+    """The limiter a request goes through, or ``None`` for one that is not limited."""
+    path = scope["path"]
+    if not path.startswith(LIMITED_PREFIX) or path.startswith(UNLIMITED_PREFIXES):
+        return None
+    if path.startswith(METRICS_PREFIX):
+        return "metrics"
+    if scope["method"] in SAFE_METHODS or path.endswith(READ_ONLY_SUFFIXES):
+        return "read"
+    return "write"
+
+
+@dataclass
+class Latency:
+    """A route's time to first byte, short- and long-term."""
+
+    short: float
+    long: float
+
+    def observe(self, seconds: float) -> None:
+        self.short += (seconds - self.short) * SHORT_WEIGHT
+        self.long += (seconds - self.long) * LONG_WEIGHT
+
+
+class Limiter:
+    """Slots for one route class, a FIFO queue for them and an adaptive limit
+    between ``minimum`` and ``maximum``."""
+
+    def __init__(
+        self,
+        maximum: int,
+        minimum: int,
+        queue_size: int,
+        queue_timeout: float,
+        tolerance: float,
+    ):
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.tolerance = tolerance
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self.latencies: dict[str, Latency] = {}
+        self._waiters: deque[asyncio.Future] = deque()
+        self._decreased_at = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _has_slot(self) -> bool:
+        return self.in_flight < max(int(self.limit), 1)
+
+    async def acquire(self) -> str | None:
+        """Take a slot, waiting for one if need be; or the reason none was given."""
+        if self._has_slot() and not self._waiters:
+            self.in_flight += 1
+            return None
+        if len(self._waiters) >= self.queue_size:
+            return "queue_full"
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except TimeoutError:
+            return "timeout"
+        except asyncio.CancelledError:
+            # The client went away; a slot handed over in the meantime is passed on.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        return None
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and self._has_slot():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot is the waiter's from now, before its task resumes.
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def observe(self, route: str, started: float, responded: float) -> None:
+        """Adapt the limit to a request admitted at ``started`` whose response began
+        at ``responded`` (``time.monotonic``)."""
+        seconds = responded - started
+        latency = self.latencies.get(route)
+        if latency is None:
+            self.latencies[route] = Latency(seconds, seconds)
+            return
+        latency.observe(seconds)
+        if latency.short > self.tolerance * latency.long:
+            # Requests admitted before the last decrease saw the old limit.
+            if started > self._decreased_at:
+                self.limit = max(self.limit * BACKOFF, self.minimum)
+                self._decreased_at = responded
+        elif self._waiters or not self._has_slot():
+            self.limit = min(self.limit + 1 / self.limit, self.maximum)
+
+
+def default_limiters() -> dict[str, Limiter]:
+    maximums = {
+        "read": settings.admission_read_limit,
+        "write": settings.admission_write_limit,
+        "metrics": settings.admission_metrics_limit,
+    }
+    return {
+        name: Limiter(
+            maximum,
+            settings.admission_min_limit,
+            settings.admission_queue_size,
+            settings.admission_queue_timeout_seconds,
+            settings.admission_latency_tolerance,
+        )
+        for name, maximum in maximums.items()
+    }
+
+
+class AdmissionCollector(Collector):
+    """Reads each limiter's state at scrape time."""
+
+    def __init__(self, limiters: dict[str, Limiter]):
+        self.limiters = limiters
+
+    def collect(self):
+        limit = GaugeMetricFamily(
+            "http_admission_limit", "Current concurrency limit", labels=["route_class"]
+        )
+        in_flight = GaugeMetricFamily(
+            "http_admission_in_flight", "Requests holding a slot", labels=["route_class"]
+        )
+        queued = GaugeMetricFamily(
+            "http_admission_queue_depth", "Requests waiting for a slot", labels=["route_class"]
+        )
+        for name, limiter in self.limiters.items():
+            limit.add_metric([name], int(limiter.limit))
+            in_flight.add_metric([name], limiter.in_flight)
+            queued.add_metric([name], limiter.queued)
+        yield limit
+        yield in_flight
+        yield queued
+
+
+limiters = default_limiters()
+REGISTRY.register(AdmissionCollector(limiters))
+
+
+def overloaded_response() -> JSONResponse:
+    return JSONResponse(
+        {"detail": "Server overloaded, retry later"},
+        status_code=503,
+        headers={"Retry-After": str(settings.admission_retry_after_seconds)},
+    )
+
+
+def is_sized(start: Message) -> bool:
+    """Whether an ``http.response.start`` announces a body that is already complete."""
+    return any(name.lower() == b"content-length" for name, _ in start.get("headers", []))
+
+
+class AdmissionMiddleware:
+    """Applies the limiter of each request's class, while ``settings.admission_enabled``."""
+
+    def __init__(self, app: ASGIApp, limiters: dict[str, Limiter] = limiters):
+        self.app = app
+        self.limiters = limiters
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = route_class(scope) if scope["type"] == "http" else None
+        if name is None or not settings.admission_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[name]
+        queued_at = time.monotonic()
+        reason = await limiter.acquire()
+        if reason is not None:
+            ADMISSION_SHED.labels(name, reason).inc()
+            await overloaded_response()(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        ADMISSION_WAIT.labels(name).observe(started - queued_at)
+        first_byte = None
+        released = False
+
+        async def send_timed(message: Message) -> None:
+            nonlocal first_byte, released
+            if message["type"] == "http.response.start":
+                first_byte = time.monotonic()
+                if not is_sized(message):
+                    limiter.release()
+                    released = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            if not released:
+                limiter.release()
+            route = route_template(scope)
+            if first_byte is not None and route != UNMATCHED_ROUTE:
+                limiter.observe(route, started, first_byte)
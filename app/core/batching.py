@@ -0,0 +1,89 @@
+"""Write coalescing (group commit).
+
+A ``Batcher`` queues items from concurrent requests and hands them to a
+``BatchWriter`` together: a flush takes whatever arrived within ``window`` seconds
+of the first item, or ``max_items`` as soon as that many are waiting, so a burst
+pays for one transaction (and one fsync) instead of one each. Every submitter
+waits for its own result, or for the flush's exception.
+
+Flushes run one at a time from a task started by the first item and finished once
+the queue is empty; items arriving during a flush wait for the next one. At most
+``queue_size`` items wait: beyond that ``submit`` raises ``BatchQueueFullError``
+rather than letting the queue, and the latency of everything in it, grow.
+"""
+
+import asyncio
+from typing import Any, Protocol
+
+
+class BatchWriter(Protocol):
+    async def write(self, items: list[Any]) -> list[Any]:
+        """One result per item, in order; raising fails every item of the batch."""
+        ...
+
+
+class BatchQueueFullError(Exception):
+    pass
+
+
+class Batcher:
+    def __init__(self, writer: BatchWriter, window: float, max_items: int, queue_size: int):
+        self.writer = writer
+        self.window = window
+        self.max_items = max_items
+        self.queue_size = queue_size
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._task: asyncio.Task | None = None
+        self._full: asyncio.Event | None = None
+
+    @property
+    def queued(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, item: Any) -> Any:
+        """Queue ``item`` for the next flush and return its result."""
+        if len(self._pending) >= self.queue_size:
+            raise BatchQueueFullError
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if not self._running(loop):
+            self._full = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        elif len(self._pending) >= self.max_items:
+            self._full.set()
+        return await future
+
+    async def close(self) -> None:
+        """Wait until everything queued has been written."""
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def _running(self, loop: asyncio.AbstractEventLoop) -> bool:
+        return self._task is not None and not self._task.done() and self._task.get_loop() is loop
+
+    async def _run(self) -> None:
+        while self._pending:
+            if len(self._pending) < self.max_items:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.window)
+                except TimeoutError:
+                    pass
+            batch = self._pending[: self.max_items]
+            del self._pending[: self.max_items]
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self.writer.write([item for item, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results, strict=True):
+            # A submitter that was cancelled (the client went away) is still written.
+            if not future.done():
+                future.set_result(result)
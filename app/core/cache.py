@@ -0,0 +1,197 @@
+"""Read-through caching of serialized API payloads.
+
+``ReadThroughCache`` sits in front of a pluggable ``CacheBackend``. The bundled
+``LRUCacheBackend`` is in-process, so each worker holds its own copy; a shared
+backend (e.g. Redis) only needs to implement the same five methods. ``SingleFlight``
+lets concurrent misses for one key share a single computation.
+"""
+
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import asdict, dataclass
+from typing import TypeVar
+
+VERSION_ETAG = re.compile(r'"([0-9]+)"')
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    payload: bytes
+    etag: str
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    size: int = 0
+
+
+def strong_etag(payload: bytes) -> str:
+    return '"' + hashlib.blake2b(payload, digest_size=16).hexdigest() + '"'
+
+
+def version_etag(version: int) -> str:
+    """Strong ETag of a versioned resource: its version. Every representation of one
+    version (a ``fields`` subset, say) shares it, as each has its own URL."""
+    return f'"{version}"'
+
+
+def if_match_versions(if_match: str) -> list[int] | None:
+    """Versions an ``If-Match`` list names (strong comparison, so ``W/`` tags and tags
+    that are not versions match nothing); ``None`` for ``*``, which any version matches."""
+    if if_match.strip() == "*":
+        return None
+    matches = (VERSION_ETAG.fullmatch(tag.strip()) for tag in if_match.split(","))
+    return [int(match[1]) for match in matches if match]
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """``If-None-Match`` uses weak comparison: ``W/`` prefixes are ignored."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: Hashable) -> CacheEntry | None: ...
+
+    @abstractmethod
+    def set(self, key: Hashable, entry: CacheEntry) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    @abstractmethod
+    def stats(self) -> CacheStats: ...
+
+
+class LRUCacheBackend(CacheBackend):
+    """Thread-safe LRU with a per-entry TTL. ``max_entries=0`` disables caching."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, CacheEntry]] = OrderedDict()
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> CacheEntry | None:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self._stats.misses += 1
+                return None
+            expires_at, entry = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry
+
+    def set(self, key: Hashable, entry: CacheEntry) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**{**asdict(self._stats), "size": len(self._entries)})
+
+
+class ReadThroughCache:
+    """Guards fills against racing invalidations.
+
+    Take ``generation`` before reading from the database and pass it to ``fill``;
+    the fill is dropped if any invalidation happened in between, since the row that
+    was read may predate the write that caused it.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable) -> CacheEntry | None:
+        return self.backend.get(key)
+
+    def fill(self, key: Hashable, entry: CacheEntry, generation: int) -> None:
+        with self._lock:
+            if generation == self._generation:
+                self.backend.set(key, entry)
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self.backend.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.backend.clear()
+
+    def stats(self) -> CacheStats:
+        return self.backend.stats()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls per key within one event loop.
+
+    While a call for a key is running, other callers for that key await its result
+    (or exception) instead of starting their own. Nothing is kept once it finishes:
+    caching the result is up to the caller. The call runs as its own task, so a
+    caller that is cancelled does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._forget(key, future))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
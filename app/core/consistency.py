@@ -0,0 +1,61 @@
+"""Read-your-writes for clients of a read replica.
+
+A successful write (any method other than GET, HEAD and OPTIONS answered below
+400, except the read-only ``:batchGet`` custom methods) sets a short-lived cookie
+holding the time until which the client's reads go to the primary, long enough for
+the replica to catch up. It is only set when a replica is configured.
+"""
+
+import math
+import time
+from http.cookies import SimpleCookie
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+PRIMARY_COOKIE = "vt_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# POSTed only because the ids do not fit a URL.
+READ_ONLY_SUFFIXES = (":batchGet",)
+
+
+def wants_primary(connection: HTTPConnection) -> bool:
+    try:
+        return float(connection.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def primary_cookie() -> str:
+    cookie = SimpleCookie()
+    cookie[PRIMARY_COOKIE] = str(round(time.time() + settings.read_your_writes_seconds, 3))
+    cookie[PRIMARY_COOKIE]["max-age"] = math.ceil(settings.read_your_writes_seconds)
+    cookie[PRIMARY_COOKIE]["path"] = "/"
+    cookie[PRIMARY_COOKIE]["httponly"] = True
+    cookie[PRIMARY_COOKIE]["samesite"] = "lax"
+    return cookie.output(header="").strip()
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or scope["path"].endswith(READ_ONLY_SUFFIXES)
+            or not settings.database_replica_url
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append("Set-Cookie", primary_cookie())
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -0,0 +1,317 @@
+"""In-process fan-out of the change feed.
+
+One ``EventHub`` per worker tails the outbox through an ``EventStore`` and hands
+each new event to every matching ``Subscription``, however many SSE or WebSocket
+clients are connected: the outbox is read once per batch, not once per client.
+Resuming (``Last-Event-ID``) and anything older than the hub's cursor is read from
+the store directly.
+
+The pluggable ``EventBackend`` only says *when* to look. The bundled
+``InProcessEventBackend`` is woken by commits in this worker and otherwise polls,
+so writes made by other workers arrive within ``poll_interval``; a shared backend
+(e.g. Postgres ``LISTEN``/``NOTIFY``) only needs to implement ``notify`` and
+``wait``. Delivery always goes through the outbox, so a lost or spurious wake-up
+costs latency, never an event.
+
+Backpressure: every subscription buffers at most ``queue_size`` events. A consumer
+that falls further behind is disconnected (``SubscriberOverflowError``) rather than
+slowing the hub or the other subscribers, and resumes from its last event id.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Protocol
+
+
+@dataclass(frozen=True)
+class HubEvent:
+    id: int
+    type: str
+    assignee: str | None
+    status: str
+    previous_assignee: str | None
+    previous_status: str
+    # The JSON message sent to clients, encoded once for all of them.
+    message: bytes
+
+
+@dataclass(frozen=True)
+class EventFilter:
+    """Events whose ticket matches before or after the change, i.e. tickets entering
+    or leaving the filtered view."""
+
+    assignee: str | None = None
+    status: str | None = None
+
+    def matches(self, event: HubEvent) -> bool:
+        return self._matches(event.assignee, event.status) or self._matches(
+            event.previous_assignee, event.previous_status
+        )
+
+    def _matches(self, assignee: str | None, status: str) -> bool:
+        return (self.assignee is None or assignee == self.assignee) and (
+            self.status is None or status == self.status
+        )
+
+
+class EventStore(Protocol):
+    async def latest_id(self) -> int: ...
+
+    async def read(
+        self,
+        after: int,
+        limit: int,
+        event_filter: EventFilter | None = None,
+        upto: int | None = None,
+    ) -> list[HubEvent]:
+        """Up to ``limit`` events with ``after < id <= upto``, oldest first."""
+        ...
+
+    async def transaction_horizon(self) -> tuple[int, int] | None:
+        """``(xmin, xmax)`` of a current snapshot: every transaction before ``xmin``
+        has ended, none from ``xmax`` on had started. ``None`` where writers commit
+        one at a time (SQLite), so that a hole in the ids can never be filled."""
+        ...
+
+
+class SubscriberOverflowError(Exception):
+    """The subscriber fell more than ``queue_size`` events behind."""
+
+
+class EventBackend(ABC):
+    @abstractmethod
+    def notify(self) -> None:
+        """Events were committed. Called from any thread."""
+
+    @abstractmethod
+    async def wait(self, timeout: float) -> None:
+        """Return once notified, or after ``timeout`` seconds."""
+
+
+class InProcessEventBackend(EventBackend):
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+
+    def notify(self) -> None:
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wakeup.set()
+        else:
+            # Threadpool sessions commit off the event loop.
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def wait(self, timeout: float) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._wakeup = loop, asyncio.Event()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except TimeoutError:
+            pass
+        # Cleared before the hub reads, so a commit landing after the read wakes it again.
+        self._wakeup.clear()
+
+
+class Subscription:
+    def __init__(self, event_filter: EventFilter, queue_size: int, start: int, after: int):
+        self.event_filter = event_filter
+        self.queue_size = queue_size
+        # The hub's cursor when subscribing: anything newer arrives through ``push``.
+        self.start = start
+        # The last event id delivered (or skipped as already seen).
+        self.after = after
+        self.overflowed = False
+        self._pending: deque[HubEvent] = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, events: list[HubEvent]) -> None:
+        if self.overflowed:
+            return
+        self._pending.extend(
+            event for event in events if event.id > self.after and self.event_filter.matches(event)
+        )
+        if len(self._pending) > self.queue_size:
+            self.overflowed = True
+            self._pending.clear()
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> list[HubEvent]:
+        """Everything pending, waiting up to ``timeout`` for something; ``[]`` if nothing came."""
+        if not self._pending and not self.overflowed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except TimeoutError:
+                pass
+        self._ready.clear()
+        if self.overflowed:
+            raise SubscriberOverflowError(f"more than {self.queue_size} events behind")
+        batch = list(self._pending)
+        self._pending.clear()
+        if batch:
+            self.after = batch[-1].id
+        return batch
+
+
+class EventHub:
+    """Runs while anyone is subscribed: started by the first subscriber, stopped
+    when the last one leaves, starting from the newest event each time."""
+
+    def __init__(
+        self,
+        backend: EventBackend,
+        store: EventStore,
+        queue_size: int = 1000,
+        poll_interval: float = 1.0,
+        batch_size: int = 500,
+        gap_timeout: float = 5.0,
+    ):
+        self.backend = backend
+        self.store = store
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        # Ids are taken when a row is inserted but become visible at commit, so a
+        # hole may be a transaction still in flight. While one that was running when
+        # the hole appeared still is, wait at most this long before treating the
+        # hole as rolled back.
+        self.gap_timeout = gap_timeout
+        self.cursor = 0
+        self._subscriptions: set[Subscription] = set()
+        self._task: asyncio.Task | None = None
+        # The missing id, the transaction horizon when it was seen, and when.
+        self._hole: tuple[int, int, float] | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    def notify(self) -> None:
+        self.backend.notify()
+
+    async def subscribe(self, event_filter: EventFilter, after: int | None = None) -> Subscription:
+        """Live events after ``after`` (default: from now) that are newer than the
+        hub's cursor; replay the rest with ``replay(..., upto=subscription.start)``."""
+        await self._start()
+        start = self.cursor
+        subscription = Subscription(
+            event_filter, self.queue_size, start, max(start, after if after is not None else start)
+        )
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+        if not self._subscriptions and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def close(self) -> None:
+        self._subscriptions.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def replay(
+        self,
+        event_filter: EventFilter,
+        after: int,
+        upto: int | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[list[HubEvent]]:
+        """Stored events after ``after``, straight from the store, in batches."""
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = self.batch_size if remaining is None else min(self.batch_size, remaining)
+            batch = await self.store.read(after, size, event_filter, upto)
+            if not batch:
+                return
+            yield batch
+            after = batch[-1].id
+            if remaining is not None:
+                remaining -= len(batch)
+            if len(batch) < size:
+                return
+
+    async def stream(
+        self, event_filter: EventFilter, after: int | None, keepalive: float
+    ) -> AsyncIterator[list[HubEvent]]:
+        """Replay from ``after`` (if given), then follow live events until the caller
+        stops. Yields ``[]`` every ``keepalive`` seconds without events; raises
+        ``SubscriberOverflowError`` when the caller falls behind."""
+        subscription = await self.subscribe(event_filter, after)
+        try:
+            if after is not None and after < subscription.start:
+                async for batch in self.replay(event_filter, after, upto=subscription.start):
+                    yield batch
+            while True:
+                yield await subscription.next_batch(keepalive)
+        finally:
+            self.unsubscribe(subscription)
+
+    def _running(self, loop: asyncio.AbstractEventLoop) -> bool:
+        return self._task is not None and not self._task.done() and self._task.get_loop() is loop
+
+    async def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._running(loop):
+            return
+        latest = await self.store.latest_id()
+        if self._running(loop):
+            return
+        self.cursor = latest
+        self._hole = None
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self.backend.wait(self.poll_interval)
+            await self.poll()
+
+    async def poll(self) -> None:
+        """Read everything new and hand it to the subscribers."""
+        while True:
+            events = await self._contiguous(await self.store.read(self.cursor, self.batch_size))
+            if events:
+                self.cursor = events[-1].id
+                for subscription in list(self._subscriptions):
+                    subscription.push(events)
+            if len(events) < self.batch_size:
+                return
+
+    async def _contiguous(self, events: list[HubEvent]) -> list[HubEvent]:
+        # An empty outbox has no position yet: ids after a prune start wherever
+        # the sequence is.
+        expected = self.cursor + 1 if self.cursor else None
+        for index, event in enumerate(events):
+            if expected is not None and event.id != expected and await self._may_fill(expected):
+                return events[:index]
+            expected = event.id + 1
+        return events
+
+    async def _may_fill(self, hole: int) -> bool:
+        """Whether a transaction that could still commit id ``hole`` is in progress.
+
+        The id was taken before the newer ids around it became visible, so only a
+        transaction running when the hole was first seen can hold it. Once all of
+        those have ended (or none was running) the hole is a rollback or a skipped
+        sequence value, and is passed over at once.
+        """
+        horizon = await self.store.transaction_horizon()
+        if horizon is None:
+            return False
+        oldest_running, next_to_start = horizon
+        if self._hole is None or self._hole[0] != hole:
+            self._hole = (hole, next_to_start, time.monotonic())
+        _, started_before, seen_at = self._hole
+        return oldest_running < started_before and time.monotonic() - seen_at < self.gap_timeout
@@ -0,0 +1,262 @@
+"""Per-request performance instrumentation, exposed in the Prometheus text format.
+
+``InstrumentationMiddleware`` opens a ``RequestStats`` in a context variable for every
+HTTP request. SQLAlchemy engine and pool hooks add each statement's duration and
+rows, and each pool checkout's wait, to whichever request is current, so the work
+is attributed correctly whether it ran on the event loop, in a greenlet or in the
+threadpool (all of which copy the context). When the response is done the totals
+are observed per route template (``/api/v1/tickets/{ticket_id}``, never the concrete
+path, which keeps label cardinality bounded).
+
+The metrics live in their own ``REGISTRY`` and are served by ``GET /internal/metrics``.
+"""
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from prometheus_client import CollectorRegistry, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import URL, Engine, event, make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool, QueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+UNMATCHED_ROUTE = "unmatched"
+QUERY_STARTED = "instrumentation_query_started"
+
+REGISTRY = CollectorRegistry()
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ["method", "route", "status"],
+    registry=REGISTRY,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests routed to an endpoint and not yet answered",
+    ["method", "route"],
+    registry=REGISTRY,
+)
+REQUEST_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "SQL statements sent per request; an executemany counts once",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+    registry=REGISTRY,
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time per request spent executing SQL statements",
+    ["method", "route"],
+    registry=REGISTRY,
+)
+REQUEST_ROWS = Histogram(
+    "http_request_db_rows",
+    "Rows per request loaded or encoded, or affected by INSERT/UPDATE/DELETE",
+    ["method", "route"],
+    buckets=(0, 1, 10, 100, 1_000, 10_000, 100_000),
+    registry=REGISTRY,
+)
+POOL_CHECKOUT_DURATION = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time to obtain a connection from the pool, including any wait for a free one",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    registry=REGISTRY,
+)
+
+
+@dataclass
+class RequestStats:
+    started: float = field(default_factory=time.perf_counter)
+    statements: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+    pool_seconds: float = 0.0
+    route: str | None = None
+
+    def server_timing(self) -> str:
+        total_ms = (time.perf_counter() - self.started) * 1000
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} statements", '
+            f"pool;dur={self.pool_seconds * 1000:.1f}, "
+            f"total;dur={total_ms:.1f}"
+        )
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route that matched, including its router's prefix."""
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    # Routes included with a prefix keep their own, unprefixed path; the prefix is
+    # the part of the concrete path in front of what the route's pattern matches.
+    path = scope["path"]
+    for index, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[index:]):
+            return path[:index] + route.path
+    return route.path
+
+
+async def track_in_flight(connection: HTTPConnection) -> None:
+    """App-level dependency: the route is only known once routing is done.
+
+    WebSocket routes run it too, outside any ``RequestStats``.
+    """
+    stats = current_request.get()
+    if stats is None or stats.route is not None:
+        return
+    stats.route = route_template(connection.scope)
+    REQUESTS_IN_FLIGHT.labels(connection.scope["method"], stats.route).inc()
+
+
+class InstrumentationMiddleware:
+    """Times each HTTP request and records its database totals under its route template.
+
+    With ``settings.server_timing`` the totals so far are also sent to the client in a
+    ``Server-Timing`` header; for streamed responses that is the work done before the
+    first byte.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.server_timing:
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            method = scope["method"]
+            route = stats.route or route_template(scope)
+            if stats.route is not None:
+                REQUESTS_IN_FLIGHT.labels(method, route).dec()
+            REQUEST_DURATION.labels(method, route, str(status_code)).observe(
+                time.perf_counter() - stats.started
+            )
+            REQUEST_STATEMENTS.labels(method, route).observe(stats.statements)
+            REQUEST_DB_DURATION.labels(method, route).observe(stats.db_seconds)
+            REQUEST_ROWS.labels(method, route).observe(stats.rows)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info[QUERY_STARTED] = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    stats.db_seconds += time.perf_counter() - conn.info.pop(QUERY_STARTED)
+    # Drivers report -1 (or, for SELECT, nothing useful) until rows are fetched, so
+    # reads are counted as ORM objects are loaded, or by add_rows, instead.
+    if context.isinsert or context.isupdate or context.isdelete:
+        stats.rows += max(cursor.rowcount, 0)
+
+
+def add_rows(count: int) -> None:
+    """For reads that bypass the ORM, e.g. Core rows encoded straight to JSON."""
+    stats = current_request.get()
+    if stats is not None:
+        stats.rows += count
+
+
+@event.listens_for(Session, "loaded_as_persistent")
+def count_loaded_row(session, instance):
+    add_rows(1)
+
+
+class TimedCheckout:
+    """Pool mixin timing ``connect()``, which blocks while the pool is exhausted."""
+
+    engine_name: str
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            elapsed = time.perf_counter() - started
+            POOL_CHECKOUT_DURATION.labels(self.engine_name).observe(elapsed)
+            stats = current_request.get()
+            if stats is not None:
+                stats.pool_seconds += elapsed
+
+
+def pool_class(url: str | URL, engine_name: str) -> type[Pool]:
+    """The pool class SQLAlchemy would pick for ``url``, with timed checkouts."""
+    url = make_url(url)
+    base = url.get_dialect().get_pool_class(url)
+    return type(f"Timed{base.__name__}", (TimedCheckout, base), {"engine_name": engine_name})
+
+
+class PoolCollector(Collector):
+    """Reads connection counts from each registered engine's pool at scrape time."""
+
+    def __init__(self):
+        self.engines: dict[str, Engine] = {}
+
+    def collect(self):
+        connections = GaugeMetricFamily(
+            "db_pool_connections", "Pooled connections by state", labels=["engine", "state"]
+        )
+        capacity = GaugeMetricFamily(
+            "db_pool_capacity", "Connections the pool may open (size + overflow)", labels=["engine"]
+        )
+        saturation = GaugeMetricFamily(
+            "db_pool_saturation",
+            "Checked-out connections as a share of capacity",
+            labels=["engine"],
+        )
+        for name, engine in self.engines.items():
+            # Only a QueuePool has a bound to saturate; engine.pool is read here
+            # because dispose() replaces it.
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            checked_out = pool.checkedout()
+            limit = pool.size() + max(pool._max_overflow, 0)
+            connections.add_metric([name, "in_use"], checked_out)
+            connections.add_metric([name, "idle"], pool.checkedin())
+            capacity.add_metric([name], limit)
+            saturation.add_metric([name], checked_out / limit if limit else 0.0)
+        yield connections
+        yield capacity
+        yield saturation
+
+
+pool_collector = PoolCollector()
+REGISTRY.register(pool_collector)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Attribute ``engine``'s statements to requests and report its pool as ``name``."""
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    pool_collector.engines[name] = engine
@@ -0,0 +1,49 @@
+"""Mergeable quantile sketch for durations.
+
+Values are counted in logarithmically spaced buckets (as in DDSketch): bucket ``i``
+covers ``(GAMMA**(i-1), GAMMA**i]`` seconds, so any quantile read back is within
+``RELATIVE_ACCURACY`` of a true sample value. Sketches merge by adding counts per
+bucket, which lets stored per-day histograms be combined into any coarser window.
+
+Changing ``RELATIVE_ACCURACY`` changes the bucket boundaries; stored histograms must
+then be rebuilt (``python -m app.cli metrics backfill``), and the ticket triggers,
+which bucket close times in SQL (migration 0014), recreated by a new migration.
+"""
+
+import math
+from collections.abc import Iterable, Mapping
+
+RELATIVE_ACCURACY = 0.02
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+
+
+def bucket_for(seconds: float) -> int:
+    """Bucket index for a duration; anything up to one second falls in bucket 0."""
+    if seconds <= 1.0:
+        return 0
+    return math.ceil(math.log(seconds) / _LOG_GAMMA)
+
+
+def bucket_value(bucket: int) -> float:
+    """Representative duration of a bucket, within ``RELATIVE_ACCURACY`` of its bounds."""
+    return 2 * GAMMA**bucket / (GAMMA + 1)
+
+
+def quantiles(counts: Mapping[int, int], qs: Iterable[float]) -> list[float | None]:
+    """Estimate each quantile in ``qs`` (0–1) from ``{bucket: count}``; ``None`` if empty."""
+    buckets = sorted((bucket, count) for bucket, count in counts.items() if count > 0)
+    total = sum(count for _, count in buckets)
+    if not total:
+        return [None for _ in qs]
+
+    estimates = []
+    for q in qs:
+        rank = q * (total - 1)
+        seen = 0
+        for bucket, count in buckets:
+            seen += count
+            if seen > rank:
+                estimates.append(bucket_value(bucket))
+                break
+    return estimates
@@ -0,0 +1,290 @@
+"""Set-based aggregation over the tickets table.
+
+Used to verify and rebuild the incrementally maintained ``metric_counters`` and
+daily rollups; request handlers read those tables instead of running these
+queries over ``tickets``. Archived tickets (``app.db.archive``) still count, so
+every aggregate reads ``archived_tickets`` as well.
+"""
+
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from sqlalchemy import (
+    Connection,
+    Float,
+    Select,
+    Subquery,
+    delete,
+    func,
+    insert,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.db.changes import TicketChange, TicketSnapshot
+from app.db.models.archive import ArchivedTicket
+from app.db.models.metric import (
+    UNASSIGNED,
+    MetricCloseHistogram,
+    MetricCounter,
+    MetricDaily,
+    daily_rows,
+    histogram_rows,
+    rollup_deltas,
+)
+from app.db.models.ticket import Priority, Status, Ticket
+
+ROLLUP_BACKFILL_BATCH_SIZE = 1000
+
+
+class seconds_between(FunctionElement):  # noqa: N801 - SQL function naming
+    """Elapsed seconds from the first datetime argument to the second."""
+
+    type = Float()
+    name = "seconds_between"
+    inherit_cache = True
+
+
+@compiles(seconds_between, "postgresql")
+def _seconds_between_postgresql(element, compiler, **kw):
+    start, end = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"EXTRACT(EPOCH FROM ({end} - {start}))"
+
+
+@compiles(seconds_between, "sqlite")
+def _seconds_between_sqlite(element, compiler, **kw):
+    start, end = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"((julianday({end}) - julianday({start})) * 86400.0)"
+
+
+@dataclass
+class StatusTotals:
+    ticket_count: int = 0
+    closed_count: int = 0
+    close_seconds_total: float = 0.0
+
+
+def empty_status_totals() -> dict[Status, StatusTotals]:
+    return {status: StatusTotals() for status in Status}
+
+
+def ticket_sources() -> list[Select]:
+    """Every ticket's columns: the hot table's rows, then the archived ones."""
+    tickets = Ticket.__table__
+    archived = ArchivedTicket.__table__
+    return [select(tickets), select(*(archived.c[name] for name in tickets.c.keys()))]
+
+
+def all_tickets() -> Subquery:
+    return union_all(*ticket_sources()).subquery("all_tickets")
+
+
+def lock_tickets(connection: Connection) -> None:
+    """On Postgres, hold off ticket writes (and archiving) until the transaction ends."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("LOCK TABLE tickets, archived_tickets IN SHARE MODE"))
+
+
+def aggregate_status_totals(connection: Connection) -> dict[Status, StatusTotals]:
+    """Compute per-status counts and close-time sums in a single grouped statement."""
+    return aggregate_group_totals(connection, ()).get((), empty_status_totals())
+
+
+def aggregate_group_totals(
+    connection: Connection,
+    group_by: Sequence[str],
+    assignee: str | None = None,
+    priority: Priority | None = None,
+) -> dict[tuple, dict[Status, StatusTotals]]:
+    """Per-status totals for each group of tickets, in a single grouped statement.
+
+    Returns ``{group: {status: StatusTotals}}`` where ``group`` holds the values of
+    the ``group_by`` columns (``assignee``, ``priority``) in order, unassigned
+    tickets under ``UNASSIGNED`` as in the rollups. Only groups with tickets are
+    present; ``assignee`` and ``priority`` restrict the tickets counted.
+    """
+    tickets = all_tickets()
+    columns = {
+        "assignee": func.coalesce(tickets.c.assignee, UNASSIGNED),
+        "priority": tickets.c.priority,
+    }
+    groups = [columns[name] for name in group_by]
+    stmt = select(
+        *groups,
+        tickets.c.status,
+        func.count(),
+        func.count(tickets.c.closed_at),
+        func.coalesce(func.sum(seconds_between(tickets.c.created_at, tickets.c.closed_at)), 0.0),
+    ).group_by(*groups, tickets.c.status)
+    if assignee is not None:
+        stmt = stmt.where(tickets.c.assignee == assignee)
+    if priority is not None:
+        stmt = stmt.where(tickets.c.priority == priority)
+
+    totals: dict[tuple, dict[Status, StatusTotals]] = {}
+    for *group, status, ticket_count, closed_count, close_seconds_total in connection.execute(stmt):
+        totals.setdefault(tuple(group), empty_status_totals())[status] = StatusTotals(
+            ticket_count, closed_count, float(close_seconds_total)
+        )
+    return totals
+
+
+def metric_counter_totals() -> Select:
+    """The stored counters summed over their shards, one row per status."""
+    table = MetricCounter.__table__
+    return select(
+        table.c.status,
+        func.sum(table.c.ticket_count).label("ticket_count"),
+        func.sum(table.c.closed_count).label("closed_count"),
+        func.sum(table.c.close_seconds_total).label("close_seconds_total"),
+    ).group_by(table.c.status)
+
+
+def read_metric_counters(connection: Connection) -> dict[Status, StatusTotals]:
+    totals = empty_status_totals()
+    for row in connection.execute(metric_counter_totals()):
+        totals[row.status] = StatusTotals(
+            row.ticket_count, row.closed_count, row.close_seconds_total
+        )
+    return totals
+
+
+def check_metric_counters(
+    connection: Connection,
+) -> dict[Status, tuple[StatusTotals, StatusTotals]]:
+    """Return ``{status: (stored, actual)}`` for every counter row that has drifted."""
+    stored = read_metric_counters(connection)
+    actual = aggregate_status_totals(connection)
+    drift = {}
+    for status in Status:
+        s, a = stored[status], actual[status]
+        if (
+            s.ticket_count != a.ticket_count
+            or s.closed_count != a.closed_count
+            or abs(s.close_seconds_total - a.close_seconds_total) > 1.0
+        ):
+            drift[status] = (s, a)
+    return drift
+
+
+def rebuild_metric_counters(connection: Connection) -> None:
+    """Replace the counters with freshly aggregated values, one shard per status.
+
+    On Postgres the ticket tables are locked against writes for the duration so no
+    delta can slip in between the aggregate and the replacement.
+    """
+    lock_tickets(connection)
+    actual = aggregate_status_totals(connection)
+    table = MetricCounter.__table__
+    connection.execute(delete(table))
+    connection.execute(
+        insert(table),
+        [
+            {
+                "status": status,
+                "shard": 0,
+                "ticket_count": totals.ticket_count,
+                "closed_count": totals.closed_count,
+                "close_seconds_total": totals.close_seconds_total,
+            }
+            for status, totals in actual.items()
+        ],
+    )
+
+
+def rebuild_metric_rollups(connection: Connection) -> None:
+    """Replace ``metric_daily`` and ``metric_close_histogram`` from the ticket tables.
+
+    Tickets, hot then archived, are streamed in batches through the same delta
+    computation the write path uses, so memory is bounded by the number of
+    (day, assignee, priority) groups rather than tickets.
+    """
+    lock_tickets(connection)
+    daily_table = MetricDaily.__table__
+    histogram_table = MetricCloseHistogram.__table__
+    connection.execute(delete(daily_table))
+    connection.execute(delete(histogram_table))
+
+    daily: Counter = Counter()
+    histogram: Counter = Counter()
+    streaming = connection.execution_options(yield_per=ROLLUP_BACKFILL_BATCH_SIZE)
+    for source in ticket_sources():
+        for rows in streaming.execute(source).partitions():
+            batch_daily, batch_histogram = rollup_deltas(
+                [TicketChange(None, TicketSnapshot.from_row(row)) for row in rows]
+            )
+            daily.update(batch_daily)
+            histogram.update(batch_histogram)
+
+    rows = daily_rows(daily)
+    if rows:
+        connection.execute(insert(daily_table), rows)
+    rows = histogram_rows(histogram)
+    if rows:
+        connection.execute(insert(histogram_table), rows)
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """First day of the ``day`` or ISO ``week`` (Monday-based) bucket containing ``day``."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+@dataclass
+class FlowBucket:
+    created_count: int = 0
+    closed_count: int = 0
+    close_histogram: Counter = field(default_factory=Counter)
+
+
+def read_flow_timeseries(
+    connection: Connection, start: date, end: date, bucket: str, group_by: Sequence[str]
+) -> dict[tuple, dict[date, FlowBucket]]:
+    """Created/closed counts and merged time-to-close sketches from the daily rollups.
+
+    Returns ``{group: {bucket_start: FlowBucket}}`` where ``group`` holds the values
+    of the ``group_by`` columns (``assignee``, ``priority``) in order. Two grouped
+    reads over ``[start, end]``, independent of the number of tickets.
+    """
+    daily_table = MetricDaily.__table__
+    histogram_table = MetricCloseHistogram.__table__
+    series: dict[tuple, dict[date, FlowBucket]] = {}
+
+    def point(day: date, group: tuple) -> FlowBucket:
+        return series.setdefault(group, {}).setdefault(bucket_start(day, bucket), FlowBucket())
+
+    daily_groups = [daily_table.c[name] for name in group_by]
+    for day, *group, created, closed in connection.execute(
+        select(
+            daily_table.c.day,
+            *daily_groups,
+            func.sum(daily_table.c.created_count),
+            func.sum(daily_table.c.closed_count),
+        )
+        .where(daily_table.c.day.between(start, end))
+        .group_by(daily_table.c.day, *daily_groups)
+    ):
+        flow = point(day, tuple(group))
+        flow.created_count += created
+        flow.closed_count += closed
+
+    histogram_groups = [histogram_table.c[name] for name in group_by]
+    for day, *group, sketch_bucket, count in connection.execute(
+        select(
+            histogram_table.c.day,
+            *histogram_groups,
+            histogram_table.c.bucket,
+            func.sum(histogram_table.c.count),
+        )
+        .where(histogram_table.c.day.between(start, end))
+        .group_by(histogram_table.c.day, *histogram_groups, histogram_table.c.bucket)
+    ):
+        point(day, tuple(group)).close_histogram[sketch_bucket] += count
+
+    return series
@@ -0,0 +1,68 @@
+"""Moving closed tickets out of the hot ``tickets`` table.
+
+DONE tickets closed before a cutoff are copied, with their comments, into
+``archived_tickets`` and ``archived_comments`` and deleted from the hot tables, a
+batch per transaction so no lock is held for longer than one batch takes. Reads by
+id fall through to the archive, and lists take ``include_archived=true``.
+
+A move is not a change: the rows are written with Core, so no ``TicketChange`` is
+published, and the triggers on the hot tables skip deletes of rows already copied
+to the archive. Metric counters and rollups keep counting the ticket, and neither
+an event nor a tombstone is recorded. The aggregates in ``app.db.aggregates`` read
+both tables for the same reason.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Connection, DateTime, delete, insert, literal, select
+
+from app.db.models.archive import ArchivedComment, ArchivedTicket
+from app.db.models.comment import Comment
+from app.db.models.ticket import Status, Ticket
+
+tickets_table = Ticket.__table__
+comments_table = Comment.__table__
+archived_tickets_table = ArchivedTicket.__table__
+archived_comments_table = ArchivedComment.__table__
+
+
+def archive_batch(connection: Connection, before: datetime, limit: int) -> list[uuid.UUID]:
+    """Move up to ``limit`` DONE tickets closed before ``before``, oldest first, and
+    return their ids; none left when the list is empty.
+
+    A ticket closes after it is created, so ``created_at < before`` holds for every
+    candidate and bounds the walk of the ``(status, created_at, id)`` index. On
+    Postgres the batch is locked with ``SKIP LOCKED``: a ticket being written is
+    left for the next run rather than waited for.
+    """
+    ids = connection.scalars(
+        select(tickets_table.c.id)
+        .where(
+            tickets_table.c.status == Status.DONE,
+            tickets_table.c.created_at < before,
+            tickets_table.c.closed_at < before,
+        )
+        .order_by(tickets_table.c.created_at, tickets_table.c.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not ids:
+        return []
+
+    archived_at = literal(datetime.utcnow(), DateTime(timezone=True))
+    connection.execute(
+        insert(archived_tickets_table).from_select(
+            [*tickets_table.c.keys(), "archived_at"],
+            select(*tickets_table.c, archived_at).where(tickets_table.c.id.in_(ids)),
+        )
+    )
+    connection.execute(
+        insert(archived_comments_table).from_select(
+            comments_table.c.keys(),
+            select(*comments_table.c).where(comments_table.c.ticket_id.in_(ids)),
+        )
+    )
+    connection.execute(delete(comments_table).where(comments_table.c.ticket_id.in_(ids)))
+    connection.execute(delete(tickets_table).where(tickets_table.c.id.in_(ids)))
+    return list(ids)
@@ -0,0 +1,289 @@
+"""Set-based ticket writes for the bulk endpoints and the single-ticket writes, and
+comment creates, single or coalesced by ``app.core.batching``.
+
+Each function takes a sync ``Session`` (run through ``AsyncSession.run_sync``) and
+issues a fixed number of statements regardless of the number of items; events,
+tombstones and metrics are written by the triggers on the statements themselves.
+The resulting ``TicketChange`` records are published for the commit listeners by
+each function, since Core and ORM bulk statements bypass the mapper events. Every
+statement that changes a ticket also increments its ``version``. Committing is
+left to the caller so a whole batch lands in one transaction.
+"""
+
+import uuid
+from collections.abc import Callable, Collection, Mapping, Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Row, delete, func, insert, literal, null, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.changes import TicketChange, TicketSnapshot, publish_ticket_changes
+from app.db.copy import copy_rows
+from app.db.models.comment import Comment
+from app.db.models.event import notify_events_commit
+from app.db.models.ticket import Status, Ticket, resolve_closed_at, utc_now
+from app.db.session import open_session
+
+tickets_table = Ticket.__table__
+comments_table = Comment.__table__
+
+
+def create_tickets(session: Session, rows: Sequence[dict[str, Any]]) -> list[Ticket]:
+    """Insert all rows with one multi-row INSERT … RETURNING, in input order."""
+    tickets = session.scalars(
+        insert(Ticket).returning(Ticket, sort_by_parameter_order=True), list(rows)
+    ).all()
+    publish_ticket_changes(
+        session, [TicketChange(None, TicketSnapshot.from_row(ticket)) for ticket in tickets]
+    )
+    return list(tickets)
+
+
+def update_tickets(
+    session: Session, items: Sequence[dict[str, Any]]
+) -> list[dict[str, Any] | None]:
+    """Apply partial updates; returns the resulting row for each item, ``None`` if missing.
+
+    Current rows are read (and locked on Postgres) with one SELECT, the updates and
+    ``closed_at`` rule are applied in order in memory, so an id repeated in the
+    batch sees its earlier edits, and the final rows are written back with a
+    single executemany UPDATE by primary key. Their ``updated_at`` is the database's
+    clock (``utc_now``), read once for the batch.
+    """
+    ids = {item["id"] for item in items}
+    current = {
+        row.id: row._asdict()
+        for row in session.execute(
+            select(tickets_table).where(tickets_table.c.id.in_(ids)).with_for_update()
+        )
+    }
+    originals = {ticket_id: dict(row) for ticket_id, row in current.items()}
+
+    now = session.scalar(select(utc_now()))
+    results = []
+    for item in items:
+        row = current.get(item["id"])
+        if row is None:
+            results.append(None)
+            continue
+        row.update(item)
+        row["closed_at"] = resolve_closed_at(row["status"], row["closed_at"], now)
+        row["updated_at"] = now
+        row["version"] += 1
+        results.append(dict(row))
+
+    touched = {item["id"] for item in items} & current.keys()
+    if touched:
+        session.execute(update(Ticket), [current[ticket_id] for ticket_id in touched])
+        publish_ticket_changes(
+            session,
+            [
+                TicketChange(
+                    TicketSnapshot.from_mapping(originals[ticket_id]),
+                    TicketSnapshot.from_mapping(current[ticket_id]),
+                )
+                for ticket_id in touched
+            ],
+        )
+    return results
+
+
+def patch_ticket(
+    session: Session,
+    ticket_id: uuid.UUID,
+    values: Mapping[str, Any],
+    versions: Collection[int] | None = None,
+) -> tuple[Mapping[str, Any] | None, Row | None]:
+    """Apply a partial update as one ``UPDATE … RETURNING``, if the ticket's version is
+    among ``versions`` (any version when ``None``).
+
+    Returns ``(old, new)``: the ticket before and after, ``(old, None)`` when its
+    version did not match and ``(None, None)`` when there is no such ticket. The
+    ``closed_at`` rule is part of the ``SET``.
+
+    On Postgres the pre-update row comes from a ``SELECT … FOR UPDATE`` in a CTE of
+    the same statement, returned beside the new one: a single round trip. Other
+    databases cannot return columns of a joined table, so the row is read first and
+    the update is guarded by the version read, retried if another write got in
+    between.
+    """
+    assignments: dict[str, Any] = {
+        **values,
+        "updated_at": utc_now(),
+        "version": tickets_table.c.version + 1,
+    }
+    if "status" in values:
+        closed_at = tickets_table.c.closed_at
+        assignments["closed_at"] = (
+            func.coalesce(closed_at, assignments["updated_at"])
+            if values["status"] == Status.DONE
+            else null()
+        )
+    connection = session.connection()
+
+    if connection.dialect.name == "postgresql" and values:
+        old = select(tickets_table).where(tickets_table.c.id == ticket_id).with_for_update()
+        old = old.cte("old")
+        statement = (
+            update(tickets_table)
+            .where(tickets_table.c.id == old.c.id)
+            .values(assignments)
+            .returning(*tickets_table.c, *(column.label(f"old_{column.name}") for column in old.c))
+        )
+        if versions is not None:
+            statement = statement.where(tickets_table.c.version.in_(versions))
+        row = connection.execute(statement).first()
+        if row is None:
+            # Missing or another version: read which, off the fast path.
+            current = connection.execute(
+                select(tickets_table).where(tickets_table.c.id == ticket_id)
+            ).first()
+            return (current._asdict() if current else None), None
+        previous = {name: row._mapping[f"old_{name}"] for name in tickets_table.c.keys()}
+        new = row
+    else:
+        while True:
+            current = connection.execute(
+                select(tickets_table).where(tickets_table.c.id == ticket_id).with_for_update()
+            ).first()
+            if current is None:
+                return None, None
+            previous = current._asdict()
+            if versions is not None and current.version not in versions:
+                return previous, None
+            if not values:
+                return previous, current
+            new = connection.execute(
+                update(tickets_table)
+                .where(tickets_table.c.id == ticket_id, tickets_table.c.version == current.version)
+                .values(assignments)
+                .returning(*tickets_table.c)
+            ).first()
+            if new is not None:
+                break
+
+    publish_ticket_changes(
+        session, [TicketChange(TicketSnapshot.from_mapping(previous), TicketSnapshot.from_row(new))]
+    )
+    return previous, new
+
+
+def create_comment(session: Session, ticket_id: uuid.UUID, values: Mapping[str, Any]) -> Row | None:
+    """Insert a comment with one ``INSERT … SELECT … RETURNING`` that selects its
+    ticket, so nothing is inserted (and ``None`` returned) when there is none."""
+    now = datetime.utcnow()
+    row = {**values, "id": uuid.uuid4(), "created_at": now, "updated_at": now}
+    columns = comments_table.c
+    source = select(
+        tickets_table.c.id, *(literal(value, columns[name].type) for name, value in row.items())
+    ).where(tickets_table.c.id == ticket_id)
+    comment = session.execute(
+        insert(comments_table).from_select(["ticket_id", *row], source).returning(*columns)
+    ).first()
+    if comment is not None:
+        notify_events_commit(session)
+    return comment
+
+
+def create_comments(
+    session: Session, items: Sequence[tuple[uuid.UUID, Mapping[str, Any]]]
+) -> list[Row | None]:
+    """Comments on any number of tickets, ``(ticket_id, values)`` each: one SELECT of
+    the distinct tickets (``FOR SHARE`` on Postgres, so none is deleted before the
+    insert) and one multi-row INSERT … RETURNING. The result for an item whose
+    ticket does not exist is ``None``."""
+    ticket_ids = {ticket_id for ticket_id, _ in items}
+    tickets = set(
+        session.scalars(
+            select(tickets_table.c.id)
+            .where(tickets_table.c.id.in_(ticket_ids))
+            .with_for_update(read=True)
+        )
+    )
+    now = datetime.utcnow()
+    rows = [
+        {**values, "ticket_id": ticket_id, "id": uuid.uuid4(), "created_at": now, "updated_at": now}
+        for ticket_id, values in items
+        if ticket_id in tickets
+    ]
+    created = iter(
+        session.execute(
+            insert(comments_table).returning(*comments_table.c, sort_by_parameter_order=True),
+            rows,
+        ).all()
+        if rows
+        else ()
+    )
+    if rows:
+        notify_events_commit(session)
+    return [next(created) if ticket_id in tickets else None for ticket_id, _ in items]
+
+
+class SessionWriter:
+    """A ``BatchWriter`` (``app.core.batching``) running one of these functions over
+    each batch in a transaction of its own."""
+
+    def __init__(
+        self,
+        sessions: async_sessionmaker | sessionmaker,
+        write: Callable[[Session, list[Any]], list[Any]],
+    ):
+        self.sessions = sessions
+        self._write = write
+
+    async def write(self, items: list[Any]) -> list[Any]:
+        async with open_session(self.sessions) as db:
+            results = await db.run_sync(self._write, items)
+            await db.commit()
+        return results
+
+
+def delete_tickets(session: Session, ids: Sequence[uuid.UUID]) -> set[uuid.UUID]:
+    """Delete with one DELETE … RETURNING; comments go with the database cascade."""
+    deleted = session.execute(
+        delete(tickets_table).where(tickets_table.c.id.in_(set(ids))).returning(*tickets_table.c)
+    ).all()
+    publish_ticket_changes(
+        session, [TicketChange(TicketSnapshot.from_row(row), None) for row in deleted]
+    )
+    return {row.id for row in deleted}
+
+
+def import_tickets(session: Session, items: Sequence[dict[str, Any]]) -> list[uuid.UUID]:
+    """Load tickets, each with a ``comments`` list, with ``copy_rows``: one COPY (or
+    executemany) for the tickets and one for the comments. Ids and timestamps are
+    filled in as the column defaults would; returns the new ticket ids in input order.
+    """
+    # COPY takes values only: the database's clock is read once for the batch.
+    now = session.scalar(select(utc_now()))
+    tickets, comments, changes = [], [], []
+    for item in items:
+        values = dict(item)
+        item_comments = values.pop("comments", [])
+        ticket = {
+            **values,
+            "id": uuid.uuid4(),
+            "created_at": now,
+            "closed_at": None,
+            "updated_at": now,
+            "version": 1,
+        }
+        tickets.append(ticket)
+        changes.append(TicketChange(None, TicketSnapshot.from_mapping(ticket)))
+        for comment_values in item_comments:
+            comment = {
+                **comment_values,
+                "id": uuid.uuid4(),
+                "ticket_id": ticket["id"],
+                "created_at": now,
+                "updated_at": now,
+            }
+            comments.append(comment)
+
+    connection = session.connection()
+    copy_rows(connection, tickets_table, tickets)
+    copy_rows(connection, comments_table, comments)
+    publish_ticket_changes(session, changes)
+    return [ticket["id"] for ticket in tickets]
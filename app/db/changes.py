@@ -0,0 +1,104 @@
+"""Propagation of ticket writes to side effects outside the database.
+
+Every write path (ORM flushes as well as Core statements) reports the affected
+tickets as ``TicketChange`` objects. Listeners registered with
+``on_ticket_commit`` receive them once the session's transaction has committed.
+Derived tables (events, tombstones, metric counters and rollups) are kept by
+triggers on the ticket tables instead (migrations 0011–0014), inside the write's own
+statement, so they never drift from the rows they were computed from.
+"""
+
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, fields
+from datetime import UTC, date, datetime
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+if TYPE_CHECKING:
+    from app.db.models.ticket import Priority, Status
+
+
+@dataclass(frozen=True)
+class TicketSnapshot:
+    id: Any
+    title: str
+    description: str | None
+    assignee: str | None
+    priority: "Priority"
+    status: "Status"
+    due_date: date | None
+    created_at: datetime
+    closed_at: datetime | None
+    updated_at: datetime
+    version: int
+
+    @classmethod
+    def from_row(cls, row: Any) -> "TicketSnapshot":
+        """Build a snapshot from an ORM object or a Core row with ticket columns."""
+        return cls(**{f.name: getattr(row, f.name) for f in fields(cls)})
+
+    @classmethod
+    def from_mapping(cls, values: Mapping[str, Any]) -> "TicketSnapshot":
+        return cls(**{f.name: values[f.name] for f in fields(cls)})
+
+    @classmethod
+    def previous(cls, ticket: Any) -> "TicketSnapshot":
+        """State of an ORM ticket before its pending changes were applied."""
+        state = inspect(ticket)
+        values = {}
+        for f in fields(cls):
+            history = state.attrs[f.name].history
+            values[f.name] = history.deleted[0] if history.deleted else getattr(ticket, f.name)
+        return cls(**values)
+
+    @property
+    def close_seconds(self) -> float | None:
+        if self.closed_at is None:
+            return None
+        return (as_utc(self.closed_at) - as_utc(self.created_at)).total_seconds()
+
+
+@dataclass(frozen=True)
+class TicketChange:
+    old: TicketSnapshot | None
+    new: TicketSnapshot | None
+
+
+TicketCommitListener = Callable[[Sequence[TicketChange]], None]
+
+_ticket_commit_listeners: list[TicketCommitListener] = []
+
+_PENDING_KEY = "committed_ticket_changes"
+
+
+def on_ticket_commit(listener: TicketCommitListener) -> TicketCommitListener:
+    _ticket_commit_listeners.append(listener)
+    return listener
+
+
+def publish_ticket_changes(session: Session, changes: Sequence[TicketChange]) -> None:
+    if not changes:
+        return
+    session.info.setdefault(_PENDING_KEY, []).extend(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed_ticket_changes(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        for listener in _ticket_commit_listeners:
+            listener(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_ticket_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def as_utc(value: datetime) -> datetime:
+    """SQLite hands back naive datetimes, Postgres aware ones; compare them as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value
@@ -0,0 +1,74 @@
+"""Loading many rows at once: ``COPY … FROM STDIN`` on Postgres, one executemany
+``INSERT`` elsewhere.
+
+COPY streams every row in a single statement, skipping per-row parsing and
+planning, which makes it several times faster than even a batched ``INSERT`` for
+imports. Like the Core statements in ``app.db.bulk`` it bypasses the mapper events,
+so callers publish their own changes; table triggers (the search documents) still
+fire. The rows go through the session's own DBAPI connection, so they land in its
+transaction.
+"""
+
+import enum
+import io
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Connection, Table, insert
+from sqlalchemy.util import await_only
+
+from app.db.changes import as_utc
+
+
+def copy_rows(connection: Connection, table: Table, rows: Sequence[Mapping[str, Any]]) -> None:
+    """Insert ``rows``, which all have the same keys, into ``table``.
+
+    Only the keys given are written: column defaults that live in Python are not
+    applied by COPY, so callers fill those in themselves.
+    """
+    if not rows:
+        return
+    if connection.dialect.name != "postgresql":
+        connection.execute(insert(table), list(rows))
+        return
+
+    columns = list(rows[0])
+    records = [tuple(copy_value(row[name]) for name in columns) for row in rows]
+    driver_connection = connection.connection.driver_connection
+    if connection.dialect.driver == "asyncpg":
+        # Called through run_sync: await the driver's coroutine on the session's greenlet.
+        await_only(
+            driver_connection.copy_records_to_table(table.name, records=records, columns=columns)
+        )
+        return
+
+    preparer = connection.dialect.identifier_preparer
+    statement = "COPY {} ({}) FROM STDIN".format(
+        preparer.format_table(table), ", ".join(preparer.quote(name) for name in columns)
+    )
+    data = io.StringIO("".join("\t".join(map(copy_text, record)) + "\n" for record in records))
+    with driver_connection.cursor() as cursor:
+        cursor.copy_expert(statement, data)
+
+
+def copy_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        # The columns are timestamptz; naive values are UTC throughout the app.
+        return as_utc(value)
+    return value
+
+
+def copy_text(value: Any) -> str:
+    """A value in COPY's text format."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
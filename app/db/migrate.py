@@ -0,0 +1,58 @@
+"""Versioned schema migrations (Alembic), applied on startup.
+
+Databases created by the old ``create_all()`` startup hook carry the initial
+schema but no ``alembic_version`` table; migrations/env.py stamps them at the
+baseline revision, under the migration lock, before upgrading so nothing is
+created twice.
+"""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Connection, inspect
+
+from app.db.search import is_search_table
+from app.db.session import disable_statement_timeout, engine
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(connection: Connection | None = None) -> Config:
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def include_name(name: str | None, type_: str, parent_names) -> bool:
+    """Autogenerate filter: the search tables are raw DDL with no ORM model."""
+    return not (type_ == "table" and is_search_table(name))
+
+
+def is_legacy_schema(connection: Connection) -> bool:
+    """A ``create_all()`` database: the tables exist but were never versioned."""
+    tables = inspect(connection)
+    return tables.has_table("tickets") and not tables.has_table("alembic_version")
+
+
+def upgrade(connection: Connection | None = None, revision: str = "head") -> None:
+    if connection is None:
+        with engine.begin() as connection:
+            upgrade(connection, revision)
+        return
+
+    disable_statement_timeout(connection)
+    command.upgrade(alembic_config(connection), revision)
+
+
+def downgrade(revision: str, connection: Connection | None = None) -> None:
+    if connection is None:
+        with engine.begin() as connection:
+            downgrade(revision, connection)
+        return
+
+    disable_statement_timeout(connection)
+    command.downgrade(alembic_config(connection), revision)
@@ -0,0 +1,57 @@
+from alembic import context
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.db.migrate import BASELINE_REVISION, include_name, is_legacy_schema
+from app.db.models import Comment, Ticket  # noqa: F401
+from app.db.session import Base
+
+config = context.config
+target_metadata = Base.metadata
+
+# Serialises concurrent upgrades when several workers start at once.
+POSTGRES_MIGRATION_LOCK_ID = 0x76696265
+
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection, target_metadata=target_metadata, include_name=include_name
+    )
+    with context.begin_transaction():
+        if connection.dialect.name == "postgresql":
+            connection.execute(text(f"SELECT pg_advisory_xact_lock({POSTGRES_MIGRATION_LOCK_ID})"))
+        # Checked under the lock, so only the first worker stamps a legacy database.
+        if is_legacy_schema(connection):
+            context.get_context().stamp(context.script, BASELINE_REVISION)
+        context.run_migrations()
+
+
+def run_migrations_offline():
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        literal_binds=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+
+    engine = create_engine(settings.database_url)
+    try:
+        with engine.connect() as connection:
+            run_migrations(connection)
+    finally:
+        engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
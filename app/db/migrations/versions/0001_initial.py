@@ -0,0 +1,49 @@
+"""Initial tickets and comments schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-12-12
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tickets",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("assignee", sa.String(100), nullable=True),
+        sa.Column("priority", sa.Enum("LOW", "MEDIUM", "HIGH", name="priority"), nullable=False),
+        sa.Column("status", sa.Enum("TODO", "IN_PROGRESS", "DONE", name="status"), nullable=False),
+        sa.Column("due_date", sa.Date(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("closed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_table(
+        "comments",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column(
+            "ticket_id",
+            sa.Uuid(),
+            sa.ForeignKey("tickets.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("author", sa.String(100), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("comments")
+    op.drop_table("tickets")
+    sa.Enum(name="status").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="priority").drop(op.get_bind(), checkfirst=True)
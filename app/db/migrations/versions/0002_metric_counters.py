@@ -0,0 +1,68 @@
+"""Per-status metric counters
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+STATUSES = ("TODO", "IN_PROGRESS", "DONE")
+
+CLOSE_SECONDS = {
+    "postgresql": "EXTRACT(EPOCH FROM (closed_at - created_at))",
+    "sqlite": "((julianday(closed_at) - julianday(created_at)) * 86400.0)",
+}
+
+
+def upgrade() -> None:
+    counters = op.create_table(
+        "metric_counters",
+        sa.Column(
+            "status",
+            postgresql.ENUM(*STATUSES, name="status", create_type=False),
+            primary_key=True,
+        ),
+        sa.Column("ticket_count", sa.Integer(), nullable=False),
+        sa.Column("closed_count", sa.Integer(), nullable=False),
+        sa.Column("close_seconds_total", sa.Float(), nullable=False),
+    )
+
+    # Seed from whatever tickets already exist.
+    bind = op.get_bind()
+    close_seconds = CLOSE_SECONDS[bind.dialect.name]
+    totals = {
+        row.status: row
+        for row in bind.execute(
+            sa.text(
+                "SELECT status, count(*) AS ticket_count, count(closed_at) AS closed_count, "
+                f"coalesce(sum({close_seconds}), 0) AS close_seconds_total "
+                "FROM tickets GROUP BY status"
+            )
+        )
+    }
+    op.bulk_insert(
+        counters,
+        [
+            {
+                "status": status,
+                "ticket_count": totals[status].ticket_count if status in totals else 0,
+                "closed_count": totals[status].closed_count if status in totals else 0,
+                "close_seconds_total": (
+                    float(totals[status].close_seconds_total) if status in totals else 0.0
+                ),
+            }
+            for status in STATUSES
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("metric_counters")
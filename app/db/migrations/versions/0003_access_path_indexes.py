@@ -0,0 +1,44 @@
+"""Indexes for ticket filters, keyset ordering and comment lookups
+
+Every ticket index ends in (created_at, id) so a filtered list can be read in
+keyset order straight from the index without a sort.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_tickets_created_at_id", "tickets", ["created_at", "id"]),
+    ("ix_tickets_status_created_at", "tickets", ["status", "created_at", "id"]),
+    (
+        "ix_tickets_status_priority_created_at",
+        "tickets",
+        ["status", "priority", "created_at", "id"],
+    ),
+    ("ix_tickets_assignee_created_at", "tickets", ["assignee", "created_at", "id"]),
+    (
+        "ix_tickets_assignee_status_created_at",
+        "tickets",
+        ["assignee", "status", "created_at", "id"],
+    ),
+    ("ix_tickets_priority_created_at", "tickets", ["priority", "created_at", "id"]),
+    ("ix_comments_ticket_id_created_at", "comments", ["ticket_id", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
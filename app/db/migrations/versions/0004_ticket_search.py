@@ -0,0 +1,258 @@
+"""Full-text search documents for tickets and their comments
+
+Each ticket gets one ``ticket_search`` row holding its title, description and
+comment text. Triggers keep it current on every ticket and comment write, so bulk
+statements and database cascades are covered without application code.
+
+Postgres stores a weighted ``tsvector`` behind a GIN index. SQLite copies the text
+into ``ticket_search`` and indexes it with an external-content FTS5 table.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+POSTGRES_UPGRADE = [
+    """
+    CREATE FUNCTION ticket_search_document(title text, description text, comments text)
+    RETURNS tsvector LANGUAGE sql IMMUTABLE AS $$
+        SELECT setweight(to_tsvector('english', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(comments, '')), 'C')
+    $$
+    """,
+    """
+    CREATE TABLE ticket_search (
+        ticket_id uuid PRIMARY KEY REFERENCES tickets (id) ON DELETE CASCADE,
+        comments text NOT NULL,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX ix_ticket_search_document ON ticket_search USING gin (document)",
+    """
+    INSERT INTO ticket_search (ticket_id, comments, document)
+    SELECT t.id, c.comments, ticket_search_document(t.title, t.description, c.comments)
+    FROM tickets t
+    CROSS JOIN LATERAL (
+        SELECT coalesce(string_agg(content, E'\\n' ORDER BY created_at), '') AS comments
+        FROM comments WHERE ticket_id = t.id
+    ) c
+    """,
+    """
+    CREATE FUNCTION ticket_search_tickets_inserted() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO ticket_search (ticket_id, comments, document)
+        SELECT id, '', ticket_search_document(title, description, '') FROM new_tickets;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER ticket_search_tickets_inserted AFTER INSERT ON tickets
+    REFERENCING NEW TABLE AS new_tickets
+    FOR EACH STATEMENT EXECUTE FUNCTION ticket_search_tickets_inserted()
+    """,
+    """
+    CREATE FUNCTION ticket_search_tickets_updated() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE ticket_search s
+        SET document = ticket_search_document(n.title, n.description, s.comments)
+        FROM new_tickets n JOIN old_tickets o ON o.id = n.id
+        WHERE s.ticket_id = n.id
+          AND (n.title, n.description) IS DISTINCT FROM (o.title, o.description);
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER ticket_search_tickets_updated AFTER UPDATE ON tickets
+    REFERENCING OLD TABLE AS old_tickets NEW TABLE AS new_tickets
+    FOR EACH STATEMENT EXECUTE FUNCTION ticket_search_tickets_updated()
+    """,
+    # New comments are appended to the existing document instead of rebuilding it.
+    """
+    CREATE FUNCTION ticket_search_comments_inserted() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE ticket_search s
+        SET comments = concat_ws(E'\\n', nullif(s.comments, ''), a.content),
+            document = s.document || setweight(to_tsvector('english', a.content), 'C')
+        FROM (
+            SELECT ticket_id, string_agg(content, E'\\n' ORDER BY created_at) AS content
+            FROM new_comments GROUP BY ticket_id
+        ) a
+        WHERE s.ticket_id = a.ticket_id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER ticket_search_comments_inserted AFTER INSERT ON comments
+    REFERENCING NEW TABLE AS new_comments
+    FOR EACH STATEMENT EXECUTE FUNCTION ticket_search_comments_inserted()
+    """,
+    # Joining tickets skips documents whose ticket is being deleted by the cascade.
+    """
+    CREATE FUNCTION ticket_search_comments_removed() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE ticket_search s
+        SET comments = c.comments,
+            document = ticket_search_document(t.title, t.description, c.comments)
+        FROM tickets t
+        CROSS JOIN LATERAL (
+            SELECT coalesce(string_agg(content, E'\\n' ORDER BY created_at), '') AS comments
+            FROM comments WHERE ticket_id = t.id
+        ) c
+        WHERE t.id = s.ticket_id AND s.ticket_id IN (SELECT ticket_id FROM old_comments);
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER ticket_search_comments_deleted AFTER DELETE ON comments
+    REFERENCING OLD TABLE AS old_comments
+    FOR EACH STATEMENT EXECUTE FUNCTION ticket_search_comments_removed()
+    """,
+    """
+    CREATE TRIGGER ticket_search_comments_updated AFTER UPDATE ON comments
+    REFERENCING OLD TABLE AS old_comments
+    FOR EACH STATEMENT EXECUTE FUNCTION ticket_search_comments_removed()
+    """,
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP TRIGGER ticket_search_comments_updated ON comments",
+    "DROP TRIGGER ticket_search_comments_deleted ON comments",
+    "DROP TRIGGER ticket_search_comments_inserted ON comments",
+    "DROP TRIGGER ticket_search_tickets_updated ON tickets",
+    "DROP TRIGGER ticket_search_tickets_inserted ON tickets",
+    "DROP FUNCTION ticket_search_comments_removed()",
+    "DROP FUNCTION ticket_search_comments_inserted()",
+    "DROP FUNCTION ticket_search_tickets_updated()",
+    "DROP FUNCTION ticket_search_tickets_inserted()",
+    "DROP TABLE ticket_search",
+    "DROP FUNCTION ticket_search_document(text, text, text)",
+]
+
+SQLITE_COMMENTS = (
+    "coalesce((SELECT group_concat(content, char(10)) FROM "
+    "(SELECT content FROM comments WHERE ticket_id = {ticket_id} ORDER BY created_at)), '')"
+)
+
+SQLITE_UPGRADE = [
+    """
+    CREATE TABLE ticket_search (
+        id INTEGER PRIMARY KEY,
+        ticket_id CHAR(32) NOT NULL UNIQUE,
+        title TEXT NOT NULL,
+        description TEXT NOT NULL,
+        comments TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE ticket_search_fts USING fts5(
+        title, description, comments,
+        content='ticket_search', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    # Title matches outrank description matches, which outrank comment matches.
+    """
+    INSERT INTO ticket_search_fts (ticket_search_fts, rank)
+    VALUES ('rank', 'bm25(10.0, 4.0, 1.0)')
+    """,
+    """
+    CREATE TRIGGER ticket_search_fts_inserted AFTER INSERT ON ticket_search BEGIN
+        INSERT INTO ticket_search_fts (rowid, title, description, comments)
+        VALUES (NEW.id, NEW.title, NEW.description, NEW.comments);
+    END
+    """,
+    """
+    CREATE TRIGGER ticket_search_fts_deleted AFTER DELETE ON ticket_search BEGIN
+        INSERT INTO ticket_search_fts (ticket_search_fts, rowid, title, description, comments)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description, OLD.comments);
+    END
+    """,
+    """
+    CREATE TRIGGER ticket_search_fts_updated AFTER UPDATE ON ticket_search BEGIN
+        INSERT INTO ticket_search_fts (ticket_search_fts, rowid, title, description, comments)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description, OLD.comments);
+        INSERT INTO ticket_search_fts (rowid, title, description, comments)
+        VALUES (NEW.id, NEW.title, NEW.description, NEW.comments);
+    END
+    """,
+    f"""
+    INSERT INTO ticket_search (ticket_id, title, description, comments)
+    SELECT id, title, coalesce(description, ''), {SQLITE_COMMENTS.format(ticket_id="tickets.id")}
+    FROM tickets
+    """,
+    """
+    CREATE TRIGGER ticket_search_tickets_inserted AFTER INSERT ON tickets BEGIN
+        INSERT INTO ticket_search (ticket_id, title, description, comments)
+        VALUES (NEW.id, NEW.title, coalesce(NEW.description, ''), '');
+    END
+    """,
+    """
+    CREATE TRIGGER ticket_search_tickets_updated AFTER UPDATE OF title, description ON tickets
+    BEGIN
+        UPDATE ticket_search SET title = NEW.title, description = coalesce(NEW.description, '')
+        WHERE ticket_id = NEW.id;
+    END
+    """,
+    # BEFORE, so the document is gone by the time the comment cascade runs and the
+    # per-comment triggers below have nothing to rebuild.
+    """
+    CREATE TRIGGER ticket_search_tickets_deleted BEFORE DELETE ON tickets BEGIN
+        DELETE FROM ticket_search WHERE ticket_id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER ticket_search_comments_inserted AFTER INSERT ON comments BEGIN
+        UPDATE ticket_search
+        SET comments = CASE WHEN comments = '' THEN NEW.content
+                            ELSE comments || char(10) || NEW.content END
+        WHERE ticket_id = NEW.ticket_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER ticket_search_comments_deleted AFTER DELETE ON comments BEGIN
+        UPDATE ticket_search SET comments = {SQLITE_COMMENTS.format(ticket_id="OLD.ticket_id")}
+        WHERE ticket_id = OLD.ticket_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER ticket_search_comments_updated AFTER UPDATE OF content ON comments BEGIN
+        UPDATE ticket_search SET comments = {SQLITE_COMMENTS.format(ticket_id="NEW.ticket_id")}
+        WHERE ticket_id = NEW.ticket_id;
+    END
+    """,
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER ticket_search_comments_updated",
+    "DROP TRIGGER ticket_search_comments_deleted",
+    "DROP TRIGGER ticket_search_comments_inserted",
+    "DROP TRIGGER ticket_search_tickets_deleted",
+    "DROP TRIGGER ticket_search_tickets_updated",
+    "DROP TRIGGER ticket_search_tickets_inserted",
+    "DROP TABLE ticket_search_fts",
+    "DROP TABLE ticket_search",
+]
+
+UPGRADE = {"postgresql": POSTGRES_UPGRADE, "sqlite": SQLITE_UPGRADE}
+DOWNGRADE = {"postgresql": POSTGRES_DOWNGRADE, "sqlite": SQLITE_DOWNGRADE}
+
+
+def upgrade() -> None:
+    for statement in UPGRADE[op.get_bind().dialect.name]:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in DOWNGRADE[op.get_bind().dialect.name]:
+        op.execute(statement)
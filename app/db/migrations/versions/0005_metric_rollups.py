@@ -0,0 +1,102 @@
+"""Daily flow rollups and time-to-close histograms
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from collections import Counter
+from datetime import UTC
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from app.core.sketch import bucket_for
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+PRIORITIES = ("LOW", "MEDIUM", "HIGH")
+
+
+def as_utc(value):
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value.astimezone(UTC)
+
+
+def upgrade() -> None:
+    def group_columns():
+        return [
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("assignee", sa.String(100), primary_key=True),
+            sa.Column(
+                "priority",
+                postgresql.ENUM(*PRIORITIES, name="priority", create_type=False),
+                primary_key=True,
+            ),
+        ]
+
+    daily_table = op.create_table(
+        "metric_daily",
+        *group_columns(),
+        sa.Column("created_count", sa.Integer(), nullable=False),
+        sa.Column("closed_count", sa.Integer(), nullable=False),
+    )
+    histogram_table = op.create_table(
+        "metric_close_histogram",
+        *group_columns(),
+        sa.Column("bucket", sa.Integer(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+
+    # Seed from whatever tickets already exist; `python -m app.cli metrics backfill`
+    # performs the same rebuild later.
+    tickets = sa.table(
+        "tickets",
+        sa.column("assignee", sa.String()),
+        sa.column("priority", sa.String()),
+        sa.column("created_at", sa.DateTime(timezone=True)),
+        sa.column("closed_at", sa.DateTime(timezone=True)),
+    )
+    daily = Counter()
+    histogram = Counter()
+    for row in op.get_bind().execute(sa.select(tickets)):
+        group = (row.assignee or "", row.priority)
+        created_at = as_utc(row.created_at)
+        daily[(created_at.date(), *group, "created_count")] += 1
+        if row.closed_at is not None:
+            closed_at = as_utc(row.closed_at)
+            daily[(closed_at.date(), *group, "closed_count")] += 1
+            seconds = (closed_at - created_at).total_seconds()
+            histogram[(closed_at.date(), *group, bucket_for(seconds))] += 1
+
+    daily_rows = {}
+    for (day, assignee, priority, field), count in daily.items():
+        row = daily_rows.setdefault(
+            (day, assignee, priority),
+            {
+                "day": day,
+                "assignee": assignee,
+                "priority": priority,
+                "created_count": 0,
+                "closed_count": 0,
+            },
+        )
+        row[field] = count
+    if daily_rows:
+        op.bulk_insert(daily_table, list(daily_rows.values()))
+    if histogram:
+        op.bulk_insert(
+            histogram_table,
+            [
+                {"day": day, "assignee": assignee, "priority": priority, "bucket": b, "count": n}
+                for (day, assignee, priority, b), n in histogram.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("metric_close_histogram")
+    op.drop_table("metric_daily")
@@ -0,0 +1,50 @@
+"""Outbox of ticket and comment changes for the change feed
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+STATUSES = ("TODO", "IN_PROGRESS", "DONE")
+
+
+def upgrade() -> None:
+    def status_column(name):
+        return sa.Column(
+            name, postgresql.ENUM(*STATUSES, name="status", create_type=False), nullable=False
+        )
+
+    op.create_table(
+        "events",
+        sa.Column(
+            "id",
+            sa.BigInteger().with_variant(sa.Integer(), "sqlite"),
+            primary_key=True,
+            autoincrement=True,
+        ),
+        sa.Column("type", sa.String(32), nullable=False),
+        sa.Column("ticket_id", sa.Uuid(), nullable=False),
+        sa.Column("comment_id", sa.Uuid(), nullable=True),
+        sa.Column("assignee", sa.String(100), nullable=True),
+        status_column("status"),
+        sa.Column("previous_assignee", sa.String(100), nullable=True),
+        status_column("previous_status"),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_events_created_at", "events", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_created_at", table_name="events")
+    op.drop_table("events")
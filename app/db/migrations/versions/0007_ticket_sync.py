@@ -0,0 +1,56 @@
+"""updated_at on tickets and comments, and ticket tombstones for delta sync
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Existing rows were last written when created, or when closed.
+BACKFILL = {
+    "tickets": "UPDATE tickets SET updated_at = coalesce(closed_at, created_at)",
+    "comments": "UPDATE comments SET updated_at = created_at",
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table, backfill in BACKFILL.items():
+        # SQLite only adds NOT NULL columns with a constant default, and dropping
+        # it again would mean rebuilding the table (and the search triggers on
+        # tickets); the models always set the column, so there it stays.
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default="1970-01-01 00:00:00",
+            ),
+        )
+        op.execute(backfill)
+        if bind.dialect.name == "postgresql":
+            op.alter_column(table, "updated_at", server_default=None)
+    op.create_index("ix_tickets_updated_at_id", "tickets", ["updated_at", "id"])
+
+    op.create_table(
+        "ticket_tombstones",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_ticket_tombstones_deleted_at_id", "ticket_tombstones", ["deleted_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ticket_tombstones_deleted_at_id", table_name="ticket_tombstones")
+    op.drop_table("ticket_tombstones")
+    op.drop_index("ix_tickets_updated_at_id", table_name="tickets")
+    for table in BACKFILL:
+        op.drop_column(table, "updated_at")
@@ -0,0 +1,81 @@
+"""Archive tables for closed tickets and their comments
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+STATUSES = ("TODO", "IN_PROGRESS", "DONE")
+PRIORITIES = ("LOW", "MEDIUM", "HIGH")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "archived_tickets",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("assignee", sa.String(100), nullable=True),
+        sa.Column(
+            "priority",
+            postgresql.ENUM(*PRIORITIES, name="priority", create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "status", postgresql.ENUM(*STATUSES, name="status", create_type=False), nullable=False
+        ),
+        sa.Column("due_date", sa.Date(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("closed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_archived_tickets_created_at_id", "archived_tickets", ["created_at", "id"])
+    op.create_index(
+        "ix_archived_tickets_assignee_created_at",
+        "archived_tickets",
+        ["assignee", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_archived_tickets_priority_created_at",
+        "archived_tickets",
+        ["priority", "created_at", "id"],
+    )
+
+    op.create_table(
+        "archived_comments",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column(
+            "ticket_id",
+            sa.Uuid(),
+            sa.ForeignKey("archived_tickets.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("author", sa.String(100), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_archived_comments_ticket_id_created_at",
+        "archived_comments",
+        ["ticket_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_archived_comments_ticket_id_created_at", table_name="archived_comments")
+    op.drop_table("archived_comments")
+    op.drop_index("ix_archived_tickets_priority_created_at", table_name="archived_tickets")
+    op.drop_index("ix_archived_tickets_assignee_created_at", table_name="archived_tickets")
+    op.drop_index("ix_archived_tickets_created_at_id", table_name="archived_tickets")
+    op.drop_table("archived_tickets")
@@ -0,0 +1,31 @@
+"""Ticket version for optimistic concurrency
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+TABLES = ("tickets", "archived_tickets")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table in TABLES:
+        # As with updated_at (0007), SQLite keeps the constant default it needs to add a
+        # NOT NULL column; every existing ticket starts at version 1.
+        op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+        if bind.dialect.name == "postgresql":
+            op.alter_column(table, "version", server_default=None)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, "version")
@@ -0,0 +1,47 @@
+"""Indexes for sorted ticket lists and the open-ticket due date views
+
+Each sort key is an expression (``app.db.models.ticket``): enums by their rank in
+declaration order rather than by name, and due dates with the tickets that have
+none last. Like the filter indexes (0003) every index ends in (created_at, id).
+The due date indexes for ``overdue`` and ``due_within``, by themselves or for one
+assignee, cover only open tickets.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+PRIORITY_RANK = "(CASE priority WHEN 'LOW' THEN 0 WHEN 'MEDIUM' THEN 1 WHEN 'HIGH' THEN 2 END)"
+STATUS_RANK = "(CASE status WHEN 'TODO' THEN 0 WHEN 'IN_PROGRESS' THEN 1 WHEN 'DONE' THEN 2 END)"
+DUE_DATE_KEY = "coalesce(due_date, '9999-12-31')"
+OPEN = "status != 'DONE'"
+
+INDEXES = [
+    ("ix_tickets_priority_rank_created_at", [PRIORITY_RANK], None),
+    ("ix_tickets_status_rank_created_at", [STATUS_RANK], None),
+    ("ix_tickets_due_date_created_at", [DUE_DATE_KEY], None),
+    ("ix_tickets_open_due_date_created_at", [DUE_DATE_KEY], OPEN),
+    ("ix_tickets_open_assignee_due_date_created_at", ["assignee", DUE_DATE_KEY], OPEN),
+]
+
+
+def upgrade() -> None:
+    for name, keys, predicate in INDEXES:
+        where = {}
+        if predicate is not None:
+            where = {"sqlite_where": sa.text(predicate), "postgresql_where": sa.text(predicate)}
+        columns = [key if key == "assignee" else sa.text(key) for key in keys]
+        op.create_index(name, "tickets", [*columns, "created_at", "id"], **where)
+
+
+def downgrade() -> None:
+    for name, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="tickets")
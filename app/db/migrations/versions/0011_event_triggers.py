@@ -0,0 +1,261 @@
+"""Triggers for the change feed
+
+Every ticket write and every comment insert or delete records its event from a
+trigger, in the write's own statement, whatever the write path: Postgres runs one
+statement-level trigger per write over its transition tables, SQLite a row-level
+trigger with the same statement per row.
+
+Payloads are JSON as the API returns the resource. A comment whose ticket is gone
+records nothing, so comments removed by a ticket's cascade get no events, and rows
+being moved into the archive (``app.db.archive``) are not changes: deletes of rows
+already copied to ``archived_*`` are skipped.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+EVENT_COLUMNS = (
+    "type, ticket_id, comment_id, assignee, status, previous_assignee, previous_status, "
+    "payload, created_at"
+)
+
+
+def postgres_ticket_payload(row: str) -> str:
+    return (
+        f"json_build_object('id', {row}.id, 'title', {row}.title, "
+        f"'description', {row}.description, 'assignee', {row}.assignee, "
+        f"'priority', {row}.priority, 'status', {row}.status, 'due_date', {row}.due_date, "
+        f"'created_at', json_timestamp({row}.created_at), "
+        f"'closed_at', json_timestamp({row}.closed_at), "
+        f"'updated_at', json_timestamp({row}.updated_at), 'version', {row}.version)::text"
+    )
+
+
+def postgres_comment_payload(row: str) -> str:
+    return (
+        f"json_build_object('id', {row}.id, 'ticket_id', {row}.ticket_id, "
+        f"'author', {row}.author, 'content', {row}.content, "
+        f"'created_at', json_timestamp({row}.created_at), "
+        f"'updated_at', json_timestamp({row}.updated_at))::text"
+    )
+
+
+def postgres_trigger(name: str, event: str, transitions: str, statement: str) -> list[str]:
+    """A statement-level trigger ``name`` on ``event`` running ``statement``."""
+    return [
+        f"""
+        CREATE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            {statement.strip()};
+            RETURN NULL;
+        END
+        $$
+        """,
+        f"""
+        CREATE TRIGGER {name} AFTER {event} REFERENCING {transitions}
+        FOR EACH STATEMENT EXECUTE FUNCTION {name}()
+        """,
+    ]
+
+
+POSTGRES_UPGRADE = [
+    # The API's form of a timestamp: UTC, microseconds only when there are any.
+    """
+    CREATE FUNCTION json_timestamp(value timestamptz) RETURNS text LANGUAGE sql STABLE AS $$
+        SELECT to_char(value AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS')
+            || coalesce(nullif(to_char(value AT TIME ZONE 'UTC', '.US'), '.000000'), '')
+            || 'Z'
+    $$
+    """,
+    *postgres_trigger(
+        "ticket_events_inserted",
+        "INSERT ON tickets",
+        "NEW TABLE AS new_tickets",
+        f"""
+        INSERT INTO events ({EVENT_COLUMNS})
+        SELECT 'ticket.created', n.id, NULL, n.assignee, n.status, n.assignee, n.status,
+            {postgres_ticket_payload("n")}, now()
+        FROM new_tickets n
+        """,
+    ),
+    *postgres_trigger(
+        "ticket_events_updated",
+        "UPDATE ON tickets",
+        "OLD TABLE AS old_tickets NEW TABLE AS new_tickets",
+        f"""
+        INSERT INTO events ({EVENT_COLUMNS})
+        SELECT 'ticket.updated', n.id, NULL, n.assignee, n.status, o.assignee, o.status,
+            {postgres_ticket_payload("n")}, now()
+        FROM new_tickets n JOIN old_tickets o ON o.id = n.id
+        """,
+    ),
+    *postgres_trigger(
+        "ticket_events_deleted",
+        "DELETE ON tickets",
+        "OLD TABLE AS old_tickets",
+        f"""
+        INSERT INTO events ({EVENT_COLUMNS})
+        SELECT 'ticket.deleted', o.id, NULL, o.assignee, o.status, o.assignee, o.status,
+            {postgres_ticket_payload("o")}, now()
+        FROM old_tickets o
+        WHERE NOT EXISTS (SELECT 1 FROM archived_tickets a WHERE a.id = o.id)
+        """,
+    ),
+    *postgres_trigger(
+        "comment_events_inserted",
+        "INSERT ON comments",
+        "NEW TABLE AS new_comments",
+        f"""
+        INSERT INTO events ({EVENT_COLUMNS})
+        SELECT 'comment.created', t.id, c.id, t.assignee, t.status, t.assignee, t.status,
+            {postgres_comment_payload("c")}, now()
+        FROM new_comments c JOIN tickets t ON t.id = c.ticket_id
+        """,
+    ),
+    # Joining tickets skips comments whose ticket is being deleted by the cascade.
+    *postgres_trigger(
+        "comment_events_deleted",
+        "DELETE ON comments",
+        "OLD TABLE AS old_comments",
+        f"""
+        INSERT INTO events ({EVENT_COLUMNS})
+        SELECT 'comment.deleted', t.id, c.id, t.assignee, t.status, t.assignee, t.status,
+            {postgres_comment_payload("c")}, now()
+        FROM old_comments c JOIN tickets t ON t.id = c.ticket_id
+        WHERE NOT EXISTS (SELECT 1 FROM archived_comments a WHERE a.id = c.id)
+        """,
+    ),
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP TRIGGER comment_events_deleted ON comments",
+    "DROP TRIGGER comment_events_inserted ON comments",
+    "DROP TRIGGER ticket_events_deleted ON tickets",
+    "DROP TRIGGER ticket_events_updated ON tickets",
+    "DROP TRIGGER ticket_events_inserted ON tickets",
+    "DROP FUNCTION comment_events_deleted()",
+    "DROP FUNCTION comment_events_inserted()",
+    "DROP FUNCTION ticket_events_deleted()",
+    "DROP FUNCTION ticket_events_updated()",
+    "DROP FUNCTION ticket_events_inserted()",
+    "DROP FUNCTION json_timestamp(timestamptz)",
+]
+
+# Timestamps are stored as 'YYYY-MM-DD HH:MM:SS.ffffff' in UTC.
+SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'"
+
+
+def sqlite_uuid(value: str) -> str:
+    return "||'-'||".join(
+        f"substr({value}, {start}, {length})"
+        for start, length in ((1, 8), (9, 4), (13, 4), (17, 4), (21, 12))
+    )
+
+
+def sqlite_timestamp(value: str) -> str:
+    return f"replace(replace({value}, ' ', 'T'), '.000000', '')"
+
+
+def sqlite_ticket_payload(row: str) -> str:
+    return (
+        f"json_object('id', {sqlite_uuid(f'{row}.id')}, 'title', {row}.title, "
+        f"'description', {row}.description, 'assignee', {row}.assignee, "
+        f"'priority', {row}.priority, 'status', {row}.status, 'due_date', {row}.due_date, "
+        f"'created_at', {sqlite_timestamp(f'{row}.created_at')}, "
+        f"'closed_at', {sqlite_timestamp(f'{row}.closed_at')}, "
+        f"'updated_at', {sqlite_timestamp(f'{row}.updated_at')}, 'version', {row}.version)"
+    )
+
+
+def sqlite_comment_payload(row: str) -> str:
+    return (
+        f"json_object('id', {sqlite_uuid(f'{row}.id')}, "
+        f"'ticket_id', {sqlite_uuid(f'{row}.ticket_id')}, "
+        f"'author', {row}.author, 'content', {row}.content, "
+        f"'created_at', {sqlite_timestamp(f'{row}.created_at')}, "
+        f"'updated_at', {sqlite_timestamp(f'{row}.updated_at')})"
+    )
+
+
+def sqlite_trigger(name: str, event: str, statement: str, when: str | None = None) -> str:
+    condition = f" WHEN {when}" if when else ""
+    return f"CREATE TRIGGER {name} AFTER {event}{condition} BEGIN\n{statement.strip()};\nEND"
+
+
+def sqlite_ticket_event(event_type: str, current: str, previous: str) -> str:
+    return f"""
+    INSERT INTO events ({EVENT_COLUMNS})
+    VALUES ('{event_type}', {current}.id, NULL, {current}.assignee, {current}.status,
+        {previous}.assignee, {previous}.status, {sqlite_ticket_payload(current)}, {SQLITE_NOW})
+    """
+
+
+def sqlite_comment_event(event_type: str, comment: str) -> str:
+    return f"""
+    INSERT INTO events ({EVENT_COLUMNS})
+    SELECT '{event_type}', t.id, {comment}.id, t.assignee, t.status, t.assignee, t.status,
+        {sqlite_comment_payload(comment)}, {SQLITE_NOW}
+    FROM tickets t WHERE t.id = {comment}.ticket_id
+    """
+
+
+SQLITE_UPGRADE = [
+    sqlite_trigger(
+        "ticket_events_inserted",
+        "INSERT ON tickets",
+        sqlite_ticket_event("ticket.created", "NEW", "NEW"),
+    ),
+    sqlite_trigger(
+        "ticket_events_updated",
+        "UPDATE ON tickets",
+        sqlite_ticket_event("ticket.updated", "NEW", "OLD"),
+    ),
+    sqlite_trigger(
+        "ticket_events_deleted",
+        "DELETE ON tickets",
+        sqlite_ticket_event("ticket.deleted", "OLD", "OLD"),
+        when="NOT EXISTS (SELECT 1 FROM archived_tickets WHERE id = OLD.id)",
+    ),
+    sqlite_trigger(
+        "comment_events_inserted",
+        "INSERT ON comments",
+        sqlite_comment_event("comment.created", "NEW"),
+    ),
+    # By the time a ticket's cascade deletes its comments the ticket row is gone, so
+    # the join in the event's SELECT finds nothing.
+    sqlite_trigger(
+        "comment_events_deleted",
+        "DELETE ON comments",
+        sqlite_comment_event("comment.deleted", "OLD"),
+        when="NOT EXISTS (SELECT 1 FROM archived_comments WHERE id = OLD.id)",
+    ),
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER comment_events_deleted",
+    "DROP TRIGGER comment_events_inserted",
+    "DROP TRIGGER ticket_events_deleted",
+    "DROP TRIGGER ticket_events_updated",
+    "DROP TRIGGER ticket_events_inserted",
+]
+
+UPGRADE = {"postgresql": POSTGRES_UPGRADE, "sqlite": SQLITE_UPGRADE}
+DOWNGRADE = {"postgresql": POSTGRES_DOWNGRADE, "sqlite": SQLITE_DOWNGRADE}
+
+
+def upgrade() -> None:
+    for statement in UPGRADE[op.get_bind().dialect.name]:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in DOWNGRADE[op.get_bind().dialect.name]:
+        op.execute(statement)
@@ -0,0 +1,66 @@
+"""Trigger for ticket tombstones
+
+Every ticket delete records its ``ticket_tombstones`` row from a trigger, in the
+delete's own statement, whatever the write path. As for events (0011), deletes of
+rows already copied to ``archived_tickets`` are moves, not deletes, and are skipped.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+POSTGRES_UPGRADE = [
+    """
+    CREATE FUNCTION ticket_tombstones_deleted() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO ticket_tombstones (id, deleted_at)
+        SELECT o.id, now() FROM old_tickets o
+        WHERE NOT EXISTS (SELECT 1 FROM archived_tickets a WHERE a.id = o.id);
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER ticket_tombstones_deleted AFTER DELETE ON tickets
+    REFERENCING OLD TABLE AS old_tickets
+    FOR EACH STATEMENT EXECUTE FUNCTION ticket_tombstones_deleted()
+    """,
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP TRIGGER ticket_tombstones_deleted ON tickets",
+    "DROP FUNCTION ticket_tombstones_deleted()",
+]
+
+# Timestamps are stored as 'YYYY-MM-DD HH:MM:SS.ffffff' in UTC.
+SQLITE_UPGRADE = [
+    """
+    CREATE TRIGGER ticket_tombstones_deleted AFTER DELETE ON tickets
+    WHEN NOT EXISTS (SELECT 1 FROM archived_tickets WHERE id = OLD.id) BEGIN
+        INSERT INTO ticket_tombstones (id, deleted_at)
+        VALUES (OLD.id, strftime('%Y-%m-%d %H:%M:%f', 'now') || '000');
+    END
+    """,
+]
+
+SQLITE_DOWNGRADE = ["DROP TRIGGER ticket_tombstones_deleted"]
+
+UPGRADE = {"postgresql": POSTGRES_UPGRADE, "sqlite": SQLITE_UPGRADE}
+DOWNGRADE = {"postgresql": POSTGRES_DOWNGRADE, "sqlite": SQLITE_DOWNGRADE}
+
+
+def upgrade() -> None:
+    for statement in UPGRADE[op.get_bind().dialect.name]:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in DOWNGRADE[op.get_bind().dialect.name]:
+        op.execute(statement)
@@ -0,0 +1,153 @@
+"""Triggers for the per-status metric counters
+
+Every ticket write adds its deltas to ``metric_counters`` from a trigger, in the
+write's own statement, whatever the write path: Postgres runs one statement-level
+trigger per write over its transition tables, SQLite a row-level trigger with the
+same statement per row. Deletes of rows already copied to ``archived_tickets`` are
+moves and change no counter.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+DELTA_COLUMNS = ("status", "created_at", "closed_at")
+
+# Deltas are rows of (sign, status, created_at, closed_at): +1 for a ticket's new
+# state, -1 for its old one.
+METRIC_COUNTERS = """
+    UPDATE metric_counters SET
+        ticket_count = metric_counters.ticket_count + d.ticket_count,
+        closed_count = metric_counters.closed_count + d.closed_count,
+        close_seconds_total = metric_counters.close_seconds_total + d.close_seconds_total
+    FROM (
+        SELECT status, sum(sign) AS ticket_count,
+            sum(CASE WHEN closed_at IS NOT NULL THEN sign ELSE 0 END) AS closed_count,
+            coalesce(sum(sign * {seconds}), 0) AS close_seconds_total
+        FROM ({deltas}) deltas
+        GROUP BY status
+    ) d
+    WHERE metric_counters.status = d.status
+      AND (d.ticket_count != 0 OR d.closed_count != 0 OR d.close_seconds_total != 0)
+"""
+
+POSTGRES_SECONDS = "EXTRACT(EPOCH FROM (closed_at - created_at))::float8"
+POSTGRES_REMOVED = (
+    "old_tickets o WHERE NOT EXISTS (SELECT 1 FROM archived_tickets a WHERE a.id = o.id)"
+)
+
+
+def postgres_deltas(sign: int, source: str) -> str:
+    return f"SELECT {sign} AS sign, {', '.join(DELTA_COLUMNS)} FROM {source}"
+
+
+def postgres_trigger(name: str, event: str, transitions: str, deltas: str) -> list[str]:
+    statement = METRIC_COUNTERS.format(seconds=POSTGRES_SECONDS, deltas=deltas).strip()
+    return [
+        f"""
+        CREATE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            {statement};
+            RETURN NULL;
+        END
+        $$
+        """,
+        f"""
+        CREATE TRIGGER {name} AFTER {event} REFERENCING {transitions}
+        FOR EACH STATEMENT EXECUTE FUNCTION {name}()
+        """,
+    ]
+
+
+POSTGRES_UPGRADE = [
+    *postgres_trigger(
+        "metric_counters_inserted",
+        "INSERT ON tickets",
+        "NEW TABLE AS new_tickets",
+        postgres_deltas(1, "new_tickets"),
+    ),
+    *postgres_trigger(
+        "metric_counters_updated",
+        "UPDATE ON tickets",
+        "OLD TABLE AS old_tickets NEW TABLE AS new_tickets",
+        f"{postgres_deltas(-1, 'old_tickets')} UNION ALL {postgres_deltas(1, 'new_tickets')}",
+    ),
+    *postgres_trigger(
+        "metric_counters_deleted",
+        "DELETE ON tickets",
+        "OLD TABLE AS old_tickets",
+        postgres_deltas(-1, POSTGRES_REMOVED),
+    ),
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP TRIGGER metric_counters_deleted ON tickets",
+    "DROP TRIGGER metric_counters_updated ON tickets",
+    "DROP TRIGGER metric_counters_inserted ON tickets",
+    "DROP FUNCTION metric_counters_deleted()",
+    "DROP FUNCTION metric_counters_updated()",
+    "DROP FUNCTION metric_counters_inserted()",
+]
+
+# Timestamps are stored as 'YYYY-MM-DD HH:MM:SS.ffffff' in UTC; seconds are counted in
+# whole microseconds, as Python counts them.
+SQLITE_SECONDS = (
+    "((CAST(strftime('%s', closed_at) AS INTEGER)"
+    " - CAST(strftime('%s', created_at) AS INTEGER)) * 1000000"
+    " + CAST(substr(closed_at, 21) AS INTEGER)"
+    " - CAST(substr(created_at, 21) AS INTEGER)) / 1000000.0"
+)
+
+
+def sqlite_deltas(sign: int, row: str) -> str:
+    return f"SELECT {sign} AS sign, " + ", ".join(
+        f"{row}.{column} AS {column}" for column in DELTA_COLUMNS
+    )
+
+
+def sqlite_trigger(name: str, event: str, deltas: str, when: str | None = None) -> str:
+    condition = f" WHEN {when}" if when else ""
+    statement = METRIC_COUNTERS.format(seconds=SQLITE_SECONDS, deltas=deltas).strip()
+    return f"CREATE TRIGGER {name} AFTER {event}{condition} BEGIN\n{statement};\nEND"
+
+
+SQLITE_UPGRADE = [
+    sqlite_trigger("metric_counters_inserted", "INSERT ON tickets", sqlite_deltas(1, "NEW")),
+    sqlite_trigger(
+        "metric_counters_updated",
+        "UPDATE ON tickets",
+        f"{sqlite_deltas(-1, 'OLD')} UNION ALL {sqlite_deltas(1, 'NEW')}",
+    ),
+    sqlite_trigger(
+        "metric_counters_deleted",
+        "DELETE ON tickets",
+        sqlite_deltas(-1, "OLD"),
+        when="NOT EXISTS (SELECT 1 FROM archived_tickets WHERE id = OLD.id)",
+    ),
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER metric_counters_deleted",
+    "DROP TRIGGER metric_counters_updated",
+    "DROP TRIGGER metric_counters_inserted",
+]
+
+UPGRADE = {"postgresql": POSTGRES_UPGRADE, "sqlite": SQLITE_UPGRADE}
+DOWNGRADE = {"postgresql": POSTGRES_DOWNGRADE, "sqlite": SQLITE_DOWNGRADE}
+
+
+def upgrade() -> None:
+    for statement in UPGRADE[op.get_bind().dialect.name]:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in DOWNGRADE[op.get_bind().dialect.name]:
+        op.execute(statement)
@@ -0,0 +1,193 @@
+"""Triggers for the daily metric rollups
+
+Every ticket write adds its deltas to ``metric_daily`` and ``metric_close_histogram``
+from triggers, one grouped upsert per table, whatever the write path. As for the
+counters (0013), Postgres runs one statement-level trigger per write over its
+transition tables, SQLite a row-level trigger, and deletes of rows already copied to
+``archived_tickets`` are skipped.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18
+"""
+
+import math
+
+from alembic import op
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+# ``app.core.sketch`` bucket width at RELATIVE_ACCURACY = 0.02, frozen as of this
+# revision: changing the accuracy means new triggers as well as a backfill.
+LOG_GAMMA = math.log((1 + 0.02) / (1 - 0.02))
+
+DELTA_COLUMNS = ("status", "assignee", "priority", "created_at", "closed_at")
+
+# Deltas are rows of (sign, status, assignee, priority, created_at, closed_at): +1 for
+# a ticket's new state, -1 for its old one. A ticket counts under its current
+# assignee and priority, as in ``app.db.models.metric.rollup_deltas``.
+METRIC_DAILY = """
+    INSERT INTO metric_daily (day, assignee, priority, created_count, closed_count)
+    SELECT day, assignee, priority, sum(created), sum(closed)
+    FROM (
+        SELECT {created_day} AS day, coalesce(assignee, '') AS assignee, priority,
+            sign AS created, 0 AS closed
+        FROM ({deltas}) deltas
+        UNION ALL
+        SELECT {closed_day}, coalesce(assignee, ''), priority, 0, sign
+        FROM ({deltas}) deltas WHERE closed_at IS NOT NULL
+    ) flows
+    GROUP BY day, assignee, priority
+    HAVING sum(created) != 0 OR sum(closed) != 0
+    ON CONFLICT (day, assignee, priority) DO UPDATE SET
+        created_count = metric_daily.created_count + excluded.created_count,
+        closed_count = metric_daily.closed_count + excluded.closed_count
+"""
+METRIC_CLOSE_HISTOGRAM = """
+    INSERT INTO metric_close_histogram (day, assignee, priority, bucket, count)
+    SELECT day, assignee, priority, bucket, sum(sign)
+    FROM (
+        SELECT {closed_day} AS day, coalesce(assignee, '') AS assignee, priority,
+            CASE WHEN {seconds} <= 1.0 THEN 0
+                 ELSE CAST(ceil(ln({seconds}) / {log_gamma!r}) AS INTEGER) END AS bucket,
+            sign
+        FROM ({deltas}) deltas WHERE closed_at IS NOT NULL
+    ) closes
+    GROUP BY day, assignee, priority, bucket
+    HAVING sum(sign) != 0
+    ON CONFLICT (day, assignee, priority, bucket) DO UPDATE SET
+        count = metric_close_histogram.count + excluded.count
+"""
+
+
+def rollup_statements(dialect: dict[str, str], deltas: str) -> list[str]:
+    return [
+        template.format(deltas=deltas, log_gamma=LOG_GAMMA, **dialect).strip()
+        for template in (METRIC_DAILY, METRIC_CLOSE_HISTOGRAM)
+    ]
+
+
+POSTGRES = {
+    "seconds": "EXTRACT(EPOCH FROM (closed_at - created_at))::float8",
+    "created_day": "(created_at AT TIME ZONE 'UTC')::date",
+    "closed_day": "(closed_at AT TIME ZONE 'UTC')::date",
+}
+POSTGRES_REMOVED = (
+    "old_tickets o WHERE NOT EXISTS (SELECT 1 FROM archived_tickets a WHERE a.id = o.id)"
+)
+
+
+def postgres_deltas(sign: int, source: str) -> str:
+    return f"SELECT {sign} AS sign, {', '.join(DELTA_COLUMNS)} FROM {source}"
+
+
+def postgres_trigger(name: str, event: str, transitions: str, deltas: str) -> list[str]:
+    body = ";\n".join(rollup_statements(POSTGRES, deltas))
+    return [
+        f"""
+        CREATE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            {body};
+            RETURN NULL;
+        END
+        $$
+        """,
+        f"""
+        CREATE TRIGGER {name} AFTER {event} REFERENCING {transitions}
+        FOR EACH STATEMENT EXECUTE FUNCTION {name}()
+        """,
+    ]
+
+
+POSTGRES_UPGRADE = [
+    *postgres_trigger(
+        "metric_rollups_inserted",
+        "INSERT ON tickets",
+        "NEW TABLE AS new_tickets",
+        postgres_deltas(1, "new_tickets"),
+    ),
+    *postgres_trigger(
+        "metric_rollups_updated",
+        "UPDATE ON tickets",
+        "OLD TABLE AS old_tickets NEW TABLE AS new_tickets",
+        f"{postgres_deltas(-1, 'old_tickets')} UNION ALL {postgres_deltas(1, 'new_tickets')}",
+    ),
+    *postgres_trigger(
+        "metric_rollups_deleted",
+        "DELETE ON tickets",
+        "OLD TABLE AS old_tickets",
+        postgres_deltas(-1, POSTGRES_REMOVED),
+    ),
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP TRIGGER metric_rollups_deleted ON tickets",
+    "DROP TRIGGER metric_rollups_updated ON tickets",
+    "DROP TRIGGER metric_rollups_inserted ON tickets",
+    "DROP FUNCTION metric_rollups_deleted()",
+    "DROP FUNCTION metric_rollups_updated()",
+    "DROP FUNCTION metric_rollups_inserted()",
+]
+
+# Timestamps are stored as 'YYYY-MM-DD HH:MM:SS.ffffff' in UTC. Seconds are counted
+# in whole microseconds, so the histogram buckets match ``app.core.sketch.bucket_for``.
+SQLITE = {
+    "seconds": (
+        "((CAST(strftime('%s', closed_at) AS INTEGER)"
+        " - CAST(strftime('%s', created_at) AS INTEGER)) * 1000000"
+        " + CAST(substr(closed_at, 21) AS INTEGER)"
+        " - CAST(substr(created_at, 21) AS INTEGER)) / 1000000.0"
+    ),
+    "created_day": "substr(created_at, 1, 10)",
+    "closed_day": "substr(closed_at, 1, 10)",
+}
+
+
+def sqlite_deltas(sign: int, row: str) -> str:
+    return f"SELECT {sign} AS sign, " + ", ".join(
+        f"{row}.{column} AS {column}" for column in DELTA_COLUMNS
+    )
+
+
+def sqlite_trigger(name: str, event: str, deltas: str, when: str | None = None) -> str:
+    condition = f" WHEN {when}" if when else ""
+    body = ";\n".join(rollup_statements(SQLITE, deltas))
+    return f"CREATE TRIGGER {name} AFTER {event}{condition} BEGIN\n{body};\nEND"
+
+
+SQLITE_UPGRADE = [
+    sqlite_trigger("metric_rollups_inserted", "INSERT ON tickets", sqlite_deltas(1, "NEW")),
+    sqlite_trigger(
+        "metric_rollups_updated",
+        "UPDATE ON tickets",
+        f"{sqlite_deltas(-1, 'OLD')} UNION ALL {sqlite_deltas(1, 'NEW')}",
+    ),
+    sqlite_trigger(
+        "metric_rollups_deleted",
+        "DELETE ON tickets",
+        sqlite_deltas(-1, "OLD"),
+        when="NOT EXISTS (SELECT 1 FROM archived_tickets WHERE id = OLD.id)",
+    ),
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER metric_rollups_deleted",
+    "DROP TRIGGER metric_rollups_updated",
+    "DROP TRIGGER metric_rollups_inserted",
+]
+
+UPGRADE = {"postgresql": POSTGRES_UPGRADE, "sqlite": SQLITE_UPGRADE}
+DOWNGRADE = {"postgresql": POSTGRES_DOWNGRADE, "sqlite": SQLITE_DOWNGRADE}
+
+
+def upgrade() -> None:
+    for statement in UPGRADE[op.get_bind().dialect.name]:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in DOWNGRADE[op.get_bind().dialect.name]:
+        op.execute(statement)
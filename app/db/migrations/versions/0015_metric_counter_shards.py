@@ -0,0 +1,195 @@
+"""Shard the per-status metric counters
+
+Every ticket write adjusted the one ``metric_counters`` row of each status it
+touched, inside its transaction, so concurrent writes to tickets of one status
+queued on that row's lock. Counters are now keyed by ``(status, shard)``: the counter
+triggers (0013) add each write's deltas to one of ``SHARDS`` rows picked at random,
+creating it on first use, and readers sum a status's shards.
+
+Only the counter triggers change; existing totals move to shard 0.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+SHARDS = 8
+STATUSES = ("TODO", "IN_PROGRESS", "DONE")
+DELTA_COLUMNS = ("status", "created_at", "closed_at")
+
+COUNTER_DELTAS = """
+    SELECT status, sum(sign) AS ticket_count,
+        sum(CASE WHEN closed_at IS NOT NULL THEN sign ELSE 0 END) AS closed_count,
+        coalesce(sum(sign * {seconds}), 0) AS close_seconds_total
+    FROM ({deltas}) deltas
+    GROUP BY status
+"""
+SHARDED_METRIC_COUNTERS = f"""
+    INSERT INTO metric_counters (status, shard, ticket_count, closed_count, close_seconds_total)
+    SELECT status, {{shard}}, ticket_count, closed_count, close_seconds_total
+    FROM ({COUNTER_DELTAS}) d
+    WHERE ticket_count != 0 OR closed_count != 0 OR close_seconds_total != 0
+    ON CONFLICT (status, shard) DO UPDATE SET
+        ticket_count = metric_counters.ticket_count + excluded.ticket_count,
+        closed_count = metric_counters.closed_count + excluded.closed_count,
+        close_seconds_total = metric_counters.close_seconds_total + excluded.close_seconds_total
+"""
+# As in 0013, for the downgrade.
+METRIC_COUNTERS = f"""
+    UPDATE metric_counters SET
+        ticket_count = metric_counters.ticket_count + d.ticket_count,
+        closed_count = metric_counters.closed_count + d.closed_count,
+        close_seconds_total = metric_counters.close_seconds_total + d.close_seconds_total
+    FROM ({COUNTER_DELTAS}) d
+    WHERE metric_counters.status = d.status
+      AND (d.ticket_count != 0 OR d.closed_count != 0 OR d.close_seconds_total != 0)
+"""
+
+POSTGRES = {
+    "seconds": "EXTRACT(EPOCH FROM (closed_at - created_at))::float8",
+    "shard": f"floor(random() * {SHARDS})::int",
+}
+POSTGRES_REMOVED = (
+    "old_tickets o WHERE NOT EXISTS (SELECT 1 FROM archived_tickets a WHERE a.id = o.id)"
+)
+
+
+def postgres_deltas(sign: int, source: str) -> str:
+    return f"SELECT {sign} AS sign, {', '.join(DELTA_COLUMNS)} FROM {source}"
+
+
+POSTGRES_DELTAS = {
+    "metric_counters_inserted": postgres_deltas(1, "new_tickets"),
+    "metric_counters_updated": (
+        f"{postgres_deltas(-1, 'old_tickets')} UNION ALL {postgres_deltas(1, 'new_tickets')}"
+    ),
+    "metric_counters_deleted": postgres_deltas(-1, POSTGRES_REMOVED),
+}
+
+
+def postgres_functions(template: str) -> list[str]:
+    """The counter trigger functions with ``template`` as their body; the triggers
+    themselves (0013) are unchanged."""
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            {template.format(deltas=deltas, **POSTGRES).strip()};
+            RETURN NULL;
+        END
+        $$
+        """
+        for name, deltas in POSTGRES_DELTAS.items()
+    ]
+
+
+# Seconds are counted in whole microseconds, as in 0013.
+SQLITE = {
+    "seconds": (
+        "((CAST(strftime('%s', closed_at) AS INTEGER)"
+        " - CAST(strftime('%s', created_at) AS INTEGER)) * 1000000"
+        " + CAST(substr(closed_at, 21) AS INTEGER)"
+        " - CAST(substr(created_at, 21) AS INTEGER)) / 1000000.0"
+    ),
+    "shard": f"abs(random() % {SHARDS})",
+}
+
+
+def sqlite_deltas(sign: int, row: str) -> str:
+    return f"SELECT {sign} AS sign, " + ", ".join(
+        f"{row}.{column} AS {column}" for column in DELTA_COLUMNS
+    )
+
+
+SQLITE_TRIGGERS = {
+    "metric_counters_inserted": ("INSERT ON tickets", sqlite_deltas(1, "NEW"), None),
+    "metric_counters_updated": (
+        "UPDATE ON tickets",
+        f"{sqlite_deltas(-1, 'OLD')} UNION ALL {sqlite_deltas(1, 'NEW')}",
+        None,
+    ),
+    "metric_counters_deleted": (
+        "DELETE ON tickets",
+        sqlite_deltas(-1, "OLD"),
+        "NOT EXISTS (SELECT 1 FROM archived_tickets WHERE id = OLD.id)",
+    ),
+}
+
+
+def sqlite_triggers(template: str) -> list[str]:
+    """Drop and recreate the counter triggers with ``template`` as their statement."""
+    statements = [f"DROP TRIGGER {name}" for name in SQLITE_TRIGGERS]
+    for name, (event, deltas, when) in SQLITE_TRIGGERS.items():
+        condition = f" WHEN {when}" if when else ""
+        statement = template.format(deltas=deltas, **SQLITE).strip()
+        statements.append(
+            f"CREATE TRIGGER {name} AFTER {event}{condition} BEGIN\n{statement};\nEND"
+        )
+    return statements
+
+
+COUNTER_TRIGGERS = {"postgresql": postgres_functions, "sqlite": sqlite_triggers}
+
+
+def replace_counters(sharded: bool) -> None:
+    """Recreate ``metric_counters`` with or without shards, keeping each status's total."""
+    bind = op.get_bind()
+    totals = bind.execute(
+        sa.text(
+            "SELECT status, sum(ticket_count) AS ticket_count, "
+            "sum(closed_count) AS closed_count, "
+            "sum(close_seconds_total) AS close_seconds_total "
+            "FROM metric_counters GROUP BY status"
+        )
+    ).all()
+    op.drop_table("metric_counters")
+    shard = [sa.Column("shard", sa.Integer(), primary_key=True)] if sharded else []
+    counters = op.create_table(
+        "metric_counters",
+        sa.Column(
+            "status",
+            postgresql.ENUM(*STATUSES, name="status", create_type=False),
+            primary_key=True,
+        ),
+        *shard,
+        sa.Column("ticket_count", sa.Integer(), nullable=False),
+        sa.Column("closed_count", sa.Integer(), nullable=False),
+        sa.Column("close_seconds_total", sa.Float(), nullable=False),
+    )
+    stored = {row.status: row for row in totals}
+    op.bulk_insert(
+        counters,
+        [
+            {
+                "status": status,
+                **({"shard": 0} if sharded else {}),
+                "ticket_count": stored[status].ticket_count if status in stored else 0,
+                "closed_count": stored[status].closed_count if status in stored else 0,
+                "close_seconds_total": (
+                    float(stored[status].close_seconds_total) if status in stored else 0.0
+                ),
+            }
+            for status in STATUSES
+        ],
+    )
+
+
+def upgrade() -> None:
+    replace_counters(sharded=True)
+    for statement in COUNTER_TRIGGERS[op.get_bind().dialect.name](SHARDED_METRIC_COUNTERS):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    replace_counters(sharded=False)
+    for statement in COUNTER_TRIGGERS[op.get_bind().dialect.name](METRIC_COUNTERS):
+        op.execute(statement)
@@ -0,0 +1,61 @@
+"""Indexes for sorted ticket lists by assignee, and for sorted archive lists
+
+A sort on ``priority``, ``status`` or ``due_date`` (0010) had an index only by itself,
+so a filtered sorted list read it all. Each sort key now also has an index after
+``assignee``: a per-assignee list, the common one, is a range of it. ``status`` and
+``priority`` have three values each, so an index after them would narrow a sorted
+list to about a third for one more index to update on every ticket write; they are
+checked on the rows of the sort key's index instead, as are the due date views'
+ranges in orders other than by due date (``app.api.v1.tickets.filter_tickets``).
+
+``include_archived`` merges a sorted list of ``archived_tickets`` too, which gets the
+priority and due date keys by themselves and after ``assignee``. Archived tickets are
+all DONE, so their status rank is a constant and ``sort=status`` reads the archive's
+(created_at, id) indexes.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0016"
+down_revision = "0015"
+branch_labels = None
+depends_on = None
+
+PRIORITY_RANK = "(CASE priority WHEN 'LOW' THEN 0 WHEN 'MEDIUM' THEN 1 WHEN 'HIGH' THEN 2 END)"
+STATUS_RANK = "(CASE status WHEN 'TODO' THEN 0 WHEN 'IN_PROGRESS' THEN 1 WHEN 'DONE' THEN 2 END)"
+DUE_DATE_KEY = "coalesce(due_date, '9999-12-31')"
+COLUMNS = ("assignee",)
+
+INDEXES = [
+    ("tickets", "ix_tickets_assignee_priority_rank_created_at", ["assignee", PRIORITY_RANK]),
+    ("tickets", "ix_tickets_assignee_status_rank_created_at", ["assignee", STATUS_RANK]),
+    ("tickets", "ix_tickets_assignee_due_date_created_at", ["assignee", DUE_DATE_KEY]),
+    ("archived_tickets", "ix_archived_tickets_priority_rank_created_at", [PRIORITY_RANK]),
+    (
+        "archived_tickets",
+        "ix_archived_tickets_assignee_priority_rank_created_at",
+        ["assignee", PRIORITY_RANK],
+    ),
+    ("archived_tickets", "ix_archived_tickets_due_date_created_at", [DUE_DATE_KEY]),
+    (
+        "archived_tickets",
+        "ix_archived_tickets_assignee_due_date_created_at",
+        ["assignee", DUE_DATE_KEY],
+    ),
+]
+
+
+def upgrade() -> None:
+    for table, name, keys in INDEXES:
+        columns = [key if key in COLUMNS else sa.text(key) for key in keys]
+        op.create_index(name, table, [*columns, "created_at", "id"])
+
+
+def downgrade() -> None:
+    for table, name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
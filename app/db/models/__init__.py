@@ -1,4 +1,18 @@
+from app.db.models.archive import ArchivedComment, ArchivedTicket
 from app.db.models.comment import Comment
+from app.db.models.event import Event
+from app.db.models.metric import MetricCloseHistogram, MetricCounter, MetricDaily
 from app.db.models.ticket import Ticket
+from app.db.models.tombstone import TicketTombstone
 
-__all__ = ["Ticket", "Comment"]
+__all__ = [
+    "Ticket",
+    "Comment",
+    "Event",
+    "MetricCounter",
+    "MetricDaily",
+    "MetricCloseHistogram",
+    "TicketTombstone",
+    "ArchivedTicket",
+    "ArchivedComment",
+]
@@ -0,0 +1,100 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    literal_column,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.models.ticket import Priority, Status, due_date_key, rank
+from app.db.session import Base
+
+
+class ArchivedTicket(Base):
+    """A closed ticket moved out of ``tickets`` by ``app.db.archive``.
+
+    The same columns, so one SELECT list reads either table, plus ``archived_at``.
+    Only DONE tickets are archived, so the status indexes of ``tickets`` have no
+    counterpart here.
+    """
+
+    __tablename__ = "archived_tickets"
+    __table_args__ = (
+        Index("ix_archived_tickets_created_at_id", "created_at", "id"),
+        Index("ix_archived_tickets_assignee_created_at", "assignee", "created_at", "id"),
+        Index("ix_archived_tickets_priority_created_at", "priority", "created_at", "id"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    assignee: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    priority: Mapped[Priority] = mapped_column(Enum(Priority), nullable=False)
+    status: Mapped[Status] = mapped_column(Enum(Status), nullable=False)
+    due_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    closed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+# The sort keys of ``app.db.models.ticket`` over archived tickets, with their indexes.
+# Every archived ticket is DONE, so its status rank is a constant: ``sort=status``
+# reads the archive by (created_at, id).
+ARCHIVED_PRIORITY_RANK = rank(ArchivedTicket.priority, Priority)
+ARCHIVED_STATUS_RANK = literal_column(str(list(Status).index(Status.DONE)), Integer)
+ARCHIVED_DUE_DATE_KEY = due_date_key(ArchivedTicket.due_date)
+
+Index(
+    "ix_archived_tickets_priority_rank_created_at",
+    ARCHIVED_PRIORITY_RANK,
+    ArchivedTicket.created_at,
+    ArchivedTicket.id,
+)
+Index(
+    "ix_archived_tickets_assignee_priority_rank_created_at",
+    ArchivedTicket.assignee,
+    ARCHIVED_PRIORITY_RANK,
+    ArchivedTicket.created_at,
+    ArchivedTicket.id,
+)
+Index(
+    "ix_archived_tickets_due_date_created_at",
+    ARCHIVED_DUE_DATE_KEY,
+    ArchivedTicket.created_at,
+    ArchivedTicket.id,
+)
+Index(
+    "ix_archived_tickets_assignee_due_date_created_at",
+    ArchivedTicket.assignee,
+    ARCHIVED_DUE_DATE_KEY,
+    ArchivedTicket.created_at,
+    ArchivedTicket.id,
+)
+
+
+class ArchivedComment(Base):
+    """A comment of an archived ticket, moved with it."""
+
+    __tablename__ = "archived_comments"
+    __table_args__ = (
+        Index("ix_archived_comments_ticket_id_created_at", "ticket_id", "created_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    ticket_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("archived_tickets.id", ondelete="CASCADE"), nullable=False
+    )
+    author: Mapped[str] = mapped_column(String(100), nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,107 @@
+"""Append-only outbox of ticket and comment changes, served by ``GET /api/v1/events``.
+
+Rows are written by triggers on ``tickets`` and ``comments`` (migration 0011), in the
+statement, and so in the transaction, of the write they describe, whatever the write
+path. Ids only ever grow and are the event ids clients resume from. Listeners
+registered with ``on_events_commit`` are told once a transaction that wrote events
+has committed: ticket writes report themselves through ``on_ticket_commit``,
+comment writes through ``notify_events_commit``.
+"""
+
+import uuid
+from collections.abc import Callable, Sequence
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    Connection,
+    DateTime,
+    Enum,
+    Index,
+    Integer,
+    String,
+    Text,
+    event,
+)
+from sqlalchemy.orm import Mapped, Session, mapped_column, object_session
+
+from app.db.changes import TicketChange, on_ticket_commit
+from app.db.models.comment import Comment
+from app.db.models.ticket import Status
+from app.db.session import Base
+
+# Event types, as the triggers write them.
+TICKET_CREATED = "ticket.created"
+TICKET_UPDATED = "ticket.updated"
+TICKET_DELETED = "ticket.deleted"
+COMMENT_CREATED = "comment.created"
+COMMENT_DELETED = "comment.deleted"
+
+_PENDING_KEY = "committed_events"
+
+EventsCommitListener = Callable[[], None]
+_commit_listeners: list[EventsCommitListener] = []
+
+
+class Event(Base):
+    """One change. ``assignee`` and ``status`` are the ticket's after the change and
+    ``previous_*`` before it, so a subscriber filtering on either sees a ticket leave
+    its view as well as enter it. ``payload`` is the resource as the API returns it
+    (the state before deletion for deletes), JSON-encoded."""
+
+    __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_created_at", "created_at"),
+        # Ids are never reused, even after the newest rows are pruned.
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    type: Mapped[str] = mapped_column(String(32), nullable=False)
+    ticket_id: Mapped[uuid.UUID] = mapped_column(nullable=False)
+    comment_id: Mapped[uuid.UUID | None] = mapped_column(nullable=True)
+    assignee: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    status: Mapped[Status] = mapped_column(Enum(Status), nullable=False)
+    previous_assignee: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    previous_status: Mapped[Status] = mapped_column(Enum(Status), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=datetime.utcnow
+    )
+
+
+def on_events_commit(listener: EventsCommitListener) -> EventsCommitListener:
+    _commit_listeners.append(listener)
+    return listener
+
+
+@on_ticket_commit
+def _ticket_events_committed(changes: Sequence[TicketChange]) -> None:
+    for listener in _commit_listeners:
+        listener()
+
+
+def notify_events_commit(session: Session) -> None:
+    """Tell the ``on_events_commit`` listeners once ``session`` commits: for writes
+    whose events are recorded by the comment triggers."""
+    session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Comment, "after_insert")
+@event.listens_for(Comment, "after_delete")
+def comment_write_handler(mapper, connection: Connection, target: Comment) -> None:
+    notify_events_commit(object_session(target))
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed_events(session: Session) -> None:
+    if session.info.pop(_PENDING_KEY, False):
+        for listener in _commit_listeners:
+            listener()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_events(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
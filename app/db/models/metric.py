@@ -0,0 +1,114 @@
+from collections import Counter
+from collections.abc import Sequence
+from datetime import date
+
+from sqlalchemy import Date, Enum, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.sketch import bucket_for
+from app.db.changes import TicketChange, TicketSnapshot, as_utc
+from app.db.models.ticket import Priority, Status
+from app.db.session import Base
+
+UNASSIGNED = ""
+
+
+class MetricCounter(Base):
+    """Running per-status totals backing ``GET /api/v1/metrics``.
+
+    Adjusted by triggers on every ticket write (migration 0013). Each status is spread
+    over shard rows, one picked at random per write (migration 0015), so concurrent
+    writes rarely wait on the same row; a status's totals are the sum of its shards.
+    """
+
+    __tablename__ = "metric_counters"
+
+    status: Mapped[Status] = mapped_column(Enum(Status), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+    ticket_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    closed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    close_seconds_total: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+
+class MetricDaily(Base):
+    """Tickets created and closed per UTC day, by assignee and priority.
+
+    Backs ``GET /api/v1/metrics/timeseries``. Unassigned tickets are stored under
+    ``UNASSIGNED`` so the assignee can be part of the primary key.
+    """
+
+    __tablename__ = "metric_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    assignee: Mapped[str] = mapped_column(String(100), primary_key=True)
+    priority: Mapped[Priority] = mapped_column(Enum(Priority), primary_key=True)
+    created_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    closed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class MetricCloseHistogram(Base):
+    """Time-to-close sketch: tickets closed per UTC day, assignee, priority and
+    duration bucket (see ``app.core.sketch``)."""
+
+    __tablename__ = "metric_close_histogram"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    assignee: Mapped[str] = mapped_column(String(100), primary_key=True)
+    priority: Mapped[Priority] = mapped_column(Enum(Priority), primary_key=True)
+    bucket: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+def rollup_deltas(changes: Sequence[TicketChange]) -> tuple[Counter, Counter]:
+    """Net ``metric_daily`` and ``metric_close_histogram`` increments for ``changes``.
+
+    Keys are ``(day, assignee, priority, field)`` and ``(day, assignee, priority,
+    bucket)``. A ticket counts under its current assignee and priority, so edits
+    move it between groups. The ticket triggers (migration 0014) apply the same rules
+    in SQL; the backfill uses this.
+    """
+    daily: Counter = Counter()
+    histogram: Counter = Counter()
+
+    def accumulate(snapshot: TicketSnapshot, sign: int):
+        group = (snapshot.assignee or UNASSIGNED, snapshot.priority)
+        daily[(as_utc(snapshot.created_at).date(), *group, "created_count")] += sign
+        if snapshot.closed_at is not None:
+            closed_day = as_utc(snapshot.closed_at).date()
+            daily[(closed_day, *group, "closed_count")] += sign
+            histogram[(closed_day, *group, bucket_for(snapshot.close_seconds))] += sign
+
+    for change in changes:
+        if change.old is not None:
+            accumulate(change.old, -1)
+        if change.new is not None:
+            accumulate(change.new, 1)
+    return daily, histogram
+
+
+def daily_rows(daily: Counter) -> list[dict]:
+    """``metric_daily`` rows from ``rollup_deltas`` keys, dropping zero deltas."""
+    rows: dict[tuple, dict] = {}
+    for (day, assignee, priority, column), delta in daily.items():
+        if not delta:
+            continue
+        row = rows.setdefault(
+            (day, assignee, priority),
+            {
+                "day": day,
+                "assignee": assignee,
+                "priority": priority,
+                "created_count": 0,
+                "closed_count": 0,
+            },
+        )
+        row[column] += delta
+    return list(rows.values())
+
+
+def histogram_rows(histogram: Counter) -> list[dict]:
+    return [
+        {"day": day, "assignee": assignee, "priority": priority, "bucket": bucket, "count": n}
+        for (day, assignee, priority, bucket), n in histogram.items()
+        if n
+    ]
@@ -2,9 +2,24 @@ import enum
 import uuid
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, Enum, String, Text, event
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Enum,
+    Index,
+    Integer,
+    String,
+    Text,
+    case,
+    event,
+    func,
+    literal_column,
+)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Mapped, mapped_column, object_session, relationship
+from sqlalchemy.sql.functions import FunctionElement
 
+from app.db.changes import TicketChange, TicketSnapshot, publish_ticket_changes
 from app.db.session import Base
 
 
@@ -20,8 +35,44 @@ class Status(enum.Enum):
     DONE = "DONE"
 
 
+class utc_now(FunctionElement):  # noqa: N801 - SQL function naming
+    """The database's clock, which stamps ``updated_at`` as the delete trigger stamps
+    tombstones (migration 0012), so both sort in one sync order whatever the skew
+    between the database and the application hosts."""
+
+    type = DateTime(timezone=True)
+    name = "utc_now"
+    inherit_cache = True
+
+
+@compiles(utc_now)
+def _utc_now(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utc_now, "postgresql")
+def _utc_now_postgresql(element, compiler, **kw):
+    return "now()"
+
+
+@compiles(utc_now, "sqlite")
+def _utc_now_sqlite(element, compiler, **kw):
+    # Timestamps are stored as 'YYYY-MM-DD HH:MM:SS.ffffff' in UTC.
+    return "(strftime('%Y-%m-%d %H:%M:%f', 'now') || '000')"
+
+
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        Index("ix_tickets_status_created_at", "status", "created_at", "id"),
+        Index("ix_tickets_status_priority_created_at", "status", "priority", "created_at", "id"),
+        Index("ix_tickets_assignee_created_at", "assignee", "created_at", "id"),
+        Index("ix_tickets_assignee_status_created_at", "assignee", "status", "created_at", "id"),
+        Index("ix_tickets_priority_created_at", "priority", "created_at", "id"),
+        Index("ix_tickets_updated_at_id", "updated_at", "id"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -33,18 +84,161 @@ class Ticket(Base):
     status: Mapped[Status] = mapped_column(Enum(Status), nullable=False, default=Status.TODO)
     due_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, default=datetime.utcnow
+        DateTime(timezone=True), nullable=False, default=utc_now()
     )
     closed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Set on every write from the database's clock, and returned by the write
+    # (``eager_defaults``); Core updates (app.db.bulk) set it themselves.
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=utc_now(), onupdate=utc_now()
+    )
+    # Incremented by every write, which the handlers below and ``app.db.bulk`` do
+    # themselves; it is the ticket's ETag, and ``If-Match`` on PATCH compares it.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
 
     comments: Mapped[list["Comment"]] = relationship(
-        "Comment", back_populates="ticket", cascade="all, delete-orphan"
+        "Comment",
+        back_populates="ticket",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
+    )
+
+
+def rank(column, values: type[enum.Enum]):
+    """``column``'s position among ``values`` in declaration order.
+
+    Constants are written as literals, not bound parameters: SQLite only reads an
+    index on an expression for a query with the same expression.
+    """
+    return case(
+        {
+            literal_column(f"'{value.name}'"): literal_column(str(position), Integer)
+            for position, value in enumerate(values)
+        },
+        value=column,
     )
 
 
+class unindexed(FunctionElement):  # noqa: N801 - SQL function naming
+    """The expression, which SQLite is not to look up in an index: a filter checked on
+    the rows of the index that orders the list, rather than one that reads the
+    filter's rows and sorts them. Other databases weigh this themselves."""
+
+    name = "unindexed"
+    inherit_cache = True
+
+    def __init__(self, expression):
+        super().__init__(expression)
+        self.type = expression.type
+
+
+@compiles(unindexed)
+def _unindexed(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(unindexed, "sqlite")
+def _unindexed_sqlite(element, compiler, **kw):
+    # A unary plus keeps a term of the WHERE clause out of SQLite's index lookups.
+    return f"+{compiler.process(element.clauses, **kw)}"
+
+
+def due_date_key(column):
+    """``column``, a due date, with tickets without one after every date."""
+    return func.coalesce(column, literal_column(f"'{date.max.isoformat()}'"), type_=Date)
+
+
+# Sort keys of ``GET /tickets?sort=``, each followed by (created_at, id) in an index,
+# by itself and after ``assignee``.
+PRIORITY_RANK = rank(Ticket.priority, Priority)
+STATUS_RANK = rank(Ticket.status, Status)
+DUE_DATE_KEY = due_date_key(Ticket.due_date)
+# Not DONE; a literal for the partial index's predicate, as in ``rank``.
+OPEN = Ticket.status != literal_column(f"'{Status.DONE.name}'")
+
+Index("ix_tickets_priority_rank_created_at", PRIORITY_RANK, Ticket.created_at, Ticket.id)
+Index("ix_tickets_status_rank_created_at", STATUS_RANK, Ticket.created_at, Ticket.id)
+Index("ix_tickets_due_date_created_at", DUE_DATE_KEY, Ticket.created_at, Ticket.id)
+Index(
+    "ix_tickets_assignee_priority_rank_created_at",
+    Ticket.assignee,
+    PRIORITY_RANK,
+    Ticket.created_at,
+    Ticket.id,
+)
+Index(
+    "ix_tickets_assignee_status_rank_created_at",
+    Ticket.assignee,
+    STATUS_RANK,
+    Ticket.created_at,
+    Ticket.id,
+)
+Index(
+    "ix_tickets_assignee_due_date_created_at",
+    Ticket.assignee,
+    DUE_DATE_KEY,
+    Ticket.created_at,
+    Ticket.id,
+)
+Index(
+    "ix_tickets_open_due_date_created_at",
+    DUE_DATE_KEY,
+    Ticket.created_at,
+    Ticket.id,
+    sqlite_where=OPEN,
+    postgresql_where=OPEN,
+)
+Index(
+    "ix_tickets_open_assignee_due_date_created_at",
+    Ticket.assignee,
+    DUE_DATE_KEY,
+    Ticket.created_at,
+    Ticket.id,
+    sqlite_where=OPEN,
+    postgresql_where=OPEN,
+)
+
+
+def resolve_closed_at(
+    status: Status, closed_at: datetime | None, now: datetime | None = None
+) -> datetime | None:
+    """``closed_at`` is set, to ``now`` or else the current time, when a ticket becomes
+    DONE and cleared when it leaves DONE."""
+    if status == Status.DONE and closed_at is None:
+        return now or datetime.utcnow()
+    if status != Status.DONE and closed_at is not None:
+        return None
+    return closed_at
+
+
 @event.listens_for(Ticket, "before_update")
 def ticket_status_change_handler(mapper, connection, target):
-    if target.status == Status.DONE and target.closed_at is None:
-        target.closed_at = datetime.utcnow()
-    elif target.status != Status.DONE and target.closed_at is not None:
-        target.closed_at = None
+    closed_at = resolve_closed_at(target.status, target.closed_at)
+    if closed_at is not target.closed_at:
+        target.closed_at = closed_at
+
+
+@event.listens_for(Ticket, "before_update")
+def ticket_version_handler(mapper, connection, target):
+    # before_update also sees objects that were touched without any net change.
+    if object_session(target).is_modified(target, include_collections=False):
+        target.version += 1
+
+
+@event.listens_for(Ticket, "after_insert")
+def ticket_insert_handler(mapper, connection, target):
+    change = TicketChange(None, TicketSnapshot.from_row(target))
+    publish_ticket_changes(object_session(target), [change])
+
+
+@event.listens_for(Ticket, "after_update")
+def ticket_update_handler(mapper, connection, target):
+    change = TicketChange(TicketSnapshot.previous(target), TicketSnapshot.from_row(target))
+    publish_ticket_changes(object_session(target), [change])
+
+
+@event.listens_for(Ticket, "after_delete")
+def ticket_delete_handler(mapper, connection, target):
+    change = TicketChange(TicketSnapshot.previous(target), None)
+    publish_ticket_changes(object_session(target), [change])
@@ -0,0 +1,22 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class TicketTombstone(Base):
+    """A deleted ticket, so ``GET /api/v1/tickets?updated_since=`` can report it.
+
+    ``(deleted_at, id)`` sorts with the tickets' ``(updated_at, id)``: one sync token
+    covers both. Written by the ticket delete trigger (migration 0012) and kept for
+    ``TOMBSTONE_RETENTION_DAYS``.
+    """
+
+    __tablename__ = "ticket_tombstones"
+    __table_args__ = (Index("ix_ticket_tombstones_deleted_at_id", "deleted_at", "id"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
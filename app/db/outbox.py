@@ -0,0 +1,123 @@
+"""Reading and pruning the ``events`` outbox (``app.db.models.event``)."""
+
+from datetime import datetime
+
+import orjson
+from sqlalchemy import Connection, Row, Select, and_, delete, func, or_, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.core.events import EventFilter, EventStore, HubEvent
+from app.db.models.event import Event
+from app.db.models.ticket import Status
+from app.db.session import open_session
+
+EVENT_COLUMNS = (
+    Event.id,
+    Event.type,
+    Event.ticket_id,
+    Event.comment_id,
+    Event.assignee,
+    Event.status,
+    Event.previous_assignee,
+    Event.previous_status,
+    Event.payload,
+    Event.created_at,
+)
+
+
+def filter_clause(event_filter: EventFilter):
+    """SQL for ``EventFilter.matches``."""
+
+    def state(assignee, status):
+        clauses = []
+        if event_filter.assignee is not None:
+            clauses.append(assignee == event_filter.assignee)
+        if event_filter.status is not None:
+            clauses.append(status == Status(event_filter.status))
+        return and_(*clauses)
+
+    return or_(
+        state(Event.assignee, Event.status),
+        state(Event.previous_assignee, Event.previous_status),
+    )
+
+
+def events_query(
+    after: int, limit: int, event_filter: EventFilter | None = None, upto: int | None = None
+) -> Select:
+    query = select(*EVENT_COLUMNS).where(Event.id > after)
+    if upto is not None:
+        query = query.where(Event.id <= upto)
+    if event_filter is not None and (event_filter.assignee or event_filter.status):
+        query = query.where(filter_clause(event_filter))
+    return query.order_by(Event.id).limit(limit)
+
+
+def hub_event(row: Row) -> HubEvent:
+    head = orjson.dumps(
+        {
+            "id": row.id,
+            "type": row.type,
+            "occurred_at": row.created_at,
+            "ticket_id": row.ticket_id,
+            "comment_id": row.comment_id,
+        },
+        option=orjson.OPT_UTC_Z,
+    )
+    # The payload is stored encoded; splice it in rather than decode and re-encode.
+    message = head[:-1] + b',"data":' + row.payload.encode() + b"}"
+    return HubEvent(
+        id=row.id,
+        type=row.type,
+        assignee=row.assignee,
+        status=row.status.value,
+        previous_assignee=row.previous_assignee,
+        previous_status=row.previous_status.value,
+        message=message,
+    )
+
+
+def prune_events(connection: Connection, before: datetime) -> int:
+    """Delete events recorded before ``before``; returns how many."""
+    return connection.execute(delete(Event).where(Event.created_at < before)).rowcount
+
+
+def transaction_horizon(connection: Connection) -> tuple[int, int] | None:
+    """``EventStore.transaction_horizon`` for the database behind ``connection``."""
+    if connection.dialect.name != "postgresql":
+        return None
+    # xid8 as text: not every driver decodes it.
+    row = connection.execute(
+        text(
+            "SELECT pg_snapshot_xmin(pg_current_snapshot())::text, "
+            "pg_snapshot_xmax(pg_current_snapshot())::text"
+        )
+    ).one()
+    return int(row[0]), int(row[1])
+
+
+class OutboxStore(EventStore):
+    """The hub's view of the outbox, through ``sessions`` (either stack)."""
+
+    def __init__(self, sessions: async_sessionmaker | sessionmaker):
+        self.sessions = sessions
+
+    async def latest_id(self) -> int:
+        async with open_session(self.sessions) as db:
+            return await db.scalar(select(func.coalesce(func.max(Event.id), 0)))
+
+    async def read(
+        self,
+        after: int,
+        limit: int,
+        event_filter: EventFilter | None = None,
+        upto: int | None = None,
+    ) -> list[HubEvent]:
+        async with open_session(self.sessions) as db:
+            rows = (await db.execute(events_query(after, limit, event_filter, upto))).all()
+        return [hub_event(row) for row in rows]
+
+    async def transaction_horizon(self) -> tuple[int, int] | None:
+        async with open_session(self.sessions) as db:
+            return await db.run_sync(lambda session: transaction_horizon(session.connection()))
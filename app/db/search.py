@@ -0,0 +1,137 @@
+"""Ranked full-text search over tickets and their comments.
+
+Every ticket has one search document combining its title, description and comment
+text, weighted in that order. Migration 0004 creates it with triggers that keep it
+current on each write: a ``tsvector`` behind a GIN index on Postgres, an FTS5 table
+on SQLite. The tables have no ORM model, so they are described here with
+lightweight ``table()`` constructs and left out of autogenerate comparisons.
+"""
+
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import (
+    Float,
+    Integer,
+    Select,
+    Text,
+    Uuid,
+    column,
+    func,
+    literal_column,
+    select,
+    table,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Session
+
+from app.db.models.ticket import Ticket
+
+SEARCH_TABLE = "ticket_search"
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+SNIPPET_WORDS = 16
+
+POSTGRES_CONFIG = literal_column("'english'::regconfig")
+POSTGRES_HEADLINE = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}"
+POSTGRES_SNIPPET = (
+    f"{POSTGRES_HEADLINE}, MaxFragments=2, MaxWords={SNIPPET_WORDS}, MinWords=4, "
+    'FragmentDelimiter=" … "'
+)
+
+postgres_documents = table(
+    SEARCH_TABLE,
+    column("ticket_id", Uuid),
+    column("comments", Text),
+    column("document", TSVECTOR),
+)
+sqlite_documents = table(
+    SEARCH_TABLE,
+    column("id", Integer),
+    column("ticket_id", Uuid),
+)
+sqlite_index = table(f"{SEARCH_TABLE}_fts", column("rowid", Integer), column("rank", Float))
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    ticket: Ticket
+    rank: float
+    title: str
+    description: str | None
+    comments: str | None
+
+
+def is_search_table(name: str) -> bool:
+    """``ticket_search`` plus the FTS5 virtual table and its shadow tables."""
+    return name == SEARCH_TABLE or name.startswith(f"{SEARCH_TABLE}_")
+
+
+def fts5_query(q: str) -> str | None:
+    """Quote every word so user input can never be parsed as FTS5 syntax; terms are ANDed."""
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def postgres_search_query(q: str) -> Select:
+    query = func.websearch_to_tsquery(POSTGRES_CONFIG, q)
+    rank = func.ts_rank_cd(postgres_documents.c.document, query)
+
+    def headline(text, options: str = POSTGRES_SNIPPET):
+        return func.ts_headline(POSTGRES_CONFIG, text, query, options)
+
+    return (
+        select(
+            Ticket,
+            rank,
+            headline(Ticket.title, f"{POSTGRES_HEADLINE}, HighlightAll=true"),
+            headline(Ticket.description),
+            headline(func.nullif(postgres_documents.c.comments, "")),
+        )
+        .join(postgres_documents, postgres_documents.c.ticket_id == Ticket.id)
+        .where(postgres_documents.c.document.op("@@")(query))
+        .order_by(rank.desc(), Ticket.id)
+    )
+
+
+def sqlite_search_query(match: str) -> Select:
+    fts = literal_column(sqlite_index.name)
+
+    def snippet(column_index: int):
+        return func.nullif(
+            func.snippet(fts, column_index, HIGHLIGHT_START, HIGHLIGHT_END, "…", SNIPPET_WORDS),
+            "",
+        )
+
+    return (
+        select(
+            Ticket,
+            # bm25 scores are negative, better matches lower; flip so higher is better.
+            -sqlite_index.c.rank,
+            func.highlight(fts, 0, HIGHLIGHT_START, HIGHLIGHT_END),
+            snippet(1),
+            snippet(2),
+        )
+        .select_from(sqlite_index)
+        .join(sqlite_documents, sqlite_documents.c.id == sqlite_index.c.rowid)
+        .join(Ticket, Ticket.id == sqlite_documents.c.ticket_id)
+        .where(fts.op("MATCH")(match))
+        # Ties on rank break on id, as on Postgres, so offset pages stay stable.
+        .order_by(sqlite_index.c.rank, Ticket.id)
+    )
+
+
+def search_tickets(session: Session, q: str, limit: int, offset: int = 0) -> list[SearchHit]:
+    """Tickets matching every term in ``q``, best match first."""
+    if session.get_bind().dialect.name == "postgresql":
+        statement = postgres_search_query(q)
+    else:
+        match = fts5_query(q)
+        if match is None:
+            return []
+        statement = sqlite_search_query(match)
+
+    rows = session.execute(statement.limit(limit).offset(offset)).all()
+    return [SearchHit(*row) for row in rows]
@@ -1,20 +1,306 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from contextlib import asynccontextmanager
+
+from sqlalchemy import URL, Connection, CursorResult, Engine, Result, create_engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from starlette.requests import Request
 
 from app.core.config import settings
+from app.core.consistency import wants_primary
+from app.core.instrumentation import instrument_engine, pool_class
+from app.db import sqlite
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def to_async_url(url: str | URL) -> URL:
+    """Swap the DBAPI driver in a sync database URL for its asyncio counterpart."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # Comment deletion relies on the ON DELETE CASCADE foreign key, which SQLite
+    # only enforces when asked to, per connection.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def statement_timeout_args(url: URL) -> dict:
+    """Driver arguments setting Postgres' ``statement_timeout`` for every connection.
+
+    Passed at connect time rather than with ``SET``, which a rolled-back first
+    transaction would undo. SQLite has no equivalent; the setting is ignored there.
+    """
+    timeout = settings.database_statement_timeout_ms
+    if not timeout or url.get_backend_name() != "postgresql":
+        return {}
+    if url.get_driver_name() == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(timeout)}}
+    return {"options": f"-c statement_timeout={timeout}"}
+
+
+def disable_statement_timeout(connection: Connection) -> None:
+    """For migrations and maintenance commands, which may run long: this transaction only."""
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SET LOCAL statement_timeout = 0")
+
+
+def engine_options(url: URL, name: str, pool_size: int, max_overflow: int) -> dict:
+    poolclass = pool_class(url, name)
+    options = {
+        "echo": settings.debug,
+        "poolclass": poolclass,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+        "pool_recycle": settings.database_pool_recycle_seconds,
+        "connect_args": statement_timeout_args(url),
+    }
+    # SQLite :memory: databases get a single-connection pool without these knobs.
+    if issubclass(poolclass, QueuePool):
+        options["pool_size"] = pool_size
+        options["max_overflow"] = max_overflow
+        options["pool_timeout"] = settings.database_pool_timeout_seconds
+    return options
+
+
+def prepare_engine(engine: Engine, name: str, read_only: bool = False) -> None:
+    """Instrument ``engine``; on an SQLite file, apply ``app.db.sqlite``'s mode,
+    with ``read_only`` connections for the reading roles."""
+    instrument_engine(engine, name)
+    if sqlite.is_database_file(engine.url):
+        sqlite.tune_engine(engine, read_only)
+    elif engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", enable_sqlite_foreign_keys)
+
+
+def request_engine(url: str, role: str, pool_size: int, max_overflow: int, read_only: bool = False):
+    """An engine with a pool of its own for serving requests in ``role``.
+
+    Async by default; with ``DATABASE_ASYNC=false`` a sync engine, whose sessions
+    ``open_session`` wraps in a ``ThreadpoolSession``.
+    """
+    if settings.database_async:
+        url = to_async_url(url)
+        name = f"{role}:async"
+        created = create_async_engine(url, **engine_options(url, name, pool_size, max_overflow))
+        prepare_engine(created.sync_engine, name, read_only)
+        return created
+
+    url = make_url(url)
+    name = f"{role}:sync"
+    created = create_engine(url, **engine_options(url, name, pool_size, max_overflow))
+    prepare_engine(created, name, read_only)
+    return created
+
+
+def session_factory(bind: AsyncEngine | Engine) -> async_sessionmaker | sessionmaker:
+    if isinstance(bind, AsyncEngine):
+        return async_sessionmaker(bind, autoflush=False, expire_on_commit=False)
+    return sessionmaker(bind, autoflush=False, expire_on_commit=False)
+
 
-engine = create_engine(settings.database_url, echo=settings.debug)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# On an SQLite file (``app.db.sqlite``) one connection writes: requests queue for
+# it in the pool. Reads get a pool of read-only connections in place of a replica,
+# and see every commit, so no client needs to be sent back to the primary.
+SQLITE_FILE = sqlite.is_database_file(make_url(settings.database_url))
+if SQLITE_FILE:
+    write_pool_size, write_max_overflow = 1, 0
+else:
+    write_pool_size, write_max_overflow = (
+        settings.database_pool_size,
+        settings.database_max_overflow,
+    )
+
+# The sync primary engine always exists: migrations and the CLI use it directly.
+engine = create_engine(
+    settings.database_url,
+    **engine_options(
+        make_url(settings.database_url), "primary:sync", write_pool_size, write_max_overflow
+    ),
+)
+prepare_engine(engine, "primary:sync")
+
+async_engine = None
+if settings.database_async:
+    async_engine = request_engine(
+        settings.database_url, "primary", write_pool_size, write_max_overflow
+    )
+
+replica_engine = None
+if settings.database_replica_url:
+    replica_engine = request_engine(
+        settings.database_replica_url,
+        "replica",
+        settings.database_pool_size,
+        settings.database_max_overflow,
+    )
+elif SQLITE_FILE:
+    replica_engine = request_engine(
+        settings.database_url,
+        "read",
+        settings.database_pool_size,
+        settings.database_max_overflow,
+        read_only=True,
+    )
+
+# Metric aggregates read from the primary get a small pool of their own, so a burst
+# of them cannot take the connections that ticket writes are waiting for.
+metrics_engine = request_engine(
+    settings.database_url, "metrics", settings.metrics_pool_size, 0, read_only=SQLITE_FILE
+)
+
+# Change feed reads (``GET /api/v1/events`` replays and the hub's outbox polling)
+# likewise, so many open streams resuming at once cannot starve requests.
+events_engine = request_engine(
+    settings.database_url, "events", settings.events_pool_size, 0, read_only=SQLITE_FILE
+)
+
+checkpointer = None
+if SQLITE_FILE:
+    checkpointer = sqlite.WalCheckpointer(engine, settings.sqlite_checkpoint_interval_seconds)
+
+primary_sessions = session_factory(async_engine or engine)
+replica_sessions = session_factory(replica_engine) if replica_engine is not None else None
+metrics_sessions = session_factory(metrics_engine)
+events_sessions = session_factory(events_engine)
+
+
+async def dispose_engines() -> None:
+    for bound in (async_engine, replica_engine, metrics_engine, events_engine):
+        if isinstance(bound, AsyncEngine):
+            await bound.dispose()
+
+
+class ThreadpoolResult:
+    """A streamed sync ``Result`` fetched in the threadpool, with the ``close()`` of
+    ``AsyncResult`` so a reader can release the cursor before exhausting it."""
+
+    def __init__(self, result: Result):
+        self.result = result
+        self.rows = iterate_in_threadpool(result)
 
-def get_db():
-    db = SessionLocal()
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.rows.__anext__()
+
+    async def close(self) -> None:
+        await self.rows.aclose()
+        await run_in_threadpool(self.result.close)
+
+
+class ThreadpoolSession:
+    """The subset of the ``AsyncSession`` API used by the routers, over a sync ``Session``.
+
+    Each call runs the blocking driver in Starlette's threadpool, reproducing the
+    behaviour of sync ``def`` routes so the two stacks can be compared with
+    ``DATABASE_ASYNC=false``.
+    """
+
+    def __init__(self, sync_session: Session):
+        self.sync_session = sync_session
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kw):
+        def execute():
+            result = self.sync_session.execute(statement, params, **kw)
+            # Buffer rows in the worker thread, as AsyncSession.execute does.
+            if isinstance(result, CursorResult) and not result.returns_rows:
+                return result
+            return result.freeze()()
+
+        return await run_in_threadpool(execute)
+
+    async def scalar(self, statement, params=None, **kw):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kw)
+
+    async def scalars(self, statement, params=None, **kw):
+        return (await self.execute(statement, params, **kw)).scalars()
+
+    async def stream(self, statement, params=None, **kw):
+        result = await run_in_threadpool(self.sync_session.execute, statement, params, **kw)
+        return ThreadpoolResult(result)
+
+    async def get(self, entity, ident, **kw):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kw)
+
+    async def delete(self, instance) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self) -> None:
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def refresh(self, instance) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def run_sync(self, fn, *args, **kw):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kw)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+
+@asynccontextmanager
+async def open_session(sessions: async_sessionmaker | sessionmaker):
+    if isinstance(sessions, async_sessionmaker):
+        async with sessions() as db:
+            yield db
+        return
+
+    db = ThreadpoolSession(sessions())
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+
+
+async def get_db():
+    """The primary, for writes and anything that must see them."""
+    async with open_session(primary_sessions) as db:
+        yield db
+
+
+def reads_from_replica(request: Request) -> bool:
+    """Whether ``get_read_db`` sends this request to ``DATABASE_REPLICA_URL``, which
+    may not have caught up with the latest writes. SQLite's read-only pool sees
+    every commit and does not count."""
+    return bool(settings.database_replica_url) and not wants_primary(request)
 
 
-def create_all():
-    Base.metadata.create_all(bind=engine)
+async def get_read_db(request: Request):
+    """The replica (or SQLite's read-only pool) when there is one, unless this
+    client wrote recently."""
+    sessions = primary_sessions
+    if replica_sessions is not None and not wants_primary(request):
+        sessions = replica_sessions
+    async with open_session(sessions) as db:
+        yield db
+
+
+async def get_metrics_db(request: Request):
+    """Like ``get_read_db``, but the primary is reached through the metrics pool."""
+    sessions = metrics_sessions
+    if replica_sessions is not None and not wants_primary(request):
+        sessions = replica_sessions
+    async with open_session(sessions) as db:
+        yield db
@@ -0,0 +1,115 @@
+"""SQLite production mode, used when ``DATABASE_URL`` names an SQLite file.
+
+The database runs in WAL mode: a reader works from a snapshot of the last commit
+while the writer appends to the log, so readers never wait for a write or block
+one. SQLite still allows one writer at a time, so ``app.db.session`` gives each
+process a single write connection, for which requests queue in its pool, and a
+pool of read-only connections for the read routes. Write transactions start with
+``BEGIN IMMEDIATE``, taking the write lock up front and waiting up to
+``SQLITE_BUSY_TIMEOUT_MS`` for another process's writer; a deferred transaction
+would only ask for it at its first write and fail at once if a commit got there
+first ("database is locked").
+
+Every connection trades durability of the last commits on power loss (not on a
+crash of the process) for an fsync per checkpoint rather than per commit
+(``synchronous=NORMAL``), and reads through a memory map and a page cache sized by
+the settings. A ``WalCheckpointer`` copies the log back into the database in the
+background, so that commits rarely pay for SQLite's own checkpoint, which runs
+on the committing connection once the log reaches 1000 pages.
+"""
+
+import asyncio
+import sqlite3
+
+from sqlalchemy import URL, Engine, event
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+def is_database_file(url: URL) -> bool:
+    """Whether ``url`` is an SQLite database file (not ``:memory:``)."""
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def connection_pragmas(read_only: bool) -> list[str]:
+    # First, so that every other pragma (switching to WAL too) waits for locks.
+    pragmas = [f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}"]
+    if not read_only:
+        # Stored in the database file: a writer sets it once for every connection.
+        pragmas.append("PRAGMA journal_mode=WAL")
+    pragmas += [
+        # Comment deletion relies on the ON DELETE CASCADE foreign key.
+        "PRAGMA foreign_keys=ON",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}",
+        # Negative: in KiB rather than pages.
+        f"PRAGMA cache_size={-settings.sqlite_cache_size_mb * 1024}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def tune_engine(engine: Engine, read_only: bool = False) -> None:
+    """Apply the SQLite mode to every connection of ``engine``.
+
+    The driver's own transaction handling is turned off (it begins a transaction
+    before the first write, not the first statement) and each transaction begins
+    explicitly: ``BEGIN IMMEDIATE`` to write, ``BEGIN`` to read from one snapshot.
+    """
+    pragmas = connection_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    begin = "BEGIN" if read_only else "BEGIN IMMEDIATE"
+
+    @event.listens_for(engine, "begin")
+    def begin_transaction(connection):
+        connection.exec_driver_sql(begin)
+
+
+def checkpoint(engine: Engine) -> tuple[int, int, int]:
+    """Copy committed pages from the log into the database without waiting for
+    readers or writers: ``(busy, log pages, pages checkpointed)``."""
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        return tuple(cursor.fetchone())
+    finally:
+        connection.close()
+
+
+class WalCheckpointer:
+    """Runs ``checkpoint`` every ``interval`` seconds, in the threadpool, from
+    ``start`` until ``close``."""
+
+    def __init__(self, engine: Engine, interval: float):
+        self.engine = engine
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_in_threadpool(checkpoint, self.engine)
+            except sqlite3.OperationalError:
+                # Another process checkpointing, or the disk: the next round retries.
+                pass
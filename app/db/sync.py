@@ -0,0 +1,66 @@
+"""Delta reads for clients mirroring tickets: what changed after a sync position.
+
+A position is a ``(time, id)`` key. Tickets sort by ``(updated_at, id)`` and
+tombstones by ``(deleted_at, id)``, so both are read with one keyset condition each
+and merged into a single order that a page can stop anywhere in.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import Connection, Row, delete, select, tuple_
+
+from app.db.models.ticket import Ticket
+from app.db.models.tombstone import TicketTombstone
+
+SyncKey = tuple[datetime, uuid.UUID]
+
+
+@dataclass
+class TicketChanges:
+    tickets: list[Row] = field(default_factory=list)
+    deleted: list[uuid.UUID] = field(default_factory=list)
+    # Key of the last change returned, or None if there were none.
+    last: SyncKey | None = None
+    has_more: bool = False
+
+
+def read_ticket_changes(
+    connection: Connection, columns: list, after: SyncKey, limit: int
+) -> TicketChanges:
+    """Up to ``limit`` changes after ``after``, oldest first: tickets as ``columns``
+    rows (which must include ``updated_at`` and ``id``), deletions as ids."""
+    tickets = connection.execute(
+        select(*columns)
+        .where(tuple_(Ticket.updated_at, Ticket.id) > after)
+        .order_by(Ticket.updated_at, Ticket.id)
+        .limit(limit + 1)
+    ).all()
+    tombstones = connection.execute(
+        select(TicketTombstone.deleted_at, TicketTombstone.id)
+        .where(tuple_(TicketTombstone.deleted_at, TicketTombstone.id) > after)
+        .order_by(TicketTombstone.deleted_at, TicketTombstone.id)
+        .limit(limit + 1)
+    ).all()
+
+    merged = sorted(
+        [((row.updated_at, row.id), row) for row in tickets]
+        + [((row.deleted_at, row.id), None) for row in tombstones],
+        key=lambda item: item[0],
+    )
+    changes = TicketChanges(has_more=len(merged) > limit)
+    for key, row in merged[:limit]:
+        if row is None:
+            changes.deleted.append(key[1])
+        else:
+            changes.tickets.append(row)
+        changes.last = key
+    return changes
+
+
+def prune_tombstones(connection: Connection, before: datetime) -> int:
+    """Delete tombstones older than ``before``; returns how many."""
+    return connection.execute(
+        delete(TicketTombstone).where(TicketTombstone.deleted_at < before)
+    ).rowcount
@@ -1,17 +1,32 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
-from app.api.v1 import comments, metrics, tickets
+from app.api import internal
+from app.api.v1 import comments, events, metrics, search, tickets, transfer
+from app.core.admission import AdmissionMiddleware
+from app.core.config import settings
+from app.core.consistency import ReadYourWritesMiddleware
+from app.core.instrumentation import InstrumentationMiddleware, track_in_flight
+from app.db import migrate
 from app.db.models import Comment, Ticket  # noqa: F401
-from app.db.session import create_all
+from app.db.session import checkpointer, dispose_engines
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    create_all()
+    if settings.migrate_on_startup:
+        await run_in_threadpool(migrate.upgrade)
+    if checkpointer is not None:
+        checkpointer.start()
     yield
+    if checkpointer is not None:
+        await checkpointer.close()
+    await comments.comment_batcher.close()
+    await events.hub.close()
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -19,6 +34,7 @@ app = FastAPI(
     description="Lightweight REST API for task tracking",
     version="0.1.0",
     lifespan=lifespan,
+    dependencies=[Depends(track_in_flight)],
 )
 
 # Configure CORS
@@ -29,12 +45,21 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ReadYourWritesMiddleware)
+# Inside the instrumentation, so that shed requests are counted like any other
+app.add_middleware(AdmissionMiddleware)
+# Outermost, so it times everything the other middleware do
+app.add_middleware(InstrumentationMiddleware)
 
 app.include_router(tickets.router, prefix="/api/v1", tags=["tickets"])
 app.include_router(comments.router, prefix="/api/v1", tags=["comments"])
 app.include_router(metrics.router, prefix="/api/v1", tags=["metrics"])
+app.include_router(search.router, prefix="/api/v1", tags=["search"])
+app.include_router(events.router, prefix="/api/v1", tags=["events"])
+app.include_router(transfer.router, prefix="/api/v1", tags=["transfer"])
+app.include_router(internal.router, prefix="/internal", tags=["internal"])
 
 
 @app.get("/")
-def health_check():
+async def health_check():
     return {"status": "ok"}
@@ -22,5 +22,6 @@ class CommentResponse(BaseModel):
     author: str
     content: str
     created_at: datetime
+    updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -1,5 +1,11 @@
+from datetime import date
+from typing import Literal
+
 from pydantic import BaseModel
 
+TimeseriesBucket = Literal["day", "week"]
+TimeseriesGroup = Literal["assignee", "priority"]
+
 
 class MetricsResponse(BaseModel):
     todo_count: int
@@ -7,3 +13,34 @@ class MetricsResponse(BaseModel):
     done_count: int
     total_count: int
     avg_time_to_close_hours: float | None
+
+
+class MetricsGroup(MetricsResponse):
+    group: dict[str, str | None]
+
+
+class GroupedMetricsResponse(BaseModel):
+    group_by: list[TimeseriesGroup]
+    groups: list[MetricsGroup]
+
+
+class FlowPoint(BaseModel):
+    start: date
+    created_count: int
+    closed_count: int
+    time_to_close_p50_hours: float | None
+    time_to_close_p90_hours: float | None
+    time_to_close_p99_hours: float | None
+
+
+class FlowSeries(BaseModel):
+    group: dict[str, str | None]
+    points: list[FlowPoint]
+
+
+class TimeseriesResponse(BaseModel):
+    bucket: TimeseriesBucket
+    start: date
+    end: date
+    group_by: list[TimeseriesGroup]
+    series: list[FlowSeries]
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+from app.schemas.ticket import TicketResponse
+
+
+class SearchHighlights(BaseModel):
+    title: str
+    description: str | None
+    comments: str | None
+
+
+class SearchResult(BaseModel):
+    ticket: TicketResponse
+    rank: float
+    highlights: SearchHighlights
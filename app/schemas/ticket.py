@@ -1,9 +1,24 @@
 import uuid
 from datetime import date, datetime
+from typing import Literal
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, create_model
 
+from app.core.config import settings
 from app.db.models.ticket import Priority, Status
+from app.schemas.comment import CommentResponse
+
+# ``-`` for descending; ties are broken by (created_at, id) in the same direction.
+TicketSort = Literal[
+    "created_at",
+    "-created_at",
+    "due_date",
+    "-due_date",
+    "priority",
+    "-priority",
+    "status",
+    "-status",
+]
 
 
 class TicketCreate(BaseModel):
@@ -34,5 +49,75 @@ class TicketResponse(BaseModel):
     due_date: date | None
     created_at: datetime
     closed_at: datetime | None
+    updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# ``?fields=`` responses: ``id`` and whichever ``TicketResponse`` fields were asked for.
+TicketFieldsResponse = create_model(
+    "TicketFieldsResponse",
+    __doc__="A ticket with only the requested ``fields``; the others are absent, not null.",
+    id=(uuid.UUID, ...),
+    **{
+        name: (info.annotation, None)
+        for name, info in TicketResponse.model_fields.items()
+        if name != "id"
+    },
+)
+
+
+class TicketIncludesResponse(TicketFieldsResponse):
+    """A ticket with the requested ``fields`` and ``include=`` data; the included keys
+    are absent unless requested."""
+
+    comments: list[CommentResponse] | None = None
+    comment_count: int | None = None
+
+
+class TicketChangesResponse(BaseModel):
+    """``GET /tickets?updated_since=``: changes after the token, oldest first."""
+
+    tickets: list[TicketResponse] | list[TicketFieldsResponse]
+    deleted: list[uuid.UUID]
+    sync_token: str
+    has_more: bool
+
+
+class TicketBulkCreate(BaseModel):
+    items: list[TicketCreate] = Field(min_length=1, max_length=settings.bulk_max_items)
+
+
+class TicketBulkUpdateItem(TicketUpdate):
+    id: uuid.UUID
+
+
+class TicketBulkUpdate(BaseModel):
+    items: list[TicketBulkUpdateItem] = Field(min_length=1, max_length=settings.bulk_max_items)
+
+
+class TicketBulkDelete(BaseModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=settings.bulk_max_items)
+
+
+class TicketBatchGet(BaseModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=settings.bulk_max_items)
+
+
+class TicketBatchGetResponse(BaseModel):
+    """``POST /tickets:batchGet``: found tickets in request order, then unknown ids."""
+
+    tickets: list[TicketResponse] | list[TicketIncludesResponse]
+    missing: list[uuid.UUID]
+
+
+class TicketBulkResult(BaseModel):
+    index: int
+    id: uuid.UUID
+    status: int
+    ticket: TicketResponse | None = None
+
+
+class TicketBulkResponse(BaseModel):
+    results: list[TicketBulkResult]
@@ -0,0 +1,37 @@
+import uuid
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.schemas.comment import CommentCreate, CommentResponse
+from app.schemas.ticket import TicketCreate, TicketResponse
+
+
+class TicketExport(TicketResponse):
+    """One line (NDJSON) or row (CSV, ``comments`` as a JSON array) of an export."""
+
+    comments: list[CommentResponse]
+
+
+class TicketImport(TicketCreate):
+    """One row of an import. Other keys, such as an export's ids and timestamps, are
+    ignored, so an export can be imported as it is."""
+
+    comments: list[CommentCreate] = []
+
+
+class ImportResult(BaseModel):
+    """One line of the ``POST /import`` response per input row, in input order."""
+
+    row: int
+    status: int
+    id: uuid.UUID | None = None
+    comments: int | None = None
+    errors: list[dict[str, Any]] | None = None
+
+
+class ImportSummary(BaseModel):
+    """The last line of the ``POST /import`` response, once every row has been read."""
+
+    imported: int
+    rejected: int
@@ -0,0 +1 @@
+"""Load-test and benchmark suite; see ``docs/benchmarks.md``."""
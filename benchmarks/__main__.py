@@ -0,0 +1,151 @@
+"""Command line entry point.
+
+Usage::
+
+    python -m benchmarks run [--profile small|medium|large | --tickets N] [--output PATH]
+    python -m benchmarks compare BASE HEAD [--threshold 0.10]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.report import DEFAULT_THRESHOLD
+
+PROFILES = {"small": 10_000, "medium": 100_000, "large": 1_000_000}
+
+
+def run(args: argparse.Namespace) -> int:
+    database = args.database or Path(tempfile.mkdtemp()) / "benchmark.db"
+    # Settings are read when the app is first imported, so configure it before that.
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ["DATABASE_ASYNC"] = "true"
+    os.environ["DEBUG"] = "false"
+
+    from app.db import migrate
+    from app.db.session import async_engine, engine, events_engine, metrics_engine, replica_engine
+    from app.main import app
+    from benchmarks import seed, serialization
+    from benchmarks.driver import run_scenarios
+    from benchmarks.report import build_report, write_report
+    from benchmarks.scenarios import SCENARIOS, load_context, uncovered_routes
+
+    uncovered = uncovered_routes(app)
+    if uncovered:
+        for method, path in sorted(uncovered):
+            print(f"no scenario for {method} {path}", file=sys.stderr)
+        return 2
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    tickets = args.tickets or PROFILES[args.profile]
+
+    migrate.upgrade()
+    with engine.begin() as connection:
+        existing = seed.ticket_total(connection)
+        if existing:
+            print(f"reusing {database} with {existing} tickets")
+            seeded = {"tickets": existing, "comments": None, "seconds": 0.0, "reused": True}
+        else:
+            print(f"seeding {tickets} tickets into {database}")
+            result = seed.seed(connection, tickets, args.seed)
+            seeded = {**vars(result), "reused": False}
+            print(f"seeded {result.comments} comments in {result.seconds:.1f}s")
+        context = load_context(connection, args.seed)
+
+    # Every pool serving requests: reads go to their own on SQLite.
+    request_engines = [
+        bound.sync_engine
+        for bound in (async_engine, replica_engine, metrics_engine, events_engine)
+        if bound is not None
+    ]
+    results = asyncio.run(
+        run_scenarios(
+            app,
+            request_engines,
+            scenarios,
+            context,
+            args.requests,
+            args.concurrency,
+            args.warmup,
+        )
+    )
+    for name, result in results.items():
+        latency = result["latency_ms"]
+        print(
+            f"{name:<28} p50 {latency['p50']:8.2f}ms  p99 {latency['p99']:8.2f}ms  "
+            f"{result['throughput_rps']:8.1f} req/s  {result['sql_per_request']:5.1f} sql/req  "
+            f"{result['bytes_per_request']:9.0f} B/req"
+        )
+
+    encoded = serialization.measure(engine, args.serialization_repeats)
+    for name, result in encoded.items():
+        print(
+            f"serialize {name:<18} pydantic {result['pydantic_rows_per_s']:10.0f} rows/s  "
+            f"fast {result['fast_rows_per_s']:10.0f} rows/s  x{result['speedup']:.1f}"
+        )
+
+    config = {
+        "tickets": tickets,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "serialization_repeats": args.serialization_repeats,
+    }
+    write_report(build_report(config, seeded, results, encoded), args.output)
+    print(f"report written to {args.output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    from benchmarks.report import compare_reports, format_differences, read_report
+
+    differences = compare_reports(read_report(args.base), read_report(args.head), args.threshold)
+    print(format_differences(differences))
+    regressions = [d for d in differences if d.regression]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Seed a SQLite database and benchmark every route")
+    run_parser.add_argument("--profile", choices=PROFILES, default="small")
+    run_parser.add_argument("--tickets", type=int, help="Overrides the profile's ticket count")
+    run_parser.add_argument(
+        "--database", type=Path, help="SQLite file; seeded only if it holds no tickets"
+    )
+    run_parser.add_argument("--requests", type=int, default=200, help="Per scenario")
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--warmup", type=int, default=20, help="Unmeasured, per scenario")
+    run_parser.add_argument("--seed", type=int, default=0, help="RNG seed for data and requests")
+    run_parser.add_argument("--scenario", action="append", help="Only these (repeatable)")
+    run_parser.add_argument(
+        "--serialization-repeats", type=int, default=20, help="List pages encoded per path"
+    )
+    run_parser.add_argument("--output", type=Path, default=Path("benchmark-report.json"))
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="Diff two reports")
+    compare_parser.add_argument("base", type=Path)
+    compare_parser.add_argument("head", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    compare_parser.set_defaults(func=compare)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""In-process load driver.
+
+Requests go straight to the ASGI app through ``httpx.ASGITransport``: no sockets and
+no server process, so the numbers measure the application and database rather than
+the network stack. Each scenario runs ``concurrency`` workers on one event loop,
+the same way a single uvicorn worker interleaves requests.
+"""
+
+import asyncio
+import resource
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import Engine, event
+
+from app.core.config import settings
+from benchmarks.report import latency_summary
+from benchmarks.scenarios import Context, Scenario
+
+
+class StatementCounter:
+    """Counts statements sent to the database through ``engines``; an executemany
+    counts once."""
+
+    def __init__(self, engines: list[Engine]):
+        self.engines = engines
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self) -> "StatementCounter":
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._count)
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    seconds: float
+    latencies_ms: list[float] = field(repr=False)
+    statements: int
+    response_bytes: int
+    peak_rss_kb: int
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput_rps": self.requests / self.seconds if self.seconds else 0.0,
+            "latency_ms": latency_summary(self.latencies_ms),
+            "sql_per_request": self.statements / self.requests if self.requests else 0.0,
+            "bytes_per_request": self.response_bytes / self.requests if self.requests else 0.0,
+            "peak_rss_kb": self.peak_rss_kb,
+        }
+
+
+@contextmanager
+def overridden_settings(overrides: dict):
+    saved = {name: getattr(settings, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+
+def peak_rss_kb() -> int:
+    """High-water mark of this process's resident set (kilobytes on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    context: Context,
+    counter: StatementCounter,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> ScenarioResult:
+    if scenario.prepare is not None:
+        await scenario.prepare(client, context, warmup + requests)
+
+    async def send():
+        request = scenario.build(context)
+        started = time.perf_counter()
+        response = await client.request(
+            request.method,
+            request.url,
+            json=request.json,
+            content=request.content,
+            params=request.params,
+            headers=request.headers,
+        )
+        body = await response.aread()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return elapsed_ms, response.status_code >= 400, len(body)
+
+    for _ in range(warmup):
+        await send()
+
+    latencies: list[float] = []
+    errors = 0
+    response_bytes = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors, response_bytes
+        while remaining > 0:
+            remaining -= 1
+            elapsed_ms, failed, size = await send()
+            latencies.append(elapsed_ms)
+            errors += failed
+            response_bytes += size
+
+    statements_before = counter.count
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return ScenarioResult(
+        requests=requests,
+        errors=errors,
+        seconds=time.perf_counter() - started,
+        latencies_ms=latencies,
+        statements=counter.count - statements_before,
+        response_bytes=response_bytes,
+        peak_rss_kb=peak_rss_kb(),
+    )
+
+
+async def run_scenarios(
+    app: FastAPI,
+    engines: list[Engine],
+    scenarios: list[Scenario],
+    context: Context,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> dict[str, dict]:
+    """Run ``scenarios`` in order, between the app's startup and shutdown; returns
+    ``{name: result}`` ready for the report. Statements are counted on ``engines``."""
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client,
+    ):
+        with StatementCounter(engines) as counter:
+            for scenario in scenarios:
+                with overridden_settings(scenario.settings):
+                    result = await run_scenario(
+                        client, scenario, context, counter, requests, concurrency, warmup
+                    )
+                results[scenario.name] = result.as_dict()
+    return results
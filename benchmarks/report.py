@@ -0,0 +1,136 @@
+"""Benchmark reports: latency summaries, JSON files and report comparison."""
+
+import json
+import math
+import platform
+import sqlite3
+import sys
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+REPORT_VERSION = 1
+DEFAULT_THRESHOLD = 0.10
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Linear interpolation between closest ranks of an ascending list."""
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q
+    lower, upper = math.floor(position), math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def latency_summary(latencies_ms: list[float]) -> dict[str, float]:
+    ordered = sorted(latencies_ms)
+    return {
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+
+def build_report(
+    config: dict, seed: dict, scenarios: dict[str, dict], serialization: dict[str, dict]
+) -> dict:
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(UTC).isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "config": config,
+        "seed": seed,
+        "scenarios": scenarios,
+        "serialization": serialization,
+    }
+
+
+def write_report(report: dict, path: Path) -> None:
+    path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def read_report(path: Path) -> dict:
+    report = json.loads(path.read_text())
+    if report.get("version") != REPORT_VERSION:
+        raise ValueError(f"{path}: unsupported report version {report.get('version')!r}")
+    return report
+
+
+@dataclass(frozen=True)
+class Difference:
+    scenario: str
+    metric: str
+    base: float
+    head: float
+    regression: bool
+
+    @property
+    def change(self) -> float | None:
+        if self.base == 0:
+            return None
+        return (self.head - self.base) / self.base
+
+
+def compare_reports(
+    base: dict, head: dict, threshold: float = DEFAULT_THRESHOLD
+) -> list[Difference]:
+    """Per-scenario differences; a regression is a p95/p99 latency, throughput or
+    response size change worse than ``threshold`` (relative), any extra SQL per
+    request, or new errors, and a fast-path serialization rate worse than
+    ``threshold``. Scenarios present in only one report are skipped.
+    """
+    differences = []
+    for name, b in base["scenarios"].items():
+        h = head["scenarios"].get(name)
+        if h is None:
+            continue
+        for quantile in ("p50", "p95", "p99"):
+            old, new = b["latency_ms"][quantile], h["latency_ms"][quantile]
+            gated = quantile != "p50"
+            differences.append(
+                Difference(name, f"{quantile}_ms", old, new, gated and new > old * (1 + threshold))
+            )
+        old, new = b["throughput_rps"], h["throughput_rps"]
+        differences.append(
+            Difference(name, "throughput_rps", old, new, new < old * (1 - threshold))
+        )
+        old, new = b["sql_per_request"], h["sql_per_request"]
+        differences.append(Difference(name, "sql_per_request", old, new, new > old + 1e-9))
+        old, new = b["errors"], h["errors"]
+        differences.append(Difference(name, "errors", old, new, new > old))
+        # Reports written before response sizes were recorded have none.
+        if "bytes_per_request" in b and "bytes_per_request" in h:
+            old, new = b["bytes_per_request"], h["bytes_per_request"]
+            differences.append(
+                Difference(name, "bytes_per_request", old, new, new > old * (1 + threshold))
+            )
+    for name, b in base.get("serialization", {}).items():
+        h = head.get("serialization", {}).get(name)
+        if h is None:
+            continue
+        for metric in ("pydantic_rows_per_s", "fast_rows_per_s"):
+            old, new = b[metric], h[metric]
+            gated = metric == "fast_rows_per_s"
+            differences.append(
+                Difference(
+                    f"serialize_{name}", metric, old, new, gated and new < old * (1 - threshold)
+                )
+            )
+    return differences
+
+
+def format_differences(differences: list[Difference]) -> str:
+    lines = [f"{'scenario':<28} {'metric':<20} {'base':>10} {'head':>10} {'change':>8}"]
+    for d in differences:
+        change = "n/a" if d.change is None else f"{d.change:+.1%}"
+        flag = "  REGRESSION" if d.regression else ""
+        lines.append(
+            f"{d.scenario:<28} {d.metric:<20} {d.base:>10.2f} {d.head:>10.2f} {change:>8}{flag}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,435 @@
+"""One or more load scenarios per API route.
+
+A scenario turns the shared ``Context`` (ids sampled from the seeded database) into
+one request at a time. Destructive scenarios first create the rows they will
+delete through the API, so the metric counters and rollups stay consistent.
+Every route in the OpenAPI schema must be covered; ``uncovered_routes`` reports
+the ones that are not, and the suite refuses to run until they are.
+"""
+
+import json
+import random
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import Connection, func, select
+
+from app.api.pagination import NDJSON_MEDIA_TYPE, encode_cursor, encode_sync_token
+from app.db.models.comment import Comment
+from app.db.models.ticket import Priority, Status, Ticket
+from benchmarks.seed import ASSIGNEES, WORDS, sentence
+
+SAMPLE_SIZE = 1_000
+BULK_SIZE = 100
+BATCH_GET_SIZE = 50
+TICKETS = "/api/v1/tickets"
+# What a board view shows: no description.
+BOARD_FIELDS = "id,title,status,priority,assignee"
+
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    json: object = None
+    params: dict | None = None
+    headers: dict | None = None
+    content: bytes | None = None
+
+
+@dataclass
+class Context:
+    rng: random.Random
+    tickets: list[tuple[uuid.UUID, datetime]]
+    commented: list[uuid.UUID]
+    disposable_tickets: list[uuid.UUID] = field(default_factory=list)
+    disposable_comments: list[tuple[uuid.UUID, uuid.UUID]] = field(default_factory=list)
+    etags: dict[uuid.UUID, str] = field(default_factory=dict)
+
+    def ticket_id(self) -> uuid.UUID:
+        return self.rng.choice(self.tickets)[0]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    route: str
+    build: Callable[[Context], Request]
+    prepare: Callable[[httpx.AsyncClient, Context, int], Awaitable[None]] | None = None
+    # ``app.core.config.settings`` overridden while the scenario runs.
+    settings: dict = field(default_factory=dict)
+
+
+def load_context(connection: Connection, rng_seed: int = 0) -> Context:
+    """Sample existing tickets, favouring none in particular, to aim requests at."""
+    tickets = connection.execute(
+        select(Ticket.id, Ticket.created_at).order_by(func.random()).limit(SAMPLE_SIZE)
+    ).all()
+    commented = connection.scalars(
+        select(Comment.ticket_id).distinct().order_by(func.random()).limit(SAMPLE_SIZE)
+    ).all()
+    return Context(
+        rng=random.Random(rng_seed),
+        tickets=[tuple(row) for row in tickets],
+        commented=list(commented) or [row[0] for row in tickets],
+    )
+
+
+def new_ticket(context: Context) -> dict:
+    return {
+        "title": sentence(context.rng, 4),
+        "description": sentence(context.rng, 12),
+        "assignee": context.rng.choice(ASSIGNEES),
+        "priority": context.rng.choice(list(Priority)).value,
+    }
+
+
+async def create_disposable_tickets(client: httpx.AsyncClient, context: Context, count: int):
+    for start in range(0, count, BULK_SIZE):
+        items = [new_ticket(context) for _ in range(min(BULK_SIZE, count - start))]
+        response = await client.post(f"{TICKETS}:bulk", json={"items": items})
+        response.raise_for_status()
+        context.disposable_tickets.extend(
+            uuid.UUID(result["id"]) for result in response.json()["results"]
+        )
+    # A few comments each, so deletes exercise the cascade.
+    for ticket_id in context.disposable_tickets[-count:]:
+        for _ in range(context.rng.randint(0, 3)):
+            await client.post(
+                f"{TICKETS}/{ticket_id}/comments",
+                json={"author": "bench", "content": sentence(context.rng, 8)},
+            )
+
+
+async def create_disposable_comments(client: httpx.AsyncClient, context: Context, count: int):
+    for _ in range(count):
+        ticket_id = context.ticket_id()
+        response = await client.post(
+            f"{TICKETS}/{ticket_id}/comments",
+            json={"author": "bench", "content": sentence(context.rng, 8)},
+        )
+        response.raise_for_status()
+        context.disposable_comments.append((ticket_id, uuid.UUID(response.json()["id"])))
+
+
+async def fetch_etags(client: httpx.AsyncClient, context: Context, count: int):
+    for ticket_id, _ in context.tickets[:50]:
+        response = await client.get(f"{TICKETS}/{ticket_id}")
+        if response.status_code == 200:
+            context.etags[ticket_id] = response.headers["ETag"]
+
+
+def ticket_page(context: Context) -> Request:
+    ticket_id, created_at = context.rng.choice(context.tickets)
+    cursor = encode_cursor(created_at, ticket_id)
+    return Request("GET", TICKETS, params={"limit": 100, "cursor": cursor})
+
+
+def sorted_ticket_page(context: Context) -> Request:
+    # Within a priority, as most cursors of a priority-sorted list are.
+    ticket_id, created_at = context.rng.choice(context.tickets)
+    cursor = encode_cursor(context.rng.randrange(3), created_at, ticket_id, sort="-priority")
+    return Request("GET", TICKETS, params={"sort": "-priority", "limit": 100, "cursor": cursor})
+
+
+def ticket_changes(context: Context) -> Request:
+    # A client that last synced a day ago: the seeded tickets closed since, plus
+    # whatever the write scenarios have done.
+    since = encode_sync_token(datetime.utcnow() - timedelta(days=1), uuid.UUID(int=0))
+    return Request("GET", TICKETS, params={"updated_since": since})
+
+
+def new_comment(context: Context) -> Request:
+    return Request(
+        "POST",
+        f"{TICKETS}/{context.ticket_id()}/comments",
+        json={"author": "bench", "content": sentence(context.rng, 8)},
+    )
+
+
+def batch_get(context: Context) -> Request:
+    # A board of cards, each showing its comment count.
+    ids = [str(context.ticket_id()) for _ in range(BATCH_GET_SIZE)]
+    return Request(
+        "POST",
+        f"{TICKETS}:batchGet",
+        params={"fields": BOARD_FIELDS, "include": "comment_count"},
+        json={"ids": ids},
+    )
+
+
+def conditional_get(context: Context) -> Request:
+    ticket_id = context.rng.choice(list(context.etags))
+    return Request(
+        "GET", f"{TICKETS}/{ticket_id}", headers={"If-None-Match": context.etags[ticket_id]}
+    )
+
+
+def bulk_update(context: Context) -> Request:
+    return Request(
+        "PATCH",
+        f"{TICKETS}:bulk",
+        json={
+            "items": [
+                {"id": str(context.ticket_id()), "status": context.rng.choice(list(Status)).value}
+                for _ in range(BULK_SIZE)
+            ]
+        },
+    )
+
+
+def bulk_delete(context: Context) -> Request:
+    ids = [str(context.disposable_tickets.pop()) for _ in range(BULK_SIZE)]
+    return Request("DELETE", f"{TICKETS}:bulk", json={"ids": ids})
+
+
+def delete_comment(context: Context) -> Request:
+    ticket_id, comment_id = context.disposable_comments.pop()
+    return Request("DELETE", f"{TICKETS}/{ticket_id}/comments/{comment_id}")
+
+
+def import_upload(context: Context) -> Request:
+    lines = (
+        json.dumps(
+            {
+                **new_ticket(context),
+                "comments": [
+                    {"author": "bench", "content": sentence(context.rng, 8)}
+                    for _ in range(context.rng.randint(0, 3))
+                ],
+            }
+        )
+        for _ in range(BULK_SIZE)
+    )
+    return Request(
+        "POST",
+        "/api/v1/import",
+        headers={"Content-Type": NDJSON_MEDIA_TYPE},
+        content="\n".join(lines).encode(),
+    )
+
+
+def timeseries(bucket: str) -> Callable[[Context], Request]:
+    def build(context: Context) -> Request:
+        end = context.rng.choice(context.tickets)[1].date()
+        return Request(
+            "GET",
+            "/api/v1/metrics/timeseries",
+            params={
+                "from": str(end - timedelta(days=89)),
+                "to": str(end),
+                "bucket": bucket,
+                "group_by": ["assignee", "priority"],
+            },
+        )
+
+    return build
+
+
+async def prepare_bulk_delete(client: httpx.AsyncClient, context: Context, count: int):
+    await create_disposable_tickets(client, context, count * BULK_SIZE)
+
+
+SCENARIOS = [
+    Scenario("health", "GET", "/", lambda c: Request("GET", "/")),
+    Scenario(
+        "create_ticket", "POST", TICKETS, lambda c: Request("POST", TICKETS, json=new_ticket(c))
+    ),
+    Scenario(
+        "list_tickets", "GET", TICKETS, lambda c: Request("GET", TICKETS, params={"limit": 100})
+    ),
+    Scenario(
+        "list_tickets_board",
+        "GET",
+        TICKETS,
+        lambda c: Request("GET", TICKETS, params={"limit": 100, "fields": BOARD_FIELDS}),
+    ),
+    Scenario(
+        "list_tickets_with_comments",
+        "GET",
+        TICKETS,
+        lambda c: Request("GET", TICKETS, params={"limit": 100, "include": "comments"}),
+    ),
+    Scenario("batch_get_tickets", "POST", f"{TICKETS}:batchGet", batch_get),
+    Scenario(
+        "list_tickets_archived",
+        "GET",
+        TICKETS,
+        lambda c: Request("GET", TICKETS, params={"limit": 100, "include_archived": "true"}),
+    ),
+    Scenario("list_tickets_next_page", "GET", TICKETS, ticket_page),
+    Scenario("list_tickets_sorted_page", "GET", TICKETS, sorted_ticket_page),
+    Scenario(
+        "list_tickets_due_soon",
+        "GET",
+        TICKETS,
+        lambda c: Request(
+            "GET",
+            TICKETS,
+            params={
+                "assignee": c.rng.choice(ASSIGNEES),
+                "overdue": "true",
+                "due_within": 7,
+                "limit": 100,
+            },
+        ),
+    ),
+    Scenario(
+        "list_tickets_filtered",
+        "GET",
+        TICKETS,
+        lambda c: Request(
+            "GET",
+            TICKETS,
+            params={"assignee": c.rng.choice(ASSIGNEES), "status": "TODO", "limit": 100},
+        ),
+    ),
+    Scenario("list_tickets_changed_since", "GET", TICKETS, ticket_changes),
+    Scenario(
+        "list_tickets_ndjson",
+        "GET",
+        TICKETS,
+        lambda c: Request(
+            "GET", TICKETS, params={"limit": 1000}, headers={"Accept": NDJSON_MEDIA_TYPE}
+        ),
+    ),
+    Scenario(
+        "get_ticket",
+        "GET",
+        f"{TICKETS}/{{ticket_id}}",
+        lambda c: Request("GET", f"{TICKETS}/{c.ticket_id()}"),
+    ),
+    Scenario(
+        "get_ticket_not_modified",
+        "GET",
+        f"{TICKETS}/{{ticket_id}}",
+        conditional_get,
+        prepare=fetch_etags,
+    ),
+    Scenario(
+        "update_ticket",
+        "PATCH",
+        f"{TICKETS}/{{ticket_id}}",
+        lambda c: Request(
+            "PATCH",
+            f"{TICKETS}/{c.ticket_id()}",
+            json={"status": c.rng.choice(list(Status)).value, "title": sentence(c.rng, 4)},
+        ),
+    ),
+    Scenario(
+        "delete_ticket",
+        "DELETE",
+        f"{TICKETS}/{{ticket_id}}",
+        lambda c: Request("DELETE", f"{TICKETS}/{c.disposable_tickets.pop()}"),
+        prepare=create_disposable_tickets,
+    ),
+    Scenario(
+        "bulk_create_tickets",
+        "POST",
+        f"{TICKETS}:bulk",
+        lambda c: Request(
+            "POST", f"{TICKETS}:bulk", json={"items": [new_ticket(c) for _ in range(BULK_SIZE)]}
+        ),
+    ),
+    Scenario("bulk_update_tickets", "PATCH", f"{TICKETS}:bulk", bulk_update),
+    Scenario(
+        "bulk_delete_tickets", "DELETE", f"{TICKETS}:bulk", bulk_delete, prepare=prepare_bulk_delete
+    ),
+    Scenario("create_comment", "POST", f"{TICKETS}/{{ticket_id}}/comments", new_comment),
+    Scenario(
+        "create_comment_batched",
+        "POST",
+        f"{TICKETS}/{{ticket_id}}/comments",
+        new_comment,
+        settings={"comment_batch_enabled": True},
+    ),
+    Scenario(
+        "list_comments",
+        "GET",
+        f"{TICKETS}/{{ticket_id}}/comments",
+        lambda c: Request("GET", f"{TICKETS}/{c.rng.choice(c.commented)}/comments"),
+    ),
+    Scenario(
+        "delete_comment",
+        "DELETE",
+        f"{TICKETS}/{{ticket_id}}/comments/{{comment_id}}",
+        delete_comment,
+        prepare=create_disposable_comments,
+    ),
+    # follow=false pages through the outbox the scenarios above have filled; a live
+    # stream never completes, so it cannot be timed as a request.
+    Scenario(
+        "events_replay",
+        "GET",
+        "/api/v1/events",
+        lambda c: Request("GET", "/api/v1/events", params={"follow": "false", "limit": 100}),
+    ),
+    Scenario(
+        "events_replay_filtered",
+        "GET",
+        "/api/v1/events",
+        lambda c: Request(
+            "GET",
+            "/api/v1/events",
+            params={
+                "follow": "false",
+                "limit": 100,
+                "assignee": c.rng.choice(ASSIGNEES),
+                "status": "DONE",
+            },
+        ),
+    ),
+    # Exports are capped so a request stays comparable across seed profiles.
+    Scenario(
+        "export_ndjson",
+        "GET",
+        "/api/v1/export",
+        lambda c: Request("GET", "/api/v1/export", params={"limit": 1000}),
+    ),
+    Scenario(
+        "export_csv",
+        "GET",
+        "/api/v1/export",
+        lambda c: Request("GET", "/api/v1/export", params={"format": "csv", "limit": 1000}),
+    ),
+    Scenario("import_ndjson", "POST", "/api/v1/import", import_upload),
+    Scenario("metrics", "GET", "/api/v1/metrics", lambda c: Request("GET", "/api/v1/metrics")),
+    Scenario(
+        "metrics_grouped",
+        "GET",
+        "/api/v1/metrics",
+        lambda c: Request("GET", "/api/v1/metrics", params={"group_by": ["assignee", "priority"]}),
+    ),
+    Scenario("metrics_timeseries_daily", "GET", "/api/v1/metrics/timeseries", timeseries("day")),
+    Scenario("metrics_timeseries_weekly", "GET", "/api/v1/metrics/timeseries", timeseries("week")),
+    Scenario(
+        "search",
+        "GET",
+        "/api/v1/search",
+        lambda c: Request("GET", "/api/v1/search", params={"q": " ".join(c.rng.sample(WORDS, 2))}),
+    ),
+    Scenario(
+        "internal_cache", "GET", "/internal/cache", lambda c: Request("GET", "/internal/cache")
+    ),
+    Scenario(
+        "internal_metrics",
+        "GET",
+        "/internal/metrics",
+        lambda c: Request("GET", "/internal/metrics"),
+    ),
+]
+
+
+def uncovered_routes(app: FastAPI, scenarios: list[Scenario] = SCENARIOS) -> set[tuple[str, str]]:
+    """``(METHOD, path)`` of every documented route that no scenario exercises."""
+    routes = {
+        (method.upper(), path)
+        for path, operations in app.openapi()["paths"].items()
+        for method in operations
+    }
+    return routes - {(scenario.method, scenario.route) for scenario in scenarios}
@@ -0,0 +1,129 @@
+"""Bulk loader for benchmark data.
+
+Rows are generated from a seeded RNG and written with executemany ``INSERT``\\ s on a
+Core connection, which is orders of magnitude faster than the factories for
+millions of rows. Comment counts per ticket follow a Pareto distribution: most
+tickets have none or a few, a handful have hundreds. Core inserts bypass the
+ticket change listeners, so the derived metric tables are rebuilt at the end;
+search documents are maintained by database triggers.
+"""
+
+import random
+import time
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import Connection, func, insert, select
+
+from app.db.aggregates import rebuild_metric_counters, rebuild_metric_rollups
+from app.db.models.comment import Comment
+from app.db.models.ticket import Priority, Status, Ticket
+
+BATCH_SIZE = 5_000
+MAX_COMMENTS_PER_TICKET = 1_000
+COMMENT_PARETO_ALPHA = 1.5
+HISTORY_DAYS = 365
+
+WORDS = (
+    "login signup checkout payment invoice refund export import report dashboard "
+    "search filter sort page mobile desktop browser email notification webhook api "
+    "token session cache timeout latency crash error warning retry queue worker "
+    "database index migration backup restore upload download image video audio "
+    "profile settings password permission role team project release deploy build "
+    "test flaky slow broken missing duplicate wrong blank layout font color theme"
+).split()
+ASSIGNEES = [f"user{i:02d}" for i in range(50)]
+
+
+@dataclass
+class SeedResult:
+    tickets: int
+    comments: int
+    seconds: float
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def comment_count(rng: random.Random) -> int:
+    return min(int(rng.paretovariate(COMMENT_PARETO_ALPHA)) - 1, MAX_COMMENTS_PER_TICKET)
+
+
+def ticket_rows(rng: random.Random, count: int, now: datetime) -> Iterator[dict]:
+    for _ in range(count):
+        created_at = now - timedelta(seconds=rng.uniform(0, HISTORY_DAYS * 86400))
+        status = rng.choices(list(Status), weights=(5, 2, 3))[0]
+        closed_at = None
+        if status == Status.DONE:
+            closed_at = min(created_at + timedelta(hours=rng.expovariate(1 / 72)), now)
+        yield {
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "title": sentence(rng, 4),
+            "description": sentence(rng, 12) if rng.random() < 0.8 else None,
+            # Skewed: a few assignees own most of the tickets.
+            "assignee": rng.choices(ASSIGNEES, weights=range(50, 0, -1))[0]
+            if rng.random() < 0.9
+            else None,
+            "priority": rng.choice(list(Priority)),
+            "status": status,
+            "due_date": (created_at + timedelta(days=rng.randint(1, 60))).date(),
+            "created_at": created_at,
+            "closed_at": closed_at,
+            "updated_at": closed_at or created_at,
+        }
+
+
+def comment_rows(rng: random.Random, ticket: dict, now: datetime) -> Iterator[dict]:
+    for _ in range(comment_count(rng)):
+        created_at = ticket["created_at"] + (now - ticket["created_at"]) * rng.random()
+        yield {
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "ticket_id": ticket["id"],
+            "author": rng.choice(ASSIGNEES),
+            "content": sentence(rng, 8),
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def insert_batches(connection: Connection, table, rows: Iterator[dict]) -> int:
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            connection.execute(insert(table), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        connection.execute(insert(table), batch)
+        count += len(batch)
+    return count
+
+
+def seed(connection: Connection, tickets: int, rng_seed: int = 0) -> SeedResult:
+    """Append ``tickets`` generated tickets with skewed comments, then rebuild the metrics."""
+    started = time.perf_counter()
+    rng = random.Random(rng_seed)
+    now = datetime.now(UTC)
+    comments = 0
+
+    generated = ticket_rows(rng, tickets, now)
+    while batch := [row for _, row in zip(range(BATCH_SIZE), generated, strict=False)]:
+        connection.execute(insert(Ticket.__table__), batch)
+        comments += insert_batches(
+            connection,
+            Comment.__table__,
+            (comment for ticket in batch for comment in comment_rows(rng, ticket, now)),
+        )
+
+    rebuild_metric_counters(connection)
+    rebuild_metric_rollups(connection)
+    return SeedResult(tickets, comments, time.perf_counter() - started)
+
+
+def ticket_total(connection: Connection) -> int:
+    return connection.execute(select(func.count()).select_from(Ticket.__table__)).scalar_one()
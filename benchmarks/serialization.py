@@ -0,0 +1,69 @@
+"""Rows per second for the two ways of turning a list page into JSON.
+
+``pydantic`` is what FastAPI does with ``response_model``: ORM objects, validated
+through the response model, then dumped. ``fast`` is the path the list endpoints
+use: the response columns as Core rows, encoded by orjson
+(``app.api.serialization``). Both read the same page of ``MAX_PAGE_SIZE`` rows
+from the seeded database, so the figures include fetching.
+"""
+
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+
+from app.api.pagination import MAX_PAGE_SIZE
+from app.api.serialization import dump_rows, response_columns
+from app.db.models.comment import Comment
+from app.db.models.ticket import Ticket
+from app.schemas.comment import CommentResponse
+from app.schemas.ticket import TicketResponse
+
+LISTS = {
+    "tickets": (TicketResponse, Ticket, (Ticket.created_at, Ticket.id)),
+    "comments": (CommentResponse, Comment, (Comment.created_at,)),
+}
+
+
+def rows_per_second(encode, repeats: int) -> float:
+    rows = 0
+    started = time.perf_counter()
+    for _ in range(repeats):
+        rows += encode()
+    elapsed = time.perf_counter() - started
+    return rows / elapsed if elapsed else 0.0
+
+
+def measure(engine: Engine, repeats: int = 20) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, (model, entity, order) in LISTS.items():
+        adapter = TypeAdapter(list[model])
+
+        def pydantic_path() -> int:
+            # A fresh session each time, as each request gets, so nothing is
+            # served from the identity map.
+            with Session(engine) as session:
+                objects = session.scalars(
+                    select(entity).order_by(*order).limit(MAX_PAGE_SIZE)
+                ).all()
+                adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+                return len(objects)
+
+        def fast_path() -> int:
+            with engine.connect() as connection:
+                rows = connection.execute(
+                    select(*response_columns(model, entity)).order_by(*order).limit(MAX_PAGE_SIZE)
+                ).all()
+                dump_rows(model, rows)
+                return len(rows)
+
+        pydantic_path(), fast_path()  # warm up
+        pydantic = rows_per_second(pydantic_path, repeats)
+        fast = rows_per_second(fast_path, repeats)
+        results[name] = {
+            "pydantic_rows_per_s": pydantic,
+            "fast_rows_per_s": fast,
+            "speedup": fast / pydantic if pydantic else 0.0,
+        }
+    return results
@@ -1,43 +1,64 @@
+import tempfile
 from contextlib import asynccontextmanager
+from pathlib import Path
 
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-
-from app.db.models import Comment, Ticket  # noqa: F401
-from app.db.session import Base, get_db
+from sqlalchemy.pool import NullPool
+
+from app.api.v1.comments import comment_batcher
+from app.api.v1.events import hub
+from app.api.v1.metrics import grouped_metrics, metrics_cache
+from app.api.v1.tickets import ticket_cache
+from app.core.instrumentation import instrument_engine
+from app.db.aggregates import rebuild_metric_counters, rebuild_metric_rollups
+from app.db.migrate import upgrade
+from app.db.models import (
+    ArchivedComment,
+    ArchivedTicket,
+    Comment,
+    Event,
+    Ticket,
+    TicketTombstone,
+)
+from app.db.session import (
+    enable_sqlite_foreign_keys,
+    get_db,
+    get_metrics_db,
+    get_read_db,
+    to_async_url,
+)
 from app.main import app
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# A file rather than :memory: so the sync engine used by fixtures and the aiosqlite
+# engine used by the app see the same database.
+TEST_DB_DIR = tempfile.TemporaryDirectory()
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{Path(TEST_DB_DIR.name) / 'test.db'}"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# Each TestClient runs its own event loop, so don't pool connections across tests.
+async_engine = create_async_engine(to_async_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
 
 
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_conn, connection_record):
-    cursor = dbapi_conn.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
-    cursor.close()
+event.listen(engine, "connect", enable_sqlite_foreign_keys)
+event.listen(async_engine.sync_engine, "connect", enable_sqlite_foreign_keys)
+instrument_engine(async_engine.sync_engine, "async")
 
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
-Base.metadata.create_all(bind=engine)
+with engine.begin() as connection:
+    upgrade(connection)
 
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 # Replace lifespan with a no-op for tests
@@ -47,7 +68,12 @@ async def test_lifespan(app: FastAPI):
 
 
 app.router.lifespan_context = test_lifespan
-app.dependency_overrides[get_db] = override_get_db
+# No replica in tests: every route reads and writes the one test database.
+for dependency in (get_db, get_read_db, get_metrics_db):
+    app.dependency_overrides[dependency] = override_get_db
+hub.store.sessions = TestingAsyncSessionLocal
+grouped_metrics.sessions = TestingAsyncSessionLocal
+comment_batcher.writer.sessions = TestingAsyncSessionLocal
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -58,9 +84,17 @@ def cleanup():
     try:
         db.query(Comment).delete()
         db.query(Ticket).delete()
+        db.query(Event).delete()
+        db.query(TicketTombstone).delete()
+        db.query(ArchivedComment).delete()
+        db.query(ArchivedTicket).delete()
+        rebuild_metric_counters(db.connection())
+        rebuild_metric_rollups(db.connection())
         db.commit()
     finally:
         db.close()
+    ticket_cache.clear()
+    metrics_cache.clear()
 
 
 @pytest.fixture(scope="function")
@@ -80,3 +114,17 @@ def db():
 def client(db):
     with TestClient(app, raise_server_exceptions=True) as test_client:
         yield test_client
+
+
+@pytest.fixture(scope="function")
+def sql_statements():
+    """``(statement, parameters)`` for every statement the app executes, executemany
+    included."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
@@ -0,0 +1,164 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import admission
+from app.core.admission import AdmissionMiddleware, Limiter, route_class
+from app.core.instrumentation import REGISTRY
+
+
+def sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def limiter(maximum: int = 1, queue_size: int = 1, queue_timeout: float = 0.2) -> Limiter:
+    return Limiter(maximum, 1, queue_size, queue_timeout, tolerance=2.0)
+
+
+def test_route_classes():
+    def scope(method: str, path: str) -> dict:
+        return {"method": method, "path": path}
+
+    assert route_class(scope("GET", "/api/v1/tickets")) == "read"
+    assert route_class(scope("POST", "/api/v1/tickets:batchGet")) == "read"
+    assert route_class(scope("PATCH", "/api/v1/tickets/1")) == "write"
+    assert route_class(scope("POST", "/api/v1/import")) == "write"
+    assert route_class(scope("GET", "/api/v1/metrics/timeseries")) == "metrics"
+    for path in ("/", "/internal/metrics", "/docs", "/api/v1/events"):
+        assert route_class(scope("GET", path)) is None
+
+
+def test_requests_beyond_the_limit_wait_then_get_a_fast_503():
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await release.wait()
+        headers = [(b"content-length", b"2")]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    reads = limiter(maximum=1, queue_size=1, queue_timeout=0.1)
+    middleware = AdmissionMiddleware(app, {"read": reads})
+    shed = {
+        reason: sample("http_admission_shed_total", {"route_class": "read", "reason": reason})
+        for reason in ("queue_full", "timeout")
+    }
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=middleware)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/api/v1/tickets"))
+            await asyncio.sleep(0.01)
+            queued = asyncio.create_task(client.get("/api/v1/tickets"))
+            await asyncio.sleep(0.01)
+            assert (reads.in_flight, reads.queued) == (1, 1)
+
+            # The queue is full: answered at once.
+            full = await client.get("/api/v1/tickets")
+            assert full.status_code == 503
+            assert full.headers["Retry-After"] == "1"
+            # The queued request gives up after the queue timeout.
+            assert (await queued).status_code == 503
+            assert reads.queued == 0
+
+            # A slot freed while a request waits goes to it.
+            waiting = asyncio.create_task(client.get("/api/v1/tickets"))
+            await asyncio.sleep(0.01)
+            release.set()
+            assert (await first).status_code == 200
+            assert (await waiting).status_code == 200
+
+    asyncio.run(scenario())
+    assert reads.in_flight == 0
+    for reason in shed:
+        labels = {"route_class": "read", "reason": reason}
+        assert sample("http_admission_shed_total", labels) == shed[reason] + 1
+
+
+def test_streamed_responses_give_their_slot_back_once_they_start():
+    finish = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}\n", "more_body": True})
+        await finish.wait()
+        await send({"type": "http.response.body", "body": b""})
+
+    reads = limiter(maximum=1, queue_size=0)
+    middleware = AdmissionMiddleware(app, {"read": reads})
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/export", "headers": []}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    async def scenario():
+        export = asyncio.create_task(middleware(scope, receive, send))
+        await asyncio.sleep(0.01)
+        # Still streaming, but no longer holding the only read slot.
+        assert sent[-1]["more_body"]
+        assert reads.in_flight == 0
+        assert await reads.acquire() is None
+        reads.release()
+        finish.set()
+        await export
+
+    asyncio.run(scenario())
+    assert reads.in_flight == 0
+
+
+def test_limit_backs_off_on_latency_and_recovers():
+    writes = Limiter(10, 2, queue_size=10, queue_timeout=1.0, tolerance=2.0)
+    # One request after another, each admitted a second after the previous one.
+    clock = iter(range(1, 10_000))
+
+    def complete(seconds: float, saturated: bool = True) -> None:
+        started = float(next(clock))
+        writes.in_flight = int(writes.limit) if saturated else 0
+        writes.observe("/api/v1/tickets", started, started + seconds)
+
+    for _ in range(50):
+        complete(0.01)
+    assert writes.limit == 10
+
+    # The database slows down: the limit shrinks, but not past the minimum.
+    for _ in range(10):
+        complete(0.2)
+    assert 2 <= writes.limit < 6
+    for _ in range(200):
+        complete(0.2)
+    assert writes.limit == 2
+
+    # Latency back to normal: it grows while requests are held back, and only then.
+    for _ in range(50):
+        complete(0.01, saturated=False)
+    assert writes.limit == 2
+    for _ in range(200):
+        complete(0.01)
+    assert writes.limit == 10
+
+
+@pytest.fixture
+def saturated(monkeypatch):
+    """Every route class at its limit, with no room to queue."""
+    for reads in admission.limiters.values():
+        monkeypatch.setattr(reads, "in_flight", int(reads.limit))
+        monkeypatch.setattr(reads, "queue_size", 0)
+
+
+def test_health_check_and_internal_routes_bypass_the_limiter(client, saturated):
+    assert client.get("/").status_code == 200
+    response = client.get("/api/v1/tickets")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert client.post("/api/v1/tickets", json={"title": "Shed"}).status_code == 503
+    assert client.get("/api/v1/metrics").status_code == 503
+
+    scrape = client.get("/internal/metrics")
+    assert scrape.status_code == 200
+    assert 'http_admission_queue_depth{route_class="read"} 0.0' in scrape.text
+    assert 'http_admission_shed_total{reason="queue_full",route_class="write"}' in scrape.text
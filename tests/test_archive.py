@@ -0,0 +1,207 @@
+import json
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.db.aggregates import (
+    check_metric_counters,
+    rebuild_metric_counters,
+    rebuild_metric_rollups,
+)
+from app.db.archive import archive_batch
+from app.db.models.archive import ArchivedComment, ArchivedTicket
+from app.db.models.comment import Comment
+from app.db.models.event import Event
+from app.db.models.metric import MetricCloseHistogram, MetricDaily
+from app.db.models.ticket import Priority, Status, Ticket
+from app.db.models.tombstone import TicketTombstone
+from tests.factories import CommentFactory, TicketFactory
+from tests.test_tickets import walk
+
+NOW = datetime.utcnow()
+CUTOFF = NOW - timedelta(days=90)
+
+
+def seed(db) -> dict[str, Ticket]:
+    """Two tickets old and closed enough to archive, and two that stay hot."""
+    tickets = {
+        "old": TicketFactory(
+            status=Status.DONE,
+            priority=Priority.HIGH,
+            created_at=NOW - timedelta(days=200),
+            closed_at=NOW - timedelta(days=150),
+        ),
+        "older": TicketFactory(
+            status=Status.DONE,
+            created_at=NOW - timedelta(days=300),
+            closed_at=NOW - timedelta(days=100),
+        ),
+        "recent": TicketFactory(
+            status=Status.DONE,
+            created_at=NOW - timedelta(days=200),
+            closed_at=NOW - timedelta(days=1),
+        ),
+        "open": TicketFactory(status=Status.TODO, created_at=NOW - timedelta(days=400)),
+    }
+    db.add_all(tickets.values())
+    db.commit()
+    db.add_all(
+        CommentFactory(ticket_id=tickets["old"].id, created_at=NOW - timedelta(days=199 - n))
+        for n in range(3)
+    )
+    db.commit()
+    # Detached, so their fields stay readable once the rows have moved.
+    for ticket in tickets.values():
+        db.refresh(ticket)
+        db.expunge(ticket)
+    return tickets
+
+
+def archive_all(db, batch_size: int = 1) -> list:
+    archived = []
+    while moved := archive_batch(db.connection(), CUTOFF, batch_size):
+        db.commit()
+        archived.extend(moved)
+    return archived
+
+
+def test_archive_moves_closed_tickets_with_comments(client, db):
+    tickets = seed(db)
+    old_id = tickets["old"].id
+    before = client.get(f"/api/v1/tickets/{old_id}").json()
+    comments = client.get(f"/api/v1/tickets/{old_id}/comments").json()
+
+    assert archive_all(db) == [tickets["older"].id, old_id]
+
+    assert set(db.scalars(select(Ticket.id))) == {tickets["recent"].id, tickets["open"].id}
+    assert db.scalar(select(func.count()).select_from(Comment)) == 0
+    assert db.scalar(select(func.count()).select_from(ArchivedComment)) == 3
+    assert db.get(ArchivedTicket, old_id).archived_at is not None
+
+    response = client.get(f"/api/v1/tickets/{old_id}", params={"fields": "title"})
+    assert response.json() == {"id": str(old_id), "title": before["title"]}
+    assert client.get(f"/api/v1/tickets/{old_id}").json() == before
+    assert client.get(f"/api/v1/tickets/{old_id}/comments").json() == comments
+    batch = client.post(
+        "/api/v1/tickets:batchGet",
+        params={"include": "comments"},
+        json={"ids": [str(old_id), str(tickets["open"].id)]},
+    ).json()
+    assert [ticket["id"] for ticket in batch["tickets"]] == [str(old_id), str(tickets["open"].id)]
+    assert batch["tickets"][0] == before | {"comments": comments}
+
+    # Archived tickets are read-only.
+    assert client.patch(f"/api/v1/tickets/{old_id}", json={"title": "x"}).status_code == 409
+    assert client.delete(f"/api/v1/tickets/{old_id}").status_code == 409
+    comment = {"author": "A", "content": "late"}
+    assert client.post(f"/api/v1/tickets/{old_id}/comments", json=comment).status_code == 409
+    missing = "00000000-0000-0000-0000-000000000001"
+    assert client.patch(f"/api/v1/tickets/{missing}", json={"title": "x"}).status_code == 404
+
+
+def test_list_tickets_include_archived(client, db):
+    tickets = seed(db)
+    archive_all(db, batch_size=10)
+    every = sorted(tickets.values(), key=lambda ticket: (ticket.created_at, ticket.id))
+
+    hot = client.get("/api/v1/tickets").json()
+    assert [t["id"] for t in hot] == [str(tickets["open"].id), str(tickets["recent"].id)]
+
+    walked, cursor = [], None
+    while True:
+        params = {"include_archived": "true", "limit": 1}
+        response = client.get(
+            "/api/v1/tickets", params=params | ({"cursor": cursor} if cursor else {})
+        )
+        walked += [t["id"] for t in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert walked == [str(ticket.id) for ticket in every]
+
+    stream = client.get(
+        "/api/v1/tickets",
+        params={"include_archived": "true", "limit": 3, "fields": "id"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    lines = [json.loads(line) for line in stream.text.splitlines()]
+    assert lines == [{"id": str(ticket.id)} for ticket in every[:3]]
+
+    # Sorted lists merge the two tables in their order, either way.
+    ranks = {
+        "priority": lambda ticket: list(Priority).index(ticket.priority),
+        "status": lambda ticket: list(Status).index(ticket.status),
+        "due_date": lambda ticket: ticket.due_date or date.max,
+    }
+    for field, rank in ranks.items():
+        expected = [
+            str(ticket.id) for ticket in sorted(every, key=lambda t: (rank(t), t.created_at, t.id))
+        ]
+        params = {"include_archived": "true", "sort": field}
+        assert walk(client, params, limit=1) == expected, field
+        assert walk(client, params | {"sort": f"-{field}"}, limit=1) == expected[::-1], field
+    assert walk(client, {"include_archived": "true", "sort": "-created_at"}, limit=1) == [
+        str(ticket.id) for ticket in reversed(every)
+    ]
+    first = client.get(
+        "/api/v1/tickets", params={"include_archived": "true", "sort": "-priority", "limit": 1}
+    )
+    stream = client.get(
+        "/api/v1/tickets",
+        params={
+            "include_archived": "true",
+            "sort": "-priority",
+            "cursor": first.headers["X-Next-Cursor"],
+            "fields": "id",
+        },
+        headers={"Accept": "application/x-ndjson"},
+    )
+    by_priority = walk(client, {"include_archived": "true", "sort": "-priority"})
+    assert [json.loads(line)["id"] for line in stream.text.splitlines()] == by_priority[1:]
+
+    done = client.get("/api/v1/tickets", params={"include_archived": "true", "status": "DONE"})
+    assert len(done.json()) == 3
+    high = client.get("/api/v1/tickets", params={"include_archived": "true", "priority": "HIGH"})
+    assert [t["id"] for t in high.json()] == [str(tickets["old"].id)]
+    todo = client.get("/api/v1/tickets", params={"include_archived": "true", "status": "TODO"})
+    assert [t["id"] for t in todo.json()] == [str(tickets["open"].id)]
+
+    export = client.get("/api/v1/export", params={"include_archived": "true"}).text.splitlines()
+    exported = [json.loads(line) for line in export]
+    assert [d["id"] for d in exported[2:]] == [str(tickets["older"].id), str(tickets["old"].id)]
+    assert len(exported[3]["comments"]) == 3
+    assert len(client.get("/api/v1/export").text.splitlines()) == 2
+
+
+def test_archive_leaves_metrics_and_derived_data_unchanged(client, db):
+    seed(db)
+    metrics = client.get("/api/v1/metrics").json()
+    timeseries = client.get("/api/v1/metrics/timeseries", params={"group_by": "priority"}).json()
+    events = db.scalar(select(func.count()).select_from(Event))
+
+    def rollups():
+        daily = {
+            (r.day, r.assignee, r.priority): r.closed_count for r in db.scalars(select(MetricDaily))
+        }
+        histogram = {
+            (r.day, r.assignee, r.priority, r.bucket): r.count
+            for r in db.scalars(select(MetricCloseHistogram))
+        }
+        return daily, histogram
+
+    stored = rollups()
+    archive_all(db)
+
+    assert client.get("/api/v1/metrics").json() == metrics
+    assert check_metric_counters(db.connection()) == {}
+    rebuild_metric_counters(db.connection())
+    rebuild_metric_rollups(db.connection())
+    db.commit()
+    assert client.get("/api/v1/metrics").json() == metrics
+    assert rollups() == stored
+    params = {"group_by": "priority"}
+    assert client.get("/api/v1/metrics/timeseries", params=params).json() == timeseries
+
+    # Moving a ticket is not a write: no change feed event, no sync tombstone.
+    assert db.scalar(select(func.count()).select_from(Event)) == events
+    assert db.scalar(select(func.count()).select_from(TicketTombstone)) == 0
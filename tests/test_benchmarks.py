@@ -0,0 +1,50 @@
+import asyncio
+import copy
+
+from app.main import app
+from benchmarks.driver import run_scenarios
+from benchmarks.report import build_report, compare_reports
+from benchmarks.scenarios import SCENARIOS, load_context, uncovered_routes
+from benchmarks.seed import seed
+from benchmarks.serialization import measure
+from tests.conftest import async_engine, engine
+
+
+def test_every_route_has_a_benchmark_scenario():
+    assert uncovered_routes(app) == set()
+
+
+def test_benchmark_suite_runs_against_sqlite():
+    with engine.begin() as connection:
+        seeded = seed(connection, 50)
+        context = load_context(connection)
+    assert seeded.tickets == 50
+
+    results = asyncio.run(
+        run_scenarios(
+            app, [async_engine.sync_engine], SCENARIOS, context, requests=3, concurrency=2, warmup=1
+        )
+    )
+    assert set(results) == {scenario.name for scenario in SCENARIOS}
+    assert all(result["errors"] == 0 for result in results.values())
+    assert results["get_ticket_not_modified"]["sql_per_request"] == 0
+    assert results["get_ticket"]["latency_ms"]["p99"] > 0
+    board, full = results["list_tickets_board"], results["list_tickets"]
+    assert 0 < board["bytes_per_request"] < full["bytes_per_request"]
+
+    encoded = measure(engine, repeats=2)
+    assert all(rates["fast_rows_per_s"] > 0 for rates in encoded.values())
+
+    base = build_report({}, {}, results, encoded)
+    assert not any(d.regression for d in compare_reports(base, base))
+
+    head = copy.deepcopy(base)
+    head["scenarios"]["get_ticket"]["latency_ms"]["p95"] *= 2
+    head["scenarios"]["metrics"]["sql_per_request"] += 1
+    head["serialization"]["tickets"]["fast_rows_per_s"] /= 2
+    regressions = {(d.scenario, d.metric) for d in compare_reports(base, head) if d.regression}
+    assert regressions == {
+        ("get_ticket", "p95_ms"),
+        ("metrics", "sql_per_request"),
+        ("serialize_tickets", "fast_rows_per_s"),
+    }
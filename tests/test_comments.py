@@ -1,3 +1,16 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import event, func, select
+
+from app.api.v1.comments import comment_batcher
+from app.core.batching import Batcher, BatchQueueFullError
+from app.core.config import settings
+from app.db.models.event import Event
+from app.main import app
+from tests.conftest import async_engine
 from tests.factories import CommentFactory, TicketFactory
 
 
@@ -84,3 +97,82 @@ def test_delete_comment_not_found(client, db):
         f"/api/v1/tickets/{ticket.id}/comments/00000000-0000-0000-0000-000000000000"
     )
     assert response.status_code == 404
+
+
+def test_create_comments_batched(client, db, monkeypatch):
+    tickets = [TicketFactory(), TicketFactory()]
+    db.add_all(tickets)
+    db.commit()
+    monkeypatch.setattr(settings, "comment_batch_enabled", True)
+    monkeypatch.setattr(comment_batcher, "window", 0.05)
+    monkeypatch.setattr(comment_batcher, "max_items", 5)
+    targets = [uuid.uuid4(), uuid.uuid4()] + [tickets[n % 2].id for n in range(10)]
+
+    async def post_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(
+                *(
+                    http.post(
+                        f"/api/v1/tickets/{ticket_id}/comments",
+                        json={"author": "CI", "content": f"build {n - 2}"},
+                    )
+                    for n, ticket_id in enumerate(targets)
+                )
+            )
+
+    inserts = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO comments"):
+            inserts.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        responses = asyncio.run(post_all())
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+    assert [response.status_code for response in responses] == [404] * 2 + [201] * 10
+    assert [response.json()["content"] for response in responses[2:]] == [
+        f"build {n}" for n in range(10)
+    ]
+    # 12 requests, 5 per flush: three transactions, each with one multi-row INSERT.
+    assert len(inserts) == 3
+    listed = client.get(f"/api/v1/tickets/{tickets[0].id}/comments").json()
+    assert [comment["content"] for comment in listed] == [f"build {n}" for n in range(0, 10, 2)]
+    assert db.scalar(select(func.count()).select_from(Event)) == 2 + 10
+
+
+def test_batcher_flushes_full_batches_and_bounds_the_queue():
+    batches = []
+
+    class Writer:
+        async def write(self, items):
+            batches.append(items)
+            if "fail" in items:
+                raise ValueError("write failed")
+            return [item * 2 for item in items]
+
+    async def scenario():
+        # A full batch does not wait out the (long) window.
+        batcher = Batcher(Writer(), window=60, max_items=3, queue_size=4)
+        assert await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(n) for n in range(3))), timeout=5
+        ) == [0, 2, 4]
+
+        batcher.window = 0.01
+        waiting = [asyncio.ensure_future(batcher.submit("x")) for _ in range(4)]
+        await asyncio.sleep(0)
+        assert batcher.queued == 4
+        with pytest.raises(BatchQueueFullError):
+            await batcher.submit("y")
+        assert await asyncio.gather(*waiting) == ["xx"] * 4
+
+        failing = await asyncio.gather(
+            batcher.submit("fail"), batcher.submit("ok"), return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in failing)
+        await batcher.close()
+
+    asyncio.run(scenario())
+    assert [len(batch) for batch in batches] == [3, 3, 1, 2]
@@ -0,0 +1,205 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.events import (
+    EventFilter,
+    EventHub,
+    HubEvent,
+    InProcessEventBackend,
+    SubscriberOverflowError,
+)
+from app.db.models.event import Event
+from app.db.outbox import prune_events
+from tests.factories import TicketFactory
+
+
+def sse_events(body: str) -> list[dict]:
+    events = []
+    for frame in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines() if ": " in line)
+        if "data" in fields:
+            events.append({**fields, "data": json.loads(fields["data"])})
+    return events
+
+
+def test_every_write_is_recorded_in_the_outbox(client, db):
+    ticket = client.post("/api/v1/tickets", json={"title": "Feed", "assignee": "Alice"}).json()
+    client.patch(f"/api/v1/tickets/{ticket['id']}", json={"assignee": "Bob"})
+    comment = client.post(
+        f"/api/v1/tickets/{ticket['id']}/comments", json={"author": "Bob", "content": "On it"}
+    ).json()
+    client.delete(f"/api/v1/tickets/{ticket['id']}/comments/{comment['id']}")
+    client.post("/api/v1/tickets:bulk", json={"items": [{"title": "A"}, {"title": "B"}]})
+    client.delete(f"/api/v1/tickets/{ticket['id']}")
+
+    events = db.scalars(select(Event).order_by(Event.id)).all()
+
+    assert [event.type for event in events] == [
+        "ticket.created",
+        "ticket.updated",
+        "comment.created",
+        "comment.deleted",
+        "ticket.created",
+        "ticket.created",
+        "ticket.deleted",
+    ]
+    update = events[1]
+    assert (update.previous_assignee, update.assignee) == ("Alice", "Bob")
+    assert json.loads(update.payload)["assignee"] == "Bob"
+    assert json.loads(events[3].payload) == comment
+    assert events[3].assignee == "Bob"
+
+
+def test_replay_resumes_after_last_event_id_and_filters(client, db):
+    alice = client.post("/api/v1/tickets", json={"title": "A", "assignee": "Alice"}).json()
+    client.post("/api/v1/tickets", json={"title": "B", "assignee": "Bob"})
+    client.patch(f"/api/v1/tickets/{alice['id']}", json={"assignee": "Bob"})
+    first = db.scalar(select(Event.id).order_by(Event.id))
+
+    response = client.get(
+        "/api/v1/events", params={"follow": "false"}, headers={"Last-Event-ID": str(first)}
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = sse_events(response.text)
+    assert [(e["id"], e["event"]) for e in events] == [
+        (str(first + 1), "ticket.created"),
+        (str(first + 2), "ticket.updated"),
+    ]
+    assert events[1]["data"]["data"]["assignee"] == "Bob"
+    assert events[1]["data"]["ticket_id"] == alice["id"]
+
+    # Alice's ticket moving to Bob leaves her view, so she sees that too.
+    filtered = client.get("/api/v1/events", params={"follow": "false", "assignee": "Alice"})
+    assert [e["event"] for e in sse_events(filtered.text)] == ["ticket.created", "ticket.updated"]
+    done = client.get("/api/v1/events", params={"follow": "false", "status": "DONE"})
+    assert sse_events(done.text) == []
+
+
+def test_websocket_follows_live_changes_and_resumes(client, db):
+    db.add(TicketFactory(assignee="Bob"))
+    db.commit()
+
+    with client.websocket_connect("/api/v1/events/ws?assignee=Alice") as websocket:
+        client.post("/api/v1/tickets", json={"title": "Not hers", "assignee": "Bob"})
+        created = client.post("/api/v1/tickets", json={"title": "Hers", "assignee": "Alice"})
+        message = websocket.receive_json()
+
+    assert message["type"] == "ticket.created"
+    assert message["data"] == created.json()
+
+    with client.websocket_connect(
+        f"/api/v1/events/ws?last_event_id={message['id'] - 1}"
+    ) as websocket:
+        assert websocket.receive_json() == message
+
+
+class ListStore:
+    def __init__(self, events: list[HubEvent]):
+        self.events = events
+        # (xmin, xmax): nothing in progress.
+        self.horizon = (10, 10)
+
+    async def latest_id(self) -> int:
+        return self.events[-1].id if self.events else 0
+
+    async def read(self, after, limit, event_filter=None, upto=None):
+        return [
+            event
+            for event in self.events
+            if event.id > after
+            and (upto is None or event.id <= upto)
+            and (event_filter is None or event_filter.matches(event))
+        ][:limit]
+
+    async def transaction_horizon(self):
+        return self.horizon
+
+
+def hub_event(event_id: int, assignee: str = "Alice") -> HubEvent:
+    return HubEvent(event_id, "ticket.updated", assignee, "TODO", assignee, "TODO", b"{}")
+
+
+def test_slow_subscriber_is_disconnected_without_holding_up_others():
+    async def scenario():
+        store = ListStore([])
+        hub = EventHub(InProcessEventBackend(), store, queue_size=2, poll_interval=60)
+        slow = await hub.subscribe(EventFilter())
+        fast = await hub.subscribe(EventFilter())
+
+        store.events = [hub_event(1), hub_event(2)]
+        await hub.poll()
+        assert [event.id for event in await fast.next_batch(0)] == [1, 2]
+
+        store.events += [hub_event(3)]
+        await hub.poll()
+        with pytest.raises(SubscriberOverflowError):
+            await slow.next_batch(0)
+        assert [event.id for event in await fast.next_batch(0)] == [3]
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_hub_waits_for_ids_still_in_flight():
+    async def scenario():
+        store = ListStore([hub_event(1)])
+        hub = EventHub(InProcessEventBackend(), store, poll_interval=60, gap_timeout=60)
+        subscription = await hub.subscribe(EventFilter())
+
+        # 2 was allocated by a transaction that has not committed yet.
+        store.horizon = (10, 11)
+        store.events += [hub_event(3)]
+        await hub.poll()
+        assert await subscription.next_batch(0) == []
+
+        store.events.insert(1, hub_event(2))
+        store.horizon = (11, 11)
+        await hub.poll()
+        assert [event.id for event in await subscription.next_batch(0)] == [2, 3]
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_hub_skips_holes_no_transaction_can_fill():
+    async def scenario():
+        store = ListStore([hub_event(1)])
+        hub = EventHub(InProcessEventBackend(), store, poll_interval=60, gap_timeout=60)
+        subscription = await hub.subscribe(EventFilter())
+
+        # Nothing in progress: 2 was rolled back and is skipped at once.
+        store.events += [hub_event(3)]
+        await hub.poll()
+        assert [event.id for event in await subscription.next_batch(0)] == [3]
+
+        # 5 may belong to transaction 10 or 11, running when the hole is seen.
+        store.horizon = (10, 12)
+        store.events += [hub_event(4), hub_event(6)]
+        await hub.poll()
+        assert [event.id for event in await subscription.next_batch(0)] == [4]
+        store.horizon = (11, 13)
+        await hub.poll()
+        assert await subscription.next_batch(0) == []
+        # Both have ended; 12 started after the hole was seen and cannot hold it.
+        store.horizon = (12, 13)
+        await hub.poll()
+        assert [event.id for event in await subscription.next_batch(0)] == [6]
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_prune_removes_only_expired_events(client, db):
+    for title in ("Old", "New"):
+        client.post("/api/v1/tickets", json={"title": title})
+    old, new = db.scalars(select(Event).order_by(Event.id)).all()
+    old.created_at = datetime.utcnow() - timedelta(days=8)
+    db.commit()
+
+    assert prune_events(db.connection(), datetime.utcnow() - timedelta(days=7)) == 1
+    assert db.scalars(select(Event.id)).all() == [new.id]
@@ -0,0 +1,86 @@
+from prometheus_client.parser import text_string_to_metric_families
+from sqlalchemy import create_engine
+
+from app.core.config import settings
+from app.core.instrumentation import REGISTRY, instrument_engine, pool_class
+from tests.conftest import SQLALCHEMY_DATABASE_URL
+
+TICKET_ROUTE = {"method": "GET", "route": "/api/v1/tickets/{ticket_id}"}
+
+
+def sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_recorded_per_route_template(client):
+    ticket = client.post("/api/v1/tickets", json={"title": "Observed"}).json()
+    requests = sample("http_request_duration_seconds_count", {**TICKET_ROUTE, "status": "200"})
+    statements = sample("http_request_db_statements_sum", TICKET_ROUTE)
+    rows = sample("http_request_db_rows_sum", TICKET_ROUTE)
+
+    assert client.get(f"/api/v1/tickets/{ticket['id']}").status_code == 200
+    client.get("/api/v1/tickets/not-a-uuid")
+    client.get("/api/v1/nowhere")
+
+    assert (
+        sample("http_request_duration_seconds_count", {**TICKET_ROUTE, "status": "200"})
+        == requests + 1
+    )
+    assert sample("http_request_duration_seconds_count", {**TICKET_ROUTE, "status": "422"}) >= 1
+    assert sample("http_request_db_statements_sum", TICKET_ROUTE) >= statements + 1
+    assert sample("http_request_db_rows_sum", TICKET_ROUTE) == rows + 1
+    assert sample("http_request_db_duration_seconds_count", TICKET_ROUTE) >= 1
+    assert REGISTRY.get_sample_value("http_requests_in_flight", TICKET_ROUTE) == 0
+
+    created = {"method": "POST", "route": "/api/v1/tickets"}
+    assert sample("http_request_db_rows_sum", created) >= 1
+    unmatched = {"method": "GET", "route": "unmatched", "status": "404"}
+    assert sample("http_request_duration_seconds_count", unmatched) >= 1
+
+
+def test_metrics_endpoint_serves_prometheus_text(client):
+    client.get("/")
+    response = client.get("/internal/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    families = {family.name for family in text_string_to_metric_families(response.text)}
+    assert {
+        "http_request_duration_seconds",
+        "http_requests_in_flight",
+        "http_request_db_statements",
+        "http_request_db_duration_seconds",
+        "http_request_db_rows",
+    } <= families
+
+
+def test_server_timing_header_is_opt_in(client, monkeypatch):
+    assert "Server-Timing" not in client.get("/api/v1/metrics").headers
+
+    monkeypatch.setattr(settings, "server_timing", True)
+    timing = client.get("/api/v1/metrics").headers["Server-Timing"]
+
+    db, pool, total = timing.split(", ")
+    assert db.startswith("db;dur=") and 'desc="' in db
+    assert pool.startswith("pool;dur=")
+    assert total.startswith("total;dur=")
+
+
+def test_pool_checkout_time_and_saturation():
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        poolclass=pool_class(SQLALCHEMY_DATABASE_URL, "pool-test"),
+        pool_size=2,
+        max_overflow=2,
+    )
+    instrument_engine(engine, "pool-test")
+    labels = {"engine": "pool-test"}
+    try:
+        with engine.connect():
+            assert sample("db_pool_checkout_duration_seconds_count", labels) == 1
+            assert sample("db_pool_capacity", labels) == 4
+            assert sample("db_pool_saturation", labels) == 0.25
+            assert sample("db_pool_connections", {**labels, "state": "in_use"}) == 1
+        assert sample("db_pool_connections", {**labels, "state": "idle"}) == 1
+    finally:
+        engine.dispose()
@@ -1,6 +1,16 @@
+import asyncio
 from datetime import datetime, timedelta
 
-from app.db.models.ticket import Status
+from sqlalchemy import select
+
+from app.core.cache import SingleFlight
+from app.db.aggregates import (
+    check_metric_counters,
+    rebuild_metric_counters,
+    rebuild_metric_rollups,
+)
+from app.db.models.metric import MetricCloseHistogram, MetricCounter, MetricDaily
+from app.db.models.ticket import Priority, Status
 from tests.factories import TicketFactory
 
 
@@ -60,3 +70,305 @@ def test_metrics_avg_null_when_no_closed(client, db):
     assert response.status_code == 200
     data = response.json()
     assert data["avg_time_to_close_hours"] is None
+
+
+def test_metrics_follow_ticket_writes(client):
+    ticket_id = client.post("/api/v1/tickets", json={"title": "Counted"}).json()["id"]
+    client.post("/api/v1/tickets", json={"title": "Other", "status": "IN_PROGRESS"})
+
+    data = client.get("/api/v1/metrics").json()
+    assert data["todo_count"] == 1
+    assert data["in_progress_count"] == 1
+    assert data["total_count"] == 2
+
+    client.patch(f"/api/v1/tickets/{ticket_id}", json={"status": "DONE"})
+    data = client.get("/api/v1/metrics").json()
+    assert data["todo_count"] == 0
+    assert data["done_count"] == 1
+    assert data["avg_time_to_close_hours"] is not None
+
+    client.patch(f"/api/v1/tickets/{ticket_id}", json={"status": "TODO"})
+    data = client.get("/api/v1/metrics").json()
+    assert data["todo_count"] == 1
+    assert data["done_count"] == 0
+    assert data["avg_time_to_close_hours"] is None
+
+    client.delete(f"/api/v1/tickets/{ticket_id}")
+    data = client.get("/api/v1/metrics").json()
+    assert data["todo_count"] == 0
+    assert data["total_count"] == 1
+
+
+def test_metric_counters_check_and_rebuild(client, db):
+    now = datetime.utcnow()
+    db.add_all(
+        [
+            TicketFactory(status=Status.TODO),
+            TicketFactory(status=Status.DONE, created_at=now - timedelta(hours=4), closed_at=now),
+        ]
+    )
+    db.commit()
+    assert check_metric_counters(db.connection()) == {}
+
+    db.query(MetricCounter).update({MetricCounter.ticket_count: 42})
+    db.commit()
+    assert set(check_metric_counters(db.connection())) == set(Status)
+
+    rebuild_metric_counters(db.connection())
+    db.commit()
+    assert check_metric_counters(db.connection()) == {}
+
+    data = client.get("/api/v1/metrics").json()
+    assert data["todo_count"] == 1
+    assert data["done_count"] == 1
+    assert 3.9 <= data["avg_time_to_close_hours"] <= 4.1
+
+
+def test_metric_counters_spread_writes_over_shards(client, db):
+    ids = [client.post("/api/v1/tickets", json={"title": f"T{n}"}).json()["id"] for n in range(20)]
+    for ticket_id in ids[:5]:
+        client.patch(f"/api/v1/tickets/{ticket_id}", json={"status": "DONE"})
+
+    shards = db.scalars(select(MetricCounter.shard).where(MetricCounter.status == Status.TODO))
+    assert len(set(shards)) > 1
+    assert check_metric_counters(db.connection()) == {}
+    data = client.get("/api/v1/metrics").json()
+    assert (data["todo_count"], data["done_count"]) == (15, 5)
+
+
+def test_metrics_timeseries_daily_by_assignee(client, db):
+    day = datetime(2026, 3, 2, 9)
+    db.add_all(
+        [
+            TicketFactory(assignee="Alice", created_at=day),
+            TicketFactory(assignee="Alice", created_at=day + timedelta(days=1)),
+            TicketFactory(
+                assignee=None,
+                created_at=day,
+                status=Status.DONE,
+                closed_at=day + timedelta(days=1, hours=2),
+            ),
+        ]
+    )
+    db.commit()
+
+    response = client.get(
+        "/api/v1/metrics/timeseries",
+        params={"from": "2026-03-02", "to": "2026-03-04", "group_by": "assignee"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["bucket"] == "day"
+    series = {s["group"]["assignee"]: s["points"] for s in data["series"]}
+    assert set(series) == {"Alice", None}
+    assert [p["created_count"] for p in series["Alice"]] == [1, 1, 0]
+    assert [p["created_count"] for p in series[None]] == [1, 0, 0]
+    assert [p["closed_count"] for p in series[None]] == [0, 1, 0]
+    assert 25.4 <= series[None][1]["time_to_close_p50_hours"] <= 26.6
+    assert series["Alice"][1]["time_to_close_p50_hours"] is None
+
+
+def test_metrics_timeseries_weekly_percentiles(client, db):
+    monday = datetime(2026, 3, 2)
+    db.add_all(
+        TicketFactory(
+            priority=Priority.HIGH if hours % 2 else Priority.LOW,
+            status=Status.DONE,
+            created_at=monday - timedelta(hours=hours),
+            closed_at=monday + timedelta(days=hours % 7),
+        )
+        for hours in range(1, 101)
+    )
+    db.commit()
+
+    data = client.get(
+        "/api/v1/metrics/timeseries",
+        params={"from": "2026-03-04", "to": "2026-03-04", "bucket": "week"},
+    ).json()
+    assert (data["start"], data["end"]) == ("2026-03-02", "2026-03-08")
+    [point] = data["series"][0]["points"]
+    assert point["closed_count"] == 100
+
+    by_priority = client.get(
+        "/api/v1/metrics/timeseries",
+        params={"from": "2026-03-02", "bucket": "week", "to": "2026-03-08", "group_by": "priority"},
+    ).json()["series"]
+    assert [s["group"] for s in by_priority] == [{"priority": "HIGH"}, {"priority": "LOW"}]
+    assert sum(s["points"][0]["closed_count"] for s in by_priority) == 100
+
+
+def test_metrics_timeseries_percentile_accuracy(client, db):
+    closed = datetime(2026, 3, 2, 12)
+    db.add_all(
+        TicketFactory(
+            status=Status.DONE, created_at=closed - timedelta(hours=hours), closed_at=closed
+        )
+        for hours in range(1, 101)
+    )
+    db.commit()
+
+    [point] = client.get(
+        "/api/v1/metrics/timeseries", params={"from": "2026-03-02", "to": "2026-03-02"}
+    ).json()["series"][0]["points"]
+    for key, exact in [
+        ("time_to_close_p50_hours", 50.5),
+        ("time_to_close_p90_hours", 90.1),
+        ("time_to_close_p99_hours", 99.0),
+    ]:
+        assert abs(point[key] - exact) / exact < 0.03
+
+
+def test_metrics_timeseries_validation(client):
+    params = {"from": "2026-03-05", "to": "2026-03-01"}
+    assert client.get("/api/v1/metrics/timeseries", params=params).status_code == 400
+    params = {"from": "2020-01-01", "to": "2026-01-01"}
+    assert client.get("/api/v1/metrics/timeseries", params=params).status_code == 400
+    params = {"group_by": "status"}
+    assert client.get("/api/v1/metrics/timeseries", params=params).status_code == 422
+
+
+def test_metric_rollups_follow_writes_and_match_backfill(client, db):
+    ticket_id = client.post(
+        "/api/v1/tickets", json={"title": "Rolled up", "assignee": "Alice"}
+    ).json()["id"]
+    other_id = client.post("/api/v1/tickets", json={"title": "Other"}).json()["id"]
+    client.patch(f"/api/v1/tickets/{ticket_id}", json={"status": "DONE"})
+    client.patch(f"/api/v1/tickets/{ticket_id}", json={"assignee": "Bob", "priority": "HIGH"})
+    client.patch("/api/v1/tickets:bulk", json={"items": [{"id": other_id, "status": "DONE"}]})
+    client.delete(f"/api/v1/tickets/{other_id}")
+
+    def rollups():
+        daily = {
+            (r.day, r.assignee, r.priority): (r.created_count, r.closed_count)
+            for r in db.scalars(select(MetricDaily))
+            if r.created_count or r.closed_count
+        }
+        histogram = {
+            (r.day, r.assignee, r.priority, r.bucket): r.count
+            for r in db.scalars(select(MetricCloseHistogram))
+            if r.count
+        }
+        return daily, histogram
+
+    incremental = rollups()
+    daily, histogram = incremental
+    assert list(daily.values()) == [(1, 1)]
+    assert [key[1:3] for key in daily] == [("Bob", Priority.HIGH)]
+    assert list(histogram.values()) == [1]
+
+    rebuild_metric_rollups(db.connection())
+    db.commit()
+    assert rollups() == incremental
+
+
+def seed_groups(db):
+    now = datetime.utcnow()
+    db.add_all(
+        [
+            TicketFactory(
+                assignee="Alice",
+                priority=Priority.HIGH,
+                status=Status.DONE,
+                created_at=now - timedelta(hours=10),
+                closed_at=now,
+            ),
+            TicketFactory(assignee="Alice", priority=Priority.LOW, status=Status.TODO),
+            TicketFactory(assignee="Bob", priority=Priority.HIGH, status=Status.IN_PROGRESS),
+            TicketFactory(assignee=None, priority=Priority.MEDIUM, status=Status.TODO),
+        ]
+    )
+    db.commit()
+
+
+def test_metrics_group_by(client, db):
+    seed_groups(db)
+
+    data = client.get("/api/v1/metrics", params={"group_by": "assignee"}).json()
+    assert data["group_by"] == ["assignee"]
+    assert [group["group"] for group in data["groups"]] == [
+        {"assignee": None},
+        {"assignee": "Alice"},
+        {"assignee": "Bob"},
+    ]
+    alice = data["groups"][1]
+    assert (alice["todo_count"], alice["in_progress_count"], alice["done_count"]) == (1, 0, 1)
+    assert alice["total_count"] == 2
+    assert 9.9 <= alice["avg_time_to_close_hours"] <= 10.1
+    assert data["groups"][2]["avg_time_to_close_hours"] is None
+    totals = client.get("/api/v1/metrics").json()
+    assert sum(group["total_count"] for group in data["groups"]) == totals["total_count"]
+
+    both = client.get("/api/v1/metrics", params={"group_by": ["assignee", "priority"]}).json()
+    assert len(both["groups"]) == 4
+    assert both["groups"][1]["group"] == {"assignee": "Alice", "priority": "HIGH"}
+
+    high = client.get("/api/v1/metrics", params={"priority": "HIGH"}).json()
+    assert (high["total_count"], high["done_count"], high["in_progress_count"]) == (2, 1, 1)
+    filtered = client.get(
+        "/api/v1/metrics", params={"group_by": "priority", "assignee": "Alice"}
+    ).json()
+    assert [group["group"]["priority"] for group in filtered["groups"]] == ["HIGH", "LOW"]
+
+    assert client.get("/api/v1/metrics", params={"group_by": "status"}).status_code == 422
+
+
+def test_metrics_group_by_cached_until_counted_fields_change(client, db, sql_statements):
+    seed_groups(db)
+    params = {"group_by": "assignee"}
+
+    first = client.get("/api/v1/metrics", params=params)
+    assert len(sql_statements) == 1
+    sql_statements.clear()
+    second = client.get("/api/v1/metrics", params=params)
+    assert sql_statements == []
+    assert second.content == first.content
+    etag = second.headers["ETag"]
+    cached = client.get("/api/v1/metrics", params=params, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    created = client.post("/api/v1/tickets", json={"title": "New", "assignee": "Bob"})
+    ticket_id = created.json()["id"]
+    bob = client.get("/api/v1/metrics", params=params).json()["groups"][2]
+    assert bob["todo_count"] == 1
+
+    # A title edit leaves every count as it was, so the entry stays.
+    client.patch(f"/api/v1/tickets/{ticket_id}", json={"title": "Renamed"})
+    sql_statements.clear()
+    client.get("/api/v1/metrics", params=params)
+    assert sql_statements == []
+
+    client.patch(f"/api/v1/tickets/{ticket_id}", json={"status": "DONE"})
+    bob = client.get("/api/v1/metrics", params=params).json()["groups"][2]
+    assert (bob["todo_count"], bob["done_count"]) == (0, 1)
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def compute(gate: asyncio.Event, fail: bool = False):
+        nonlocal calls
+        calls += 1
+        await gate.wait()
+        if fail:
+            raise ValueError("failed")
+        return calls
+
+    async def burst(fail: bool = False):
+        gate = asyncio.Event()
+        waiting = [
+            asyncio.ensure_future(flight.run("key", lambda: compute(gate, fail))) for _ in range(10)
+        ]
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(*waiting, return_exceptions=True)
+
+    async def scenario():
+        assert await burst() == [1] * 10
+        # Finished calls are not remembered: the next burst computes again.
+        assert await burst() == [2] * 10
+        errors = await burst(fail=True)
+        assert calls == 3
+        assert all(isinstance(error, ValueError) for error in errors)
+
+    asyncio.run(scenario())
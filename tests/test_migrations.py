@@ -0,0 +1,171 @@
+import re
+from datetime import date
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+from app.api.pagination import encode_cursor
+from app.db.migrate import downgrade, include_name, upgrade
+from app.db.session import Base
+from tests.conftest import engine
+from tests.factories import CommentFactory, TicketFactory
+
+# Plan lines where SQLite walks a whole table or sorts instead of reading an index.
+UNINDEXED = re.compile(
+    r"^(SCAN (tickets|comments|events|ticket_tombstones|metric_daily|metric_close_histogram"
+    r"|archived_tickets|archived_comments)"
+    r"(?! USING)"
+    r"|USE TEMP B-TREE FOR ORDER BY)"
+)
+# Relevance is computed per match, so no index holds it: search sorts its matches.
+RANKED_PATHS = {"/api/v1/search?q=ticket"}
+
+
+@pytest.fixture
+def scratch_engine(tmp_path):
+    scratch = create_engine(f"sqlite:///{tmp_path / 'scratch.db'}")
+    yield scratch
+    scratch.dispose()
+
+
+@pytest.mark.filterwarnings("ignore:.*expression-based index")
+def test_migrations_match_models():
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"include_name": include_name})
+        diff = compare_metadata(context, Base.metadata)
+        # Autogenerate cannot reflect indexes on expressions; they are at least there.
+        migrated = set(
+            connection.scalars(text("SELECT name FROM sqlite_master WHERE type = 'index'"))
+        )
+    assert diff == []
+    indexes = {index.name for table in Base.metadata.tables.values() for index in table.indexes}
+    assert indexes <= migrated
+
+
+def test_downgrade_and_upgrade_round_trip(scratch_engine):
+    with scratch_engine.begin() as connection:
+        upgrade(connection)
+        downgrade("base", connection)
+        assert not inspect(connection).has_table("tickets")
+        upgrade(connection)
+        assert inspect(connection).has_table("metric_counters")
+
+
+def test_legacy_create_all_schema_is_stamped(scratch_engine):
+    with scratch_engine.begin() as connection:
+        upgrade(connection, "0001")
+        connection.execute(
+            text(
+                "INSERT INTO tickets VALUES "
+                "('00000000000000000000000000000001', 'Old', NULL, NULL, "
+                "'LOW', 'TODO', NULL, '2025-01-01 00:00:00', NULL)"
+            )
+        )
+        connection.execute(text("DROP TABLE alembic_version"))
+
+    with scratch_engine.begin() as connection:
+        upgrade(connection)
+        todo = connection.execute(
+            text("SELECT sum(ticket_count) FROM metric_counters WHERE status = 'TODO'")
+        ).scalar_one()
+    assert todo == 1
+
+
+@pytest.mark.parametrize(
+    "method,path",
+    [
+        ("GET", "/api/v1/tickets"),
+        ("GET", "/api/v1/tickets?assignee=Alice"),
+        ("GET", "/api/v1/tickets?status=TODO"),
+        ("GET", "/api/v1/tickets?status=DONE"),
+        ("GET", "/api/v1/tickets?priority=HIGH"),
+        ("GET", "/api/v1/tickets?assignee=Alice&status=TODO"),
+        ("GET", "/api/v1/tickets?status=TODO&priority=HIGH"),
+        ("GET", "/api/v1/tickets?limit=1&cursor={cursor}"),
+        ("GET", "/api/v1/tickets?include_archived=true"),
+        ("GET", "/api/v1/tickets?include_archived=true&assignee=Alice"),
+        ("GET", "/api/v1/tickets?include_archived=true&priority=HIGH&cursor={cursor}"),
+        ("GET", "/api/v1/tickets?updated_since={sync_token}"),
+        ("GET", "/api/v1/tickets?sort=priority"),
+        ("GET", "/api/v1/tickets?sort=-status"),
+        ("GET", "/api/v1/tickets?sort=due_date"),
+        ("GET", "/api/v1/tickets?sort=-created_at&assignee=Alice"),
+        ("GET", "/api/v1/tickets?sort=-priority&cursor={sorted_cursor}"),
+        ("GET", "/api/v1/tickets?sort=due_date&assignee=Alice"),
+        ("GET", "/api/v1/tickets?sort=-due_date&status=TODO"),
+        ("GET", "/api/v1/tickets?sort=due_date&priority=HIGH"),
+        ("GET", "/api/v1/tickets?sort=priority&status=TODO"),
+        ("GET", "/api/v1/tickets?sort=priority&assignee=Alice&status=TODO"),
+        ("GET", "/api/v1/tickets?sort=-status&priority=HIGH"),
+        ("GET", "/api/v1/tickets?sort=status&assignee=Alice&priority=HIGH"),
+        ("GET", "/api/v1/tickets?sort=-priority&assignee=Alice&cursor={sorted_cursor}"),
+        ("GET", "/api/v1/tickets?sort=-created_at&include_archived=true"),
+        ("GET", "/api/v1/tickets?sort=priority&include_archived=true"),
+        ("GET", "/api/v1/tickets?sort=-status&include_archived=true&assignee=Alice"),
+        ("GET", "/api/v1/tickets?sort=due_date&include_archived=true&priority=HIGH"),
+        ("GET", "/api/v1/tickets?sort=due_date&include_archived=true&status=DONE"),
+        ("GET", "/api/v1/tickets?sort=-priority&include_archived=true&cursor={sorted_cursor}"),
+        ("GET", "/api/v1/tickets?overdue=true"),
+        ("GET", "/api/v1/tickets?due_within=7&assignee=Alice"),
+        ("GET", "/api/v1/tickets?overdue=true&due_within=7&sort=-due_date&cursor={due_cursor}"),
+        ("GET", "/api/v1/tickets?overdue=true&status=TODO"),
+        ("GET", "/api/v1/tickets?due_within=7&assignee=Alice&priority=HIGH"),
+        ("GET", "/api/v1/tickets?overdue=true&sort=priority"),
+        ("GET", "/api/v1/tickets?due_within=7&sort=-created_at"),
+        ("GET", "/api/v1/tickets?overdue=true&sort=-status&assignee=Alice&priority=HIGH"),
+        ("GET", "/api/v1/tickets?due_within=7&sort=created_at&status=IN_PROGRESS"),
+        ("GET", "/api/v1/tickets?include=comments"),
+        ("GET", "/api/v1/tickets?include=comment_count&include_archived=true"),
+        ("POST", "/api/v1/tickets:batchGet?include=comments"),
+        ("GET", "/api/v1/tickets/{ticket_id}"),
+        ("PATCH", "/api/v1/tickets/{ticket_id}"),
+        ("GET", "/api/v1/tickets/{ticket_id}/comments"),
+        ("GET", "/api/v1/search?q=ticket"),
+        ("GET", "/api/v1/metrics/timeseries?group_by=assignee"),
+        ("GET", "/api/v1/events?follow=false&last_event_id=1"),
+        ("GET", "/api/v1/export"),
+        ("GET", "/api/v1/export?limit=1"),
+        ("GET", "/api/v1/export?include_archived=true"),
+        ("DELETE", "/api/v1/tickets/{ticket_id}/comments/{comment_id}"),
+        ("DELETE", "/api/v1/tickets/{ticket_id}"),
+    ],
+)
+def test_endpoint_queries_use_indexes(client, db, sql_statements, method, path):
+    ticket = TicketFactory(assignee="Alice")
+    db.add_all([ticket, TicketFactory()])
+    db.commit()
+    comment = CommentFactory(ticket_id=ticket.id)
+    db.add(comment)
+    db.commit()
+    first_page = client.get("/api/v1/tickets?limit=1").headers
+    cursor, sync_token = first_page["X-Next-Cursor"], first_page["X-Sync-Token"]
+    sorted_cursor = client.get("/api/v1/tickets?sort=-priority&limit=1").headers["X-Next-Cursor"]
+    due_cursor = encode_cursor(date.today(), ticket.created_at, ticket.id, sort="-due_date")
+
+    sql_statements.clear()
+    url = path.format(
+        ticket_id=ticket.id,
+        comment_id=comment.id,
+        cursor=cursor,
+        sync_token=sync_token,
+        sorted_cursor=sorted_cursor,
+        due_cursor=due_cursor,
+    )
+    body = {"PATCH": {"title": "x"}, "POST": {"ids": [str(ticket.id)]}}.get(method)
+    response = client.request(method, url, json=body)
+    assert response.status_code < 400
+
+    plans = []
+    with engine.connect() as connection:
+        for statement, parameters in sql_statements:
+            if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                continue
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.extend(row.detail for row in rows)
+
+    if path in RANKED_PATHS:
+        plans = [detail for detail in plans if detail != "USE TEMP B-TREE FOR ORDER BY"]
+    assert plans
+    assert [detail for detail in plans if UNINDEXED.match(detail)] == []
@@ -0,0 +1,77 @@
+from tests.factories import CommentFactory, TicketFactory
+
+
+def test_search_ranks_title_above_description_and_comments(client, db):
+    in_title = TicketFactory(title="Checkout timeout", description="Payment page")
+    in_description = TicketFactory(title="Payments", description="Checkout hits a timeout")
+    in_comment = TicketFactory(title="Slow page", description="Reported by support")
+    unrelated = TicketFactory(title="Dark mode", description="Add a theme toggle")
+    db.add_all([in_title, in_description, in_comment, unrelated])
+    db.commit()
+    db.add(CommentFactory(ticket_id=in_comment.id, content="Checkout fails with a timeout"))
+    db.commit()
+
+    response = client.get("/api/v1/search", params={"q": "checkout timeouts"})
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["ticket"]["id"] for r in results] == [
+        str(in_title.id),
+        str(in_description.id),
+        str(in_comment.id),
+    ]
+    assert results[0]["rank"] > results[1]["rank"] > results[2]["rank"]
+    assert results[0]["highlights"]["title"] == "<mark>Checkout</mark> <mark>timeout</mark>"
+    assert "<mark>timeout</mark>" in results[1]["highlights"]["description"]
+    assert "<mark>Checkout</mark>" in results[2]["highlights"]["comments"]
+
+
+def test_search_index_follows_writes(client, db):
+    ticket = TicketFactory(title="Login page", description="")
+    db.add(ticket)
+    db.commit()
+
+    def found(q):
+        return [r["ticket"]["id"] for r in client.get("/api/v1/search", params={"q": q}).json()]
+
+    client.patch(f"/api/v1/tickets/{ticket.id}", json={"title": "Signup page"})
+    assert found("login") == []
+    assert found("signup") == [str(ticket.id)]
+
+    comment = client.post(
+        f"/api/v1/tickets/{ticket.id}/comments", json={"author": "Bob", "content": "captcha"}
+    ).json()
+    assert found("captcha") == [str(ticket.id)]
+    client.delete(f"/api/v1/tickets/{ticket.id}/comments/{comment['id']}")
+    assert found("captcha") == []
+
+    created = client.post(
+        "/api/v1/tickets:bulk", json={"items": [{"title": "Signup emails"}]}
+    ).json()["results"]
+    assert set(found("signup")) == {str(ticket.id), created[0]["id"]}
+
+    client.delete(f"/api/v1/tickets/{ticket.id}")
+    assert found("signup") == [created[0]["id"]]
+
+
+def test_search_pagination(client, db):
+    db.add_all(TicketFactory(title=f"Flaky test {i}", description=None) for i in range(5))
+    db.commit()
+
+    first = client.get("/api/v1/search", params={"q": "flaky", "limit": 3}).json()
+    rest = client.get("/api/v1/search", params={"q": "flaky", "limit": 3, "offset": 3}).json()
+    assert len(first) == 3
+    assert len(rest) == 2
+    ids = [r["ticket"]["id"] for r in first + rest]
+    # Equal scores come in id order, so offset pages neither repeat nor skip a hit.
+    assert len({r["rank"] for r in first + rest}) == 1
+    assert ids == sorted(set(ids))
+    assert len(ids) == 5
+
+
+def test_search_query_validation(client):
+    assert client.get("/api/v1/search").status_code == 422
+    assert client.get("/api/v1/search", params={"q": ""}).status_code == 422
+
+    response = client.get("/api/v1/search", params={"q": '"*) OR NEAR('})
+    assert response.status_code == 200
+    assert response.json() == []
@@ -0,0 +1,105 @@
+import uuid
+from datetime import UTC, date, datetime, timedelta, timezone
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app.api.serialization import dump_rows
+from app.db.models.comment import Comment
+from app.db.models.ticket import Priority, Status, Ticket
+from app.schemas.comment import CommentResponse
+from app.schemas.ticket import TicketResponse
+from tests.factories import CommentFactory, TicketFactory
+
+AWKWARD_TEXT = 'quote" back\\ \n\t\x01 ünï €😀 </script>'
+
+
+def pydantic_json(model, instances) -> bytes:
+    """What FastAPI sends for ``response_model=list[model]``: validate, then dump."""
+    adapter = TypeAdapter(list[model])
+    return adapter.dump_json(adapter.validate_python(instances, from_attributes=True))
+
+
+def seed_awkward_tickets(db) -> list[Ticket]:
+    tickets = [
+        TicketFactory(title=AWKWARD_TEXT, description=None, assignee=None, due_date=None),
+        TicketFactory(
+            title="Closed",
+            status=Status.DONE,
+            priority=Priority.HIGH,
+            created_at=datetime(2024, 2, 29, 23, 59, 59, 999999),
+            closed_at=datetime(2024, 3, 1, tzinfo=UTC),
+        ),
+        TicketFactory(created_at=datetime(2024, 3, 1, 12, 0, 0, 120000)),
+    ]
+    db.add_all(tickets)
+    db.commit()
+    db.add_all(
+        CommentFactory(ticket_id=tickets[0].id, content=content, author=AWKWARD_TEXT)
+        for content in (AWKWARD_TEXT, "", "plain")
+    )
+    db.commit()
+    return tickets
+
+
+def test_ticket_list_matches_the_pydantic_path_byte_for_byte(client, db):
+    seed_awkward_tickets(db)
+    expected = pydantic_json(
+        TicketResponse, db.scalars(select(Ticket).order_by(Ticket.created_at, Ticket.id)).all()
+    )
+
+    response = client.get("/api/v1/tickets")
+
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == expected
+
+
+def test_ticket_stream_matches_the_pydantic_path(client, db):
+    seed_awkward_tickets(db)
+    tickets = db.scalars(select(Ticket).order_by(Ticket.created_at, Ticket.id)).all()
+    expected = b"".join(
+        TicketResponse.model_validate(ticket).model_dump_json().encode() + b"\n"
+        for ticket in tickets
+    )
+
+    response = client.get("/api/v1/tickets", headers={"Accept": "application/x-ndjson"})
+
+    assert response.content == expected
+
+
+def test_comment_list_matches_the_pydantic_path_byte_for_byte(client, db):
+    ticket = seed_awkward_tickets(db)[0]
+    expected = pydantic_json(
+        CommentResponse,
+        db.scalars(
+            select(Comment).where(Comment.ticket_id == ticket.id).order_by(Comment.created_at)
+        ).all(),
+    )
+
+    response = client.get(f"/api/v1/tickets/{ticket.id}/comments")
+
+    assert response.content == expected
+
+
+def test_aware_datetimes_match_the_pydantic_path():
+    # SQLite hands back naive datetimes; Postgres returns them in UTC.
+    rows = [
+        (
+            uuid.uuid4(),
+            AWKWARD_TEXT,
+            None,
+            None,
+            Priority.LOW,
+            Status.DONE,
+            date(2024, 2, 29),
+            datetime(2024, 1, 1, tzinfo=UTC),
+            datetime(2024, 1, 2, 3, 4, 5, 600, tzinfo=timezone(timedelta(hours=-5))),
+            datetime(2024, 1, 2, 3, 4, 5, 600, tzinfo=UTC),
+            3,
+        )
+    ]
+    expected = pydantic_json(
+        TicketResponse, [dict(zip(TicketResponse.model_fields, row)) for row in rows]
+    )
+
+    assert dump_rows(TicketResponse, rows) == expected
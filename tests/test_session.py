@@ -0,0 +1,286 @@
+import json
+import threading
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, delete, event, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.consistency import PRIMARY_COOKIE
+from app.db import session
+from app.db.migrate import upgrade
+from app.db.models import Ticket
+from app.db.session import (
+    ThreadpoolSession,
+    enable_sqlite_foreign_keys,
+    get_db,
+    get_metrics_db,
+    get_read_db,
+    prepare_engine,
+    statement_timeout_args,
+    to_async_url,
+)
+from app.db.sqlite import checkpoint, is_database_file
+from app.main import app
+from tests.conftest import (
+    TEST_DB_DIR,
+    TestingAsyncSessionLocal,
+    TestingSessionLocal,
+    override_get_db,
+)
+from tests.factories import TicketFactory
+from tests.test_archive import archive_all, seed
+from tests.test_tickets import walk
+
+
+@pytest.fixture
+def sync_stack():
+    async def override_get_sync_db():
+        db = ThreadpoolSession(TestingSessionLocal(expire_on_commit=False))
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    dependencies = (get_db, get_read_db, get_metrics_db)
+    for dependency in dependencies:
+        app.dependency_overrides[dependency] = override_get_sync_db
+    yield
+    for dependency in dependencies:
+        app.dependency_overrides[dependency] = override_get_db
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """A second, empty database standing in for a replica that has not caught up."""
+    url = f"sqlite:///{Path(TEST_DB_DIR.name) / 'replica.db'}"
+    replica_engine = create_engine(url)
+    with replica_engine.begin() as connection:
+        upgrade(connection)
+    replica_engine.dispose()
+    replica_async_engine = create_async_engine(to_async_url(url), poolclass=NullPool)
+    event.listen(replica_async_engine.sync_engine, "connect", enable_sqlite_foreign_keys)
+
+    monkeypatch.setattr(settings, "database_replica_url", url)
+    monkeypatch.setattr(session, "primary_sessions", TestingAsyncSessionLocal)
+    monkeypatch.setattr(session, "metrics_sessions", TestingAsyncSessionLocal)
+    monkeypatch.setattr(
+        session, "replica_sessions", async_sessionmaker(replica_async_engine, autoflush=False)
+    )
+    read_dependencies = (get_read_db, get_metrics_db)
+    for dependency in read_dependencies:
+        del app.dependency_overrides[dependency]
+    yield url
+    for dependency in read_dependencies:
+        app.dependency_overrides[dependency] = override_get_db
+    replica_engine = create_engine(url)
+    with replica_engine.begin() as connection:
+        connection.execute(delete(Ticket))
+    replica_engine.dispose()
+
+
+def test_to_async_url():
+    url = to_async_url("postgresql://u:p@db/app")
+    assert url.render_as_string(hide_password=False) == "postgresql+asyncpg://u:p@db/app"
+    assert str(to_async_url("postgresql+psycopg2://db/app")) == "postgresql+asyncpg://db/app"
+    assert str(to_async_url("sqlite:///./app.db")) == "sqlite+aiosqlite:///./app.db"
+
+
+def test_sync_stack_serves_the_same_api(client, sync_stack):
+    ticket = client.post("/api/v1/tickets", json={"title": "Sync"}).json()
+    client.post(f"/api/v1/tickets/{ticket['id']}/comments", json={"author": "A", "content": "c"})
+
+    response = client.patch(f"/api/v1/tickets/{ticket['id']}", json={"status": "DONE"})
+    assert response.json()["closed_at"] is not None
+    assert len(client.get(f"/api/v1/tickets/{ticket['id']}/comments").json()) == 1
+    assert client.get("/api/v1/metrics").json()["done_count"] == 1
+
+    stream = client.get("/api/v1/tickets", headers={"Accept": "application/x-ndjson"})
+    assert len(stream.text.splitlines()) == 1
+
+    assert client.delete(f"/api/v1/tickets/{ticket['id']}").status_code == 204
+    assert client.get(f"/api/v1/tickets/{ticket['id']}").status_code == 404
+    # A batch get is a POST, but only reads: replica, and no cookie.
+    batch = client.post("/api/v1/tickets:batchGet", json={"ids": [ticket["id"]]})
+    assert batch.json() == {"tickets": [], "missing": [ticket["id"]]}
+    assert PRIMARY_COOKIE not in batch.cookies
+
+
+def test_sync_stack_streams_exports(client, db, sync_stack):
+    db.add_all([TicketFactory(title="First"), TicketFactory(title="Second")])
+    db.commit()
+
+    export = client.get("/api/v1/export", params={"include_archived": True})
+    assert export.status_code == 200
+    assert len(export.text.splitlines()) == 2
+    # A limited export closes its cursor before reading it to the end.
+    limited = client.get("/api/v1/export", params={"limit": 1, "include_archived": True})
+    assert len(limited.text.splitlines()) == 1
+
+
+def test_sync_stack_streams_merged_lists(client, db, sync_stack):
+    seed(db)
+    archive_all(db)
+
+    def ndjson_ids(**params):
+        response = client.get(
+            "/api/v1/tickets",
+            params=params | {"include_archived": True, "fields": "id"},
+            headers={"Accept": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+        return [json.loads(line)["id"] for line in response.text.splitlines()]
+
+    every = [ticket["id"] for ticket in client.get("/api/v1/tickets?include_archived=true").json()]
+    assert ndjson_ids() == every
+    # The merge stops reading one table before its cursor is exhausted.
+    assert ndjson_ids(limit=3) == every[:3]
+    by_priority = walk(client, {"include_archived": "true", "sort": "-priority"})
+    first = client.get(
+        "/api/v1/tickets", params={"include_archived": True, "sort": "-priority", "limit": 1}
+    )
+    cursor = first.headers["X-Next-Cursor"]
+    assert ndjson_ids(sort="-priority", cursor=cursor) == by_priority[1:]
+
+
+def test_statement_timeout_is_set_at_connect(monkeypatch):
+    monkeypatch.setattr(settings, "database_statement_timeout_ms", 0)
+    assert statement_timeout_args(make_url("postgresql://db/app")) == {}
+
+    monkeypatch.setattr(settings, "database_statement_timeout_ms", 5000)
+    assert statement_timeout_args(make_url("postgresql://db/app")) == {
+        "options": "-c statement_timeout=5000"
+    }
+    assert statement_timeout_args(make_url("postgresql+asyncpg://db/app")) == {
+        "server_settings": {"statement_timeout": "5000"}
+    }
+    assert statement_timeout_args(make_url("sqlite:///./app.db")) == {}
+
+
+def test_writes_set_no_cookie_without_a_replica(client):
+    response = client.post("/api/v1/tickets", json={"title": "Primary only"})
+    assert PRIMARY_COOKIE not in response.cookies
+
+
+def test_reads_go_to_the_replica_unless_the_client_just_wrote(client, replica):
+    response = client.post("/api/v1/tickets", json={"title": "Fresh"})
+    assert PRIMARY_COOKIE in response.cookies
+    ticket = response.json()
+
+    # Read-your-writes: the cookie sends this client's reads to the primary.
+    assert [t["id"] for t in client.get("/api/v1/tickets").json()] == [ticket["id"]]
+    assert client.get(f"/api/v1/tickets/{ticket['id']}/comments").status_code == 200
+    assert client.get("/api/v1/metrics").json()["total_count"] == 1
+
+    client.cookies.clear()
+    assert client.get("/api/v1/tickets").json() == []
+    assert client.get("/api/v1/metrics").json()["total_count"] == 0
+    assert client.get(f"/api/v1/tickets/{ticket['id']}").status_code == 404
+
+    failed = client.patch(f"/api/v1/tickets/{ticket['id']}x", json={"title": "Nope"})
+    assert failed.status_code == 422
+    assert PRIMARY_COOKIE not in failed.cookies
+
+
+def test_replica_reads_do_not_fill_the_ticket_cache(client, replica):
+    ticket = client.post("/api/v1/tickets", json={"title": "Fresh"}).json()
+    # The replica has only caught up to an older version of the ticket.
+    replica_engine = create_engine(replica)
+    with Session(replica_engine) as db:
+        db.add(TicketFactory(id=uuid.UUID(ticket["id"]), title="Stale"))
+        db.commit()
+    replica_engine.dispose()
+    url = f"/api/v1/tickets/{ticket['id']}"
+
+    client.cookies.clear()
+    assert client.get(url).json()["title"] == "Stale"
+    # A write sends this client back to the primary, which the cache must not hide.
+    client.post("/api/v1/tickets", json={"title": "Other"})
+    assert client.get(url).json()["title"] == "Fresh"
+
+
+@pytest.fixture
+def tuned_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'tuned.db'}"
+    writer = create_engine(url)
+    prepare_engine(writer, "tuned:setup")
+    with writer.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE counter (n INTEGER NOT NULL)")
+        connection.exec_driver_sql("INSERT INTO counter VALUES (0)")
+    writer.dispose()
+    return url
+
+
+def test_sqlite_file_mode_is_selected_from_the_url():
+    assert is_database_file(make_url("sqlite:///./app.db"))
+    assert is_database_file(make_url("sqlite+aiosqlite:////data/app.db"))
+    assert not is_database_file(make_url("sqlite://"))
+    assert not is_database_file(make_url("sqlite:///:memory:"))
+    assert not is_database_file(make_url("postgresql://db/app"))
+
+
+def test_sqlite_readers_are_read_only_and_not_blocked_by_the_writer(tuned_url):
+    writer = create_engine(tuned_url, pool_size=1, max_overflow=0)
+    prepare_engine(writer, "tuned:write")
+    reader = create_engine(tuned_url)
+    prepare_engine(reader, "tuned:read", read_only=True)
+    try:
+        with reader.connect() as connection:
+            pragma = connection.exec_driver_sql
+            assert pragma("PRAGMA journal_mode").scalar() == "wal"
+            assert pragma("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert pragma("PRAGMA foreign_keys").scalar() == 1
+            assert pragma("PRAGMA query_only").scalar() == 1
+            assert pragma("PRAGMA cache_size").scalar() == -settings.sqlite_cache_size_mb * 1024
+            with pytest.raises(OperationalError, match="readonly"):
+                connection.exec_driver_sql("UPDATE counter SET n = 1")
+
+        with writer.begin() as write:
+            write.exec_driver_sql("UPDATE counter SET n = 1")
+            # The writer holds the lock; readers see the last commit without waiting.
+            with reader.connect() as connection:
+                assert connection.exec_driver_sql("SELECT n FROM counter").scalar() == 0
+        with reader.connect() as connection:
+            assert connection.exec_driver_sql("SELECT n FROM counter").scalar() == 1
+
+        busy, logged, checkpointed = checkpoint(writer)
+        assert busy == 0 and logged == checkpointed > 0
+    finally:
+        writer.dispose()
+        reader.dispose()
+
+
+def test_sqlite_writers_of_other_processes_wait_for_the_lock(tuned_url):
+    """Read-then-write transactions from several engines (as from several workers):
+    each begins ``IMMEDIATE``, so none fails with "database is locked"."""
+    engines = [create_engine(tuned_url, pool_size=1, max_overflow=0) for _ in range(4)]
+    for number, engine in enumerate(engines):
+        prepare_engine(engine, f"tuned:worker{number}")
+    errors = []
+
+    def increment(engine):
+        try:
+            for _ in range(25):
+                with engine.begin() as connection:
+                    n = connection.exec_driver_sql("SELECT n FROM counter").scalar()
+                    connection.exec_driver_sql("UPDATE counter SET n = ?", (n + 1,))
+        except OperationalError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=increment, args=(engine,)) for engine in engines]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        assert errors == []
+        with engines[0].connect() as connection:
+            assert connection.exec_driver_sql("SELECT n FROM counter").scalar() == 100
+    finally:
+        for engine in engines:
+            engine.dispose()
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.api.pagination import encode_sync_token
+from app.api.v1 import tickets
+from app.core.config import settings
+from app.db import bulk
+from app.db.models.tombstone import TicketTombstone
+from app.db.sync import prune_tombstones
+from tests.factories import TicketFactory
+
+NIL = "00000000-0000-0000-0000-000000000000"
+
+
+@pytest.fixture(autouse=True)
+def no_overlap(monkeypatch):
+    # Tests run faster than any commit could lag; without this every sync would
+    # also repeat the last five seconds.
+    monkeypatch.setattr(settings, "sync_overlap_seconds", 0)
+
+
+def sync_token(client) -> str:
+    return client.get("/api/v1/tickets?limit=1").headers["X-Sync-Token"]
+
+
+def test_updated_at_follows_every_write(client):
+    ticket = client.post("/api/v1/tickets", json={"title": "Sync"}).json()
+    assert ticket["updated_at"] >= ticket["created_at"]
+
+    patched = client.patch(f"/api/v1/tickets/{ticket['id']}", json={"title": "Renamed"}).json()
+    bulk = client.patch(
+        "/api/v1/tickets:bulk", json={"items": [{"id": ticket["id"], "status": "DONE"}]}
+    ).json()["results"][0]["ticket"]
+
+    assert ticket["updated_at"] < patched["updated_at"] < bulk["updated_at"]
+    assert bulk["updated_at"] == client.get(f"/api/v1/tickets/{ticket['id']}").json()["updated_at"]
+
+
+def test_updated_since_returns_changes_and_deletions(client, db):
+    kept, changed, removed = TicketFactory(), TicketFactory(), TicketFactory()
+    db.add_all([kept, changed, removed])
+    db.commit()
+    token = sync_token(client)
+
+    client.patch(f"/api/v1/tickets/{changed.id}", json={"status": "DONE"})
+    client.delete(f"/api/v1/tickets/{removed.id}")
+    created = client.post("/api/v1/tickets", json={"title": "New"}).json()
+
+    response = client.get("/api/v1/tickets", params={"updated_since": token})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [ticket["id"] for ticket in body["tickets"]] == [str(changed.id), created["id"]]
+    assert body["tickets"][0]["status"] == "DONE"
+    assert body["deleted"] == [str(removed.id)]
+    assert body["has_more"] is False
+
+    unchanged = client.get("/api/v1/tickets", params={"updated_since": body["sync_token"]})
+    assert unchanged.json()["tickets"] == unchanged.json()["deleted"] == []
+
+
+def test_only_lists_of_all_tickets_start_a_sync(client):
+    assert "X-Sync-Token" in client.get("/api/v1/tickets", params={"sort": "-priority"}).headers
+    for params in (
+        {"assignee": "A"},
+        {"status": "TODO"},
+        {"priority": "HIGH"},
+        {"overdue": "true"},
+        {"include_archived": "true"},
+    ):
+        assert "X-Sync-Token" not in client.get("/api/v1/tickets", params=params).headers, params
+
+
+def test_writes_and_tombstones_share_the_database_clock(client, monkeypatch):
+    ticket = client.post("/api/v1/tickets", json={"title": "Gone"}).json()
+
+    class Ahead(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() + timedelta(hours=1)
+
+    # An application clock ahead of the database's moves no sync position.
+    monkeypatch.setattr(tickets, "datetime", Ahead)
+    monkeypatch.setattr(bulk, "datetime", Ahead)
+    token = sync_token(client)
+    client.delete(f"/api/v1/tickets/{ticket['id']}")
+    created = client.post("/api/v1/tickets", json={"title": "New"}).json()
+
+    body = client.get("/api/v1/tickets", params={"updated_since": token}).json()
+    assert body["deleted"] == [ticket["id"]]
+    assert [ticket["id"] for ticket in body["tickets"]] == [created["id"]]
+
+
+def test_updated_since_pages_through_ties(client):
+    token = sync_token(client)
+    items = [{"title": f"T{i}"} for i in range(3)]
+    created = client.post("/api/v1/tickets:bulk", json={"items": items}).json()["results"]
+    client.delete(f"/api/v1/tickets/{created[0]['id']}")
+
+    seen, deleted, has_more = [], [], True
+    while has_more:
+        body = client.get("/api/v1/tickets", params={"updated_since": token, "limit": 1}).json()
+        seen += [ticket["id"] for ticket in body["tickets"]]
+        deleted += body["deleted"]
+        token, has_more = body["sync_token"], body["has_more"]
+
+    assert sorted(seen) == sorted(result["id"] for result in created[1:])
+    assert deleted == [created[0]["id"]]
+
+
+def test_updated_since_validation(client):
+    assert client.get("/api/v1/tickets?updated_since=nonsense").status_code == 400
+    token = sync_token(client)
+    assert client.get(f"/api/v1/tickets?updated_since={token}&assignee=A").status_code == 400
+
+    expired = encode_sync_token(
+        datetime.utcnow() - timedelta(days=settings.tombstone_retention_days + 1), NIL
+    )
+    assert client.get(f"/api/v1/tickets?updated_since={expired}").status_code == 410
+
+
+def test_prune_tombstones(client, db):
+    ticket = client.post("/api/v1/tickets", json={"title": "Gone"}).json()
+    client.delete(f"/api/v1/tickets/{ticket['id']}")
+    assert db.scalars(select(TicketTombstone.id)).all() != []
+
+    assert prune_tombstones(db.connection(), datetime.utcnow() - timedelta(days=1)) == 0
+    assert prune_tombstones(db.connection(), datetime.utcnow() + timedelta(seconds=1)) == 1
@@ -1,4 +1,7 @@
-from datetime import date
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 
 from app.db.models.ticket import Priority, Status, Ticket
 from tests.factories import CommentFactory, TicketFactory
@@ -124,6 +127,93 @@ def test_update_ticket_status_from_done(client, db):
     assert data["closed_at"] is None
 
 
+def test_update_ticket_if_match(client, db):
+    created = client.post("/api/v1/tickets", json={"title": "Versioned"})
+    assert (created.headers["ETag"], created.json()["version"]) == ('"1"', 1)
+    url = f"/api/v1/tickets/{created.json()['id']}"
+
+    response = client.patch(url, json={"status": "DONE"}, headers={"If-Match": '"1"'})
+    assert response.status_code == 200
+    assert (response.headers["ETag"], response.json()["version"]) == ('"2"', 2)
+    assert response.json()["closed_at"] is not None
+    assert client.get(url).headers["ETag"] == '"2"'
+
+    stale = client.patch(url, json={"title": "Lost"}, headers={"If-Match": '"1"'})
+    assert stale.status_code == 412
+    assert stale.headers["ETag"] == '"2"'
+    assert client.patch(url, json={"title": "x"}, headers={"If-Match": 'W/"2"'}).status_code == 412
+    assert client.get(url).json()["title"] == "Versioned"
+
+    listed = client.patch(url, json={"status": "TODO"}, headers={"If-Match": '"1", "2"'})
+    assert (listed.json()["version"], listed.json()["closed_at"]) == (3, None)
+    assert (
+        client.patch(url, json={"title": "Any"}, headers={"If-Match": "*"}).json()["version"] == 4
+    )
+    assert client.patch(url, json={"title": "Unconditional"}).json()["version"] == 5
+    bulk = client.patch("/api/v1/tickets:bulk", json={"items": [{"id": created.json()["id"]}]})
+    assert bulk.json()["results"][0]["ticket"]["version"] == 6
+
+    missing = f"/api/v1/tickets/{uuid.uuid4()}"
+    assert (
+        client.patch(missing, json={"title": "x"}, headers={"If-Match": '"1"'}).status_code == 404
+    )
+
+
+def test_writes_take_one_statement(client, sql_statements):
+    # Events, tombstones and metrics are written by triggers, inside the write itself.
+    def statements(response, status_code):
+        assert response.status_code == status_code
+        executed = [statement.split()[:2] for statement, _ in sql_statements]
+        sql_statements.clear()
+        return executed
+
+    sql_statements.clear()
+    created = client.post("/api/v1/tickets", json={"title": "Round trips"})
+    assert statements(created, 201) == [["INSERT", "INTO"]]
+    url = f"/api/v1/tickets/{created.json()['id']}"
+
+    comment = client.post(f"{url}/comments", json={"author": "A", "content": "hi"})
+    assert statements(comment, 201) == [["INSERT", "INTO"]]
+
+    # Postgres reads the old row in the UPDATE itself; SQLite cannot return it, so it is
+    # read first. Either way the response comes from RETURNING, not a refresh.
+    renamed = client.patch(url, json={"title": "Renamed"})
+    assert statements(renamed, 200) == [["SELECT", "tickets.id,"], ["UPDATE", "tickets"]]
+    closed = client.patch(url, json={"status": "DONE"})
+    assert statements(closed, 200) == [["SELECT", "tickets.id,"], ["UPDATE", "tickets"]]
+
+    removed = client.delete(f"{url}/comments/{comment.json()['id']}")
+    assert statements(removed, 204) == [["DELETE", "FROM"]]
+    assert statements(client.delete(url), 204) == [["DELETE", "FROM"]]
+
+
+def test_concurrent_updates_are_not_lost(client):
+    ticket = client.post("/api/v1/tickets", json={"title": "Counter", "description": ""}).json()
+    url = f"/api/v1/tickets/{ticket['id']}"
+    tokens = [f"{n};" for n in range(40)]
+
+    def append(token: str) -> int:
+        # Read-modify-write, retried on 412 until it applies to the version it read.
+        conflicts = 0
+        while True:
+            current = client.get(url)
+            description = current.json()["description"] + token
+            headers = {"If-Match": current.headers["ETag"]}
+            response = client.patch(url, json={"description": description}, headers=headers)
+            if response.status_code == 200:
+                return conflicts
+            assert response.status_code == 412
+            conflicts += 1
+
+    with ThreadPoolExecutor(8) as pool:
+        conflicts = sum(pool.map(append, tokens))
+
+    final = client.get(url).json()
+    assert sorted(final["description"].split(";")[:-1], key=int) == [str(n) for n in range(40)]
+    assert final["version"] == 1 + len(tokens)
+    assert conflicts > 0
+
+
 def test_delete_ticket(client, db):
     ticket = TicketFactory()
     db.add(ticket)
@@ -151,3 +241,488 @@ def test_delete_ticket_cascades_comments(client, db):
     comments_response = client.get(f"/api/v1/tickets/{ticket.id}/comments")
     assert comments_response.status_code == 200
     assert comments_response.json() == []
+
+
+def test_delete_ticket_statement_count_independent_of_comments(client, db, sql_statements):
+    counts = []
+    for comment_count in (0, 10, 200):
+        ticket = TicketFactory()
+        db.add(ticket)
+        db.commit()
+        db.add_all(CommentFactory(ticket_id=ticket.id) for _ in range(comment_count))
+        db.commit()
+
+        sql_statements.clear()
+        assert client.delete(f"/api/v1/tickets/{ticket.id}").status_code == 204
+        counts.append(len(sql_statements))
+        assert not any("comments" in statement for statement, _ in sql_statements)
+
+    assert counts[0] == counts[1] == counts[2]
+
+
+def test_list_tickets_keyset_pagination(client, db):
+    start = datetime(2025, 1, 1)
+    tickets = [TicketFactory(created_at=start + timedelta(minutes=i)) for i in range(5)]
+    db.add_all(tickets)
+    db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "cursor": cursor} if cursor else {"limit": 2}
+        response = client.get("/api/v1/tickets", params=params)
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == [str(ticket.id) for ticket in tickets]
+
+
+def test_list_tickets_invalid_cursor(client):
+    response = client.get("/api/v1/tickets?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_list_tickets_ndjson_stream(client, db):
+    db.add_all([TicketFactory(assignee="Alice"), TicketFactory(assignee="Bob")])
+    db.commit()
+
+    response = client.get(
+        "/api/v1/tickets?assignee=Alice", headers={"Accept": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 1
+    assert lines[0]["assignee"] == "Alice"
+
+
+def walk(client, params: dict, limit: int = 2) -> list[str]:
+    """Ids of every page of a listing, following the cursors."""
+    seen, cursor = [], None
+    while True:
+        page = params | {"limit": limit} | ({"cursor": cursor} if cursor else {})
+        response = client.get("/api/v1/tickets", params=page)
+        assert response.status_code == 200, response.text
+        seen.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return seen
+
+
+def test_list_tickets_sorted(client, db):
+    start = datetime(2025, 1, 1)
+    tickets = [
+        TicketFactory(
+            created_at=start + timedelta(minutes=i),
+            assignee="Alice" if i % 2 == 0 else "Bob",
+            priority=list(Priority)[i % 3],
+            status=list(Status)[i // 4 % 3],
+            due_date=None if i % 5 == 0 else date(2025, 3, 1 + i % 4),
+        )
+        for i in range(12)
+    ]
+    db.add_all(tickets)
+    db.commit()
+
+    ranks = {
+        "created_at": lambda ticket: 0,
+        "priority": lambda ticket: list(Priority).index(ticket.priority),
+        "status": lambda ticket: list(Status).index(ticket.status),
+        "due_date": lambda ticket: ticket.due_date or date.max,
+    }
+    for field, rank in ranks.items():
+        expected = [
+            str(ticket.id)
+            for ticket in sorted(tickets, key=lambda t: (rank(t), t.created_at, t.id))
+        ]
+        # Pages of 2 and 3 end inside and at the end of a run of equal keys.
+        assert walk(client, {"sort": field}) == expected, field
+        assert walk(client, {"sort": field}, limit=3) == expected, field
+        assert walk(client, {"sort": f"-{field}"}) == expected[::-1], field
+
+    # Streamed after a cursor: the rest of its priority, then the next ones.
+    first = client.get("/api/v1/tickets", params={"sort": "-priority", "limit": 3})
+    stream = client.get(
+        "/api/v1/tickets",
+        params={"sort": "-priority", "cursor": first.headers["X-Next-Cursor"], "fields": "id"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    by_priority = walk(client, {"sort": "-priority"})
+    assert [json.loads(line)["id"] for line in stream.text.splitlines()] == by_priority[3:]
+
+    def values(ticket: Ticket) -> dict:
+        return {
+            "assignee": ticket.assignee,
+            "status": ticket.status.value,
+            "priority": ticket.priority.value,
+        }
+
+    # Filters, one or several, keep every sort.
+    for filters in (
+        {"assignee": "Alice"},
+        {"status": "TODO"},
+        {"priority": "LOW"},
+        {"assignee": "Alice", "status": "IN_PROGRESS"},
+        {"assignee": "Alice", "status": "DONE", "priority": "HIGH"},
+    ):
+        matching = [t for t in tickets if filters.items() <= values(t).items()]
+        for field, rank in ranks.items():
+            expected = [
+                str(ticket.id)
+                for ticket in sorted(matching, key=lambda t: (rank(t), t.created_at, t.id))
+            ]
+            assert walk(client, filters | {"sort": field}) == expected, (filters, field)
+            assert walk(client, filters | {"sort": f"-{field}"}) == expected[::-1], (filters, field)
+
+    # A filter on the sort field leaves created_at to order by.
+    high = [str(t.id) for t in tickets if t.priority == Priority.HIGH]
+    assert walk(client, {"sort": "priority", "priority": "HIGH"}) == high
+    assert walk(client, {"sort": "-priority", "priority": "HIGH"}) == high[::-1]
+
+
+def test_list_tickets_overdue_and_due_within(client, db):
+    today = datetime.utcnow().date()
+
+    def due(days: int | None, status: Status = Status.TODO, **fields) -> Ticket:
+        due_date = None if days is None else today + timedelta(days=days)
+        return TicketFactory(due_date=due_date, status=status, **fields)
+
+    tickets = {
+        "late": due(-3, assignee="Alice"),
+        "later": due(-10, Status.IN_PROGRESS),
+        "yesterday": due(-1),
+        "today": due(0, assignee="Alice", priority=Priority.HIGH),
+        "soon": due(5),
+        "next_month": due(30),
+        "none": due(None),
+        "done_late": due(-2, Status.DONE),
+        "done_soon": due(1, Status.DONE),
+    }
+    db.add_all(tickets.values())
+    db.commit()
+
+    def listed(**params) -> list[str]:
+        ids = {str(ticket.id): name for name, ticket in tickets.items()}
+        return [ids[ticket_id] for ticket_id in walk(client, params)]
+
+    # Open tickets only, by due date unless sorted descending.
+    assert listed(overdue="true") == ["later", "late", "yesterday"]
+    assert listed(overdue="true", sort="-due_date") == ["yesterday", "late", "later"]
+    assert listed(due_within=7) == ["today", "soon"]
+    assert listed(due_within=0) == ["today"]
+    assert listed(overdue="true", due_within=7) == ["later", "late", "yesterday", "today", "soon"]
+    assert listed(overdue="true", assignee="Alice") == ["late"]
+    # Other filters, and other orders, are checked on the rows of an index.
+    assert listed(overdue="true", status="TODO") == ["late", "yesterday"]
+    assert listed(due_within=7, assignee="Alice", priority="HIGH") == ["today"]
+    by_created = sorted(tickets, key=lambda name: tickets[name].created_at)
+    overdue = ["later", "late", "yesterday"]
+    assert listed(overdue="true", sort="-created_at") == [
+        name for name in reversed(by_created) if name in overdue
+    ]
+    assert listed(overdue="true", sort="status") == sorted(
+        overdue, key=lambda name: (name == "later", tickets[name].created_at)
+    )
+    assert listed(overdue="false") == [
+        name for name, _ in sorted(tickets.items(), key=lambda item: item[1].created_at)
+    ]
+
+
+def test_list_tickets_sort_errors(client, db):
+    db.add_all(TicketFactory() for _ in range(3))
+    db.commit()
+    by_priority = client.get("/api/v1/tickets", params={"sort": "priority", "limit": 1})
+    cursor = by_priority.headers["X-Next-Cursor"]
+    by_created = client.get("/api/v1/tickets", params={"limit": 1}).headers["X-Next-Cursor"]
+
+    for params in (
+        # A cursor only resumes the sort it came from.
+        {"cursor": cursor},
+        {"cursor": cursor, "sort": "-priority"},
+        {"cursor": cursor, "sort": "status"},
+        {"cursor": by_created, "sort": "priority"},
+        {"updated_since": by_priority.headers["X-Sync-Token"], "sort": "priority"},
+        {"updated_since": by_priority.headers["X-Sync-Token"], "overdue": "true"},
+    ):
+        assert client.get("/api/v1/tickets", params=params).status_code == 400, params
+    for params in ({"sort": "title"}, {"due_within": -1}):
+        assert client.get("/api/v1/tickets", params=params).status_code == 422, params
+
+
+def test_bulk_create_tickets(client):
+    response = client.post(
+        "/api/v1/tickets:bulk",
+        json={"items": [{"title": "One"}, {"title": "Two", "priority": "HIGH"}]},
+    )
+    assert response.status_code == 201
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == [201, 201]
+    assert [r["ticket"]["title"] for r in results] == ["One", "Two"]
+    assert results[1]["ticket"]["priority"] == "HIGH"
+    assert client.get("/api/v1/metrics").json()["todo_count"] == 2
+
+
+def test_bulk_create_tickets_validates_items(client):
+    response = client.post("/api/v1/tickets:bulk", json={"items": [{"title": "ok"}, {}]})
+    assert response.status_code == 422
+    assert client.get("/api/v1/tickets").json() == []
+
+
+def test_bulk_update_tickets(client, db):
+    ticket1 = TicketFactory(status=Status.TODO, title="a")
+    ticket2 = TicketFactory(status=Status.DONE, closed_at=datetime.utcnow())
+    db.add_all([ticket1, ticket2])
+    db.commit()
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    response = client.patch(
+        "/api/v1/tickets:bulk",
+        json={
+            "items": [
+                {"id": str(ticket1.id), "status": "DONE"},
+                {"id": missing, "title": "nope"},
+                {"id": str(ticket2.id), "status": "IN_PROGRESS"},
+                {"id": str(ticket1.id), "title": "b"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == [200, 404, 200, 200]
+    assert results[0]["ticket"]["closed_at"] is not None
+    assert results[2]["ticket"]["closed_at"] is None
+    assert results[3]["ticket"]["title"] == "b"
+    assert results[3]["ticket"]["status"] == "DONE"
+
+    data = client.get(f"/api/v1/tickets/{ticket1.id}").json()
+    assert data["title"] == "b"
+    assert data["closed_at"] is not None
+    metrics = client.get("/api/v1/metrics").json()
+    assert metrics["done_count"] == 1
+    assert metrics["in_progress_count"] == 1
+
+
+def test_bulk_delete_tickets(client, db):
+    ticket1 = TicketFactory()
+    ticket2 = TicketFactory()
+    db.add_all([ticket1, ticket2])
+    db.commit()
+    db.add(CommentFactory(ticket_id=ticket1.id))
+    db.commit()
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    response = client.request(
+        "DELETE", "/api/v1/tickets:bulk", json={"ids": [str(ticket1.id), missing]}
+    )
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == [204, 404]
+    assert client.get(f"/api/v1/tickets/{ticket1.id}/comments").json() == []
+    assert client.get(f"/api/v1/tickets/{ticket2.id}").status_code == 200
+    assert client.get("/api/v1/metrics").json()["total_count"] == 1
+
+
+def test_get_ticket_etag_not_modified_without_db(client, db, sql_statements):
+    ticket = TicketFactory()
+    db.add(ticket)
+    db.commit()
+    url = f"/api/v1/tickets/{ticket.id}"
+
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    assert etag.startswith('"')
+
+    sql_statements.clear()
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert sql_statements == []
+
+    stats = client.get("/internal/cache").json()["tickets"]
+    assert stats["hits"] >= 1
+    assert stats["misses"] >= 1
+
+
+def test_get_ticket_cache_invalidated_by_writes(client, db):
+    ticket = TicketFactory(title="Before", status=Status.TODO)
+    db.add(ticket)
+    db.commit()
+    url = f"/api/v1/tickets/{ticket.id}"
+    etag = client.get(url).headers["ETag"]
+
+    client.patch(url, json={"title": "After"})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "After"
+
+    client.patch("/api/v1/tickets:bulk", json={"items": [{"id": str(ticket.id), "status": "DONE"}]})
+    assert client.get(url).json()["closed_at"] is not None
+
+    client.delete(url)
+    assert client.get(url).status_code == 404
+
+
+def test_list_tickets_sparse_fields(client, db, sql_statements):
+    start = datetime(2025, 1, 1)
+    tickets = [
+        TicketFactory(created_at=start + timedelta(minutes=i), description="long " * 100)
+        for i in range(3)
+    ]
+    db.add_all(tickets)
+    db.commit()
+
+    sql_statements.clear()
+    response = client.get("/api/v1/tickets", params={"fields": "status,title", "limit": 2})
+
+    assert response.status_code == 200
+    assert [list(item) for item in response.json()] == [["id", "title", "status"]] * 2
+    selects = [statement for statement, _ in sql_statements if "FROM tickets" in statement]
+    assert selects and not any("description" in statement for statement in selects)
+
+    # The cursor is still read, though created_at was not asked for.
+    rest = client.get(
+        "/api/v1/tickets",
+        params={"fields": "title", "cursor": response.headers["X-Next-Cursor"]},
+    )
+    assert rest.json() == [{"id": str(tickets[2].id), "title": tickets[2].title}]
+
+    lines = client.get(
+        "/api/v1/tickets", params={"fields": "assignee"}, headers={"Accept": "application/x-ndjson"}
+    ).text.splitlines()
+    assert [set(json.loads(line)) for line in lines] == [{"id", "assignee"}] * 3
+
+    changes = client.get(
+        "/api/v1/tickets",
+        params={"fields": "title", "updated_since": response.headers["X-Sync-Token"]},
+    )
+    assert all(set(ticket) == {"id", "title"} for ticket in changes.json()["tickets"])
+
+
+def test_list_tickets_unknown_field(client):
+    response = client.get("/api/v1/tickets", params={"fields": "title,secret"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: secret"
+
+
+def test_get_ticket_sparse_fields(client, db, sql_statements):
+    ticket = TicketFactory(title="Board")
+    db.add(ticket)
+    db.commit()
+    url = f"/api/v1/tickets/{ticket.id}"
+    params = {"fields": "title,status"}
+
+    sql_statements.clear()
+    uncached = client.get(url, params=params)
+    assert uncached.json() == {"id": str(ticket.id), "title": "Board", "status": "TODO"}
+    assert not any("description" in statement for statement, _ in sql_statements)
+
+    client.get(url)
+    sql_statements.clear()
+    cached = client.get(url, params=params)
+    assert sql_statements == []
+    assert cached.content == uncached.content
+    # The ETag is the ticket's version, whichever fields are sent.
+    assert cached.headers["ETag"] == uncached.headers["ETag"] == client.get(url).headers["ETag"]
+
+    response = client.get(url, params=params, headers={"If-None-Match": cached.headers["ETag"]})
+    assert response.status_code == 304
+    assert client.get(f"/api/v1/tickets/{uuid.uuid4()}", params=params).status_code == 404
+
+
+def test_batch_get_tickets(client, db):
+    start = datetime(2025, 1, 1)
+    tickets = [TicketFactory(created_at=start + timedelta(minutes=i)) for i in range(3)]
+    db.add_all(tickets)
+    db.commit()
+    first, second, third = (str(ticket.id) for ticket in tickets)
+    missing = str(uuid.uuid4())
+
+    response = client.post("/api/v1/tickets:batchGet", json={"ids": [third, missing, first, third]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [ticket["id"] for ticket in body["tickets"]] == [third, first]
+    assert body["tickets"][1] == client.get(f"/api/v1/tickets/{first}").json()
+    assert body["missing"] == [missing]
+
+    narrow = client.post(
+        "/api/v1/tickets:batchGet", params={"fields": "title"}, json={"ids": [second]}
+    ).json()
+    assert narrow["tickets"] == [{"id": second, "title": tickets[1].title}]
+
+    assert client.post("/api/v1/tickets:batchGet", json={"ids": []}).status_code == 422
+    unknown = client.post(
+        "/api/v1/tickets:batchGet", params={"include": "x"}, json={"ids": [first]}
+    )
+    assert unknown.status_code == 400
+
+
+def test_list_tickets_include_comments(client, db):
+    start = datetime(2025, 1, 1)
+    tickets = [TicketFactory(created_at=start + timedelta(minutes=i)) for i in range(2)]
+    db.add_all(tickets)
+    db.commit()
+    db.add_all(
+        CommentFactory(ticket_id=tickets[0].id, created_at=start + timedelta(hours=i))
+        for i in range(3)
+    )
+    db.commit()
+    comments = client.get(f"/api/v1/tickets/{tickets[0].id}/comments").json()
+
+    params = {"include": "comments,comment_count", "fields": "title"}
+    page = client.get("/api/v1/tickets", params=params).json()
+    assert page[0] == {
+        "id": str(tickets[0].id),
+        "title": tickets[0].title,
+        "comments": comments,
+        "comment_count": 3,
+    }
+    assert (page[1]["comments"], page[1]["comment_count"]) == ([], 0)
+
+    counted = client.get("/api/v1/tickets", params={"include": "comment_count"}).json()
+    assert [ticket["comment_count"] for ticket in counted] == [3, 0]
+    assert "comments" not in counted[0]
+    batch = client.post(
+        "/api/v1/tickets:batchGet",
+        params={"include": "comments"},
+        json={"ids": [str(tickets[0].id)]},
+    ).json()
+    assert batch["tickets"][0]["comments"] == comments
+
+    assert client.get("/api/v1/tickets", params={"include": "owner"}).status_code == 400
+    stream = client.get(
+        "/api/v1/tickets",
+        params={"include": "comments"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert stream.status_code == 400
+
+
+def test_includes_take_a_constant_number_of_statements(client, db, sql_statements):
+    counts = []
+    listed_total = 0
+    for ticket_count in (1, 5, 40):
+        listed_total += ticket_count
+        tickets = [TicketFactory() for _ in range(ticket_count)]
+        db.add_all(tickets)
+        db.commit()
+        db.add_all(CommentFactory(ticket_id=ticket.id) for ticket in tickets for _ in range(2))
+        db.commit()
+        ids = [str(ticket.id) for ticket in tickets]
+
+        for include in ("comments", "comment_count", "comments,comment_count"):
+            sql_statements.clear()
+            page = client.get("/api/v1/tickets", params={"include": include, "limit": 1000})
+            assert len(page.json()) == listed_total
+            listed = len(sql_statements)
+            sql_statements.clear()
+            batch = client.post(
+                "/api/v1/tickets:batchGet", params={"include": include}, json={"ids": ids}
+            )
+            assert len(batch.json()["tickets"]) == ticket_count
+            counts.append((include, listed, len(sql_statements)))
+
+    assert counts[:3] == counts[3:6] == counts[6:]
+    # The first page also reads the database's clock for its sync token.
+    assert all(listed == 3 and batched == 2 for _, listed, batched in counts)
@@ -0,0 +1,145 @@
+import asyncio
+import csv
+import io
+import json
+
+import httpx
+from sqlalchemy import func, select
+
+from app.api.pagination import NDJSON_MEDIA_TYPE
+from app.core.config import settings
+from app.db import bulk
+from app.db.models.comment import Comment
+from app.db.models.event import Event
+from app.db.models.ticket import Ticket
+from app.main import app
+from tests.factories import CommentFactory, TicketFactory
+
+AWKWARD = 'Line one,\nline "two"\r\n\ttabbed \\ ünï'
+
+
+def seed(db) -> list[Ticket]:
+    tickets = [TicketFactory(title="First", description=AWKWARD), TicketFactory(title="Second")]
+    db.add_all(tickets)
+    db.commit()
+    db.add_all(CommentFactory(ticket_id=tickets[0].id, content=text) for text in ("a", AWKWARD))
+    db.commit()
+    return sorted(tickets, key=lambda ticket: (ticket.created_at, ticket.id))
+
+
+def chunked(data: bytes, size: int = 7):
+    # The upload arrives in pieces that split lines, quotes and characters.
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def test_export_ndjson_groups_comments_under_tickets(client, db):
+    tickets = seed(db)
+
+    response = client.get("/api/v1/export")
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    documents = [json.loads(line) for line in response.text.splitlines()]
+    assert [document["id"] for document in documents] == [str(ticket.id) for ticket in tickets]
+    first = next(document for document in documents if document["title"] == "First")
+    expected = client.get(f"/api/v1/tickets/{first['id']}").json()
+    assert {key: first[key] for key in expected} == expected
+    assert [comment["content"] for comment in first["comments"]] in (["a", AWKWARD], [AWKWARD, "a"])
+    assert len(client.get("/api/v1/export", params={"limit": 1}).text.splitlines()) == 1
+
+
+def test_csv_export_imports_back(client, db):
+    seed(db)
+    exported = client.get("/api/v1/export", params={"format": "csv"})
+    assert exported.headers["content-type"].startswith("text/csv")
+    assert next(csv.reader(io.StringIO(exported.text)))[-1] == "comments"
+
+    response = client.post(
+        "/api/v1/import",
+        content=chunked(exported.content),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    *results, summary = [json.loads(line) for line in response.text.splitlines()]
+    assert summary == {"imported": 2, "rejected": 0}
+    assert [(r["row"], r["status"]) for r in results] == [(1, 201), (2, 201)]
+    copies = db.scalars(select(Ticket).where(Ticket.description == AWKWARD)).all()
+    assert {str(ticket.id) for ticket in copies} & {r["id"] for r in results}
+    assert db.scalar(select(func.count()).select_from(Comment)) == 4
+
+
+def test_import_reports_each_row_and_feeds_derived_data(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "import_batch_size", 2)
+    lines = [
+        {"title": "One", "status": "DONE", "comments": [{"author": "A", "content": "hi"}]},
+        "{not json",
+        {"description": "no title"},
+        "",
+        {"title": "Bad comment", "comments": [{"author": "A", "content": " "}]},
+        {"title": "Two", "assignee": "Bob", "id": "ignored", "created_at": "ignored"},
+    ]
+    body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+
+    response = client.post(
+        "/api/v1/import",
+        content=chunked(body.encode()),
+        headers={"Content-Type": "application/x-ndjson; charset=utf-8"},
+    )
+
+    *results, summary = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["row"], r["status"]) for r in results] == [
+        (1, 201),
+        (2, 422),
+        (3, 422),
+        (5, 422),
+        (6, 201),
+    ]
+    assert results[0]["comments"] == 1
+    assert results[1]["errors"][0]["type"] == "json_invalid"
+    assert results[2]["errors"][0]["loc"] == ["title"]
+    assert results[3]["errors"][0]["loc"] == ["comments", 0, "content"]
+    assert summary == {"imported": 2, "rejected": 3}
+
+    assert client.get(f"/api/v1/tickets/{results[4]['id']}").json()["assignee"] == "Bob"
+    metrics = client.get("/api/v1/metrics").json()
+    assert (metrics["total_count"], metrics["done_count"]) == (2, 1)
+    events = db.scalars(select(Event.type).order_by(Event.id)).all()
+    assert events == ["ticket.created", "comment.created", "ticket.created"]
+    assert len(client.get("/api/v1/search", params={"q": "hi"}).json()) == 1
+
+
+def test_import_streams_results_as_batches_commit(db, monkeypatch):
+    monkeypatch.setattr(settings, "import_batch_size", 1)
+    import_tickets = bulk.import_tickets
+
+    def fail_on_third_batch(session, items):
+        if session.scalar(select(func.count()).select_from(Ticket)) == 2:
+            raise RuntimeError("disk full")
+        return import_tickets(session, items)
+
+    monkeypatch.setattr(bulk, "import_tickets", fail_on_third_batch)
+    body = "\n".join(json.dumps({"title": title}) for title in ("One", "Two", "Three"))
+
+    async def upload():
+        for chunk in chunked(body.encode()):
+            yield chunk
+
+    async def post():
+        # Results are sent while the upload is still being read.
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.post(
+                "/api/v1/import", content=upload(), headers={"Content-Type": NDJSON_MEDIA_TYPE}
+            )
+
+    response = asyncio.run(post())
+    # Batches committed before the failure are reported; no summary marks the cut.
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["row"], r["status"]) for r in results] == [(1, 201), (2, 201)]
+    assert sorted(db.scalars(select(Ticket.title))) == ["One", "Two"]
+
+
+def test_import_rejects_other_media_types(client):
+    response = client.post("/api/v1/import", json=[{"title": "x"}])
+    assert response.status_code == 415